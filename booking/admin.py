@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Booking, Location
+from .models import Booking, Location, SeasonalRate, DurationDiscount, DailyBookingRollup
 
 # Register your models here.
 class BookingAdmin(admin.ModelAdmin):
@@ -7,4 +7,20 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ['user', 'vehicle', 'status', 'created_at']
 
 admin.site.register(Booking, BookingAdmin)
-admin.site.register(Location)
\ No newline at end of file
+admin.site.register(Location)
+
+
+@admin.register(SeasonalRate)
+class SeasonalRateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'car_type', 'start_date', 'end_date', 'multiplier']
+
+
+@admin.register(DurationDiscount)
+class DurationDiscountAdmin(admin.ModelAdmin):
+    list_display = ['min_days', 'percent']
+
+
+@admin.register(DailyBookingRollup)
+class DailyBookingRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'vehicle', 'car_type', 'location', 'revenue', 'booked_days', 'bookings']
+    list_filter = ['car_type']
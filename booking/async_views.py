@@ -0,0 +1,29 @@
+from rest_framework.response import Response
+
+from jobunyacar.asyncapi import async_read_view
+from jobunyacar.pagination import apaginate_rows
+
+from . import views
+from .fast_serializers import BOOKING_COLUMNS, serialize_bookings
+from .models import Booking
+from .reference import areference_data
+
+# Async twins of hot read views, routed by jobunyacar.asgi_urls under ASGI.
+# Responses are identical to the sync views'.
+
+
+@async_read_view(views.location_list_view)
+async def location_list_view(request):
+    """
+    Display List Of Location Options
+    """
+    return Response((await areference_data()).location_data)
+
+
+@async_read_view(views.my_bookings, authenticated=True)
+async def my_bookings(request):
+    """
+    GET: List all booking made by customer in their dashboard
+    """
+    bookings = Booking.objects.filter(user=request.user).values(*BOOKING_COLUMNS)
+    return await apaginate_rows(request, bookings, serialize_bookings)
@@ -0,0 +1,131 @@
+import calendar
+import time
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from jobunyacar.caches import cache_is_shared
+
+from .models import Booking
+
+# With a per-process cache another worker's booking changes never reach this
+# worker's versions, so its bitmaps are only kept for CALENDAR_CACHE_LOCAL_TTL
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(vehicle_id):
+    return f'calendar:vehicle:{vehicle_id}:version'
+
+
+def invalidate_vehicle_calendars(vehicle_ids):
+    """Drop every cached month bitmap of these vehicles"""
+    now = time.time_ns()
+    cache.set_many({_version_key(vehicle_id): now for vehicle_id in vehicle_ids}, None)
+
+
+def _cache_timeout():
+    return CALENDAR_CACHE_TIMEOUT if cache_is_shared() else settings.CALENDAR_CACHE_LOCAL_TTL
+
+
+def _versions(vehicle_ids):
+    keys = {vehicle_id: _version_key(vehicle_id) for vehicle_id in vehicle_ids}
+    found = cache.get_many(keys.values())
+    versions, missing = {}, {}
+    for vehicle_id, key in keys.items():
+        if key in found:
+            versions[vehicle_id] = found[key]
+        else:
+            # Never fall back to a fixed version: old bitmaps could still be cached under it
+            versions[vehicle_id] = missing[key] = time.time_ns()
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def _compute_bitmaps(vehicle_ids, first_day, days):
+    """
+    Booked-day matrix (vehicles x days) for one month from a single query.
+
+    Each active booking adds +1 on its first day and -1 after its last day
+    of a difference array; a cumulative sum then marks every booked day.
+    """
+    last_day = date.fromordinal(first_day.toordinal() + days - 1)
+    index = {vehicle_id: row for row, vehicle_id in enumerate(vehicle_ids)}
+    bookings = list(
+        Booking.objects.filter(vehicle_id__in=vehicle_ids)
+        .overlapping(first_day, last_day)
+        .values_list('vehicle_id', 'start_date', 'end_date')
+    )
+
+    diff = np.zeros((len(vehicle_ids), days + 1), dtype=np.int32)
+    if bookings:
+        rows = np.array([index[vehicle_id] for vehicle_id, _, _ in bookings])
+        starts = np.array([max((start - first_day).days, 0) for _, start, _ in bookings])
+        ends = np.array([min((end - first_day).days, days - 1) + 1 for _, _, end in bookings])
+        np.add.at(diff, (rows, starts), 1)
+        np.add.at(diff, (rows, ends), -1)
+    return np.cumsum(diff[:, :days], axis=1) > 0
+
+
+def month_bitmaps(vehicle_ids, year, month):
+    """
+    {vehicle_id: bool array, one entry per day of the month, True if booked}.
+
+    Bitmaps are cached packed (one bit per day) under a per-vehicle version
+    that changes whenever one of that vehicle's bookings does; only the
+    vehicles missing from the cache are computed, together.
+    """
+    first_day = date(year, month, 1)
+    days = calendar.monthrange(year, month)[1]
+    versions = _versions(vehicle_ids)
+    keys = {vehicle_id: f'calendar:{vehicle_id}:{versions[vehicle_id]}:{year}-{month:02d}' for vehicle_id in vehicle_ids}
+
+    cached = cache.get_many(keys.values())
+    bitmaps = {
+        vehicle_id: np.unpackbits(np.frombuffer(cached[key], dtype=np.uint8), count=days).astype(bool)
+        for vehicle_id, key in keys.items()
+        if key in cached
+    }
+
+    missing = [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in bitmaps]
+    if missing:
+        matrix = _compute_bitmaps(missing, first_day, days)
+        to_cache = {}
+        for row, vehicle_id in enumerate(missing):
+            bitmaps[vehicle_id] = matrix[row]
+            to_cache[keys[vehicle_id]] = np.packbits(matrix[row]).tobytes()
+        cache.set_many(to_cache, _cache_timeout())
+    return bitmaps
+
+
+def occupancy_by_car_type(vehicles, year, month):
+    """
+    Fleet heatmap: for each car type, how many of its vehicles are booked
+    on each day of the month and what fraction of the type that is.
+    `vehicles` is a list of (id, car_type).
+    """
+    vehicle_ids = [vehicle_id for vehicle_id, _ in vehicles]
+    bitmaps = month_bitmaps(vehicle_ids, year, month)
+    days = calendar.monthrange(year, month)[1]
+
+    car_types = sorted({car_type for _, car_type in vehicles})
+    type_index = {car_type: row for row, car_type in enumerate(car_types)}
+    rows = np.array([type_index[car_type] for _, car_type in vehicles], dtype=np.intp)
+
+    booked = np.zeros((len(car_types), days), dtype=np.int64)
+    fleet = np.zeros(len(car_types), dtype=np.int64)
+    if vehicle_ids:
+        np.add.at(booked, rows, np.array([bitmaps[vehicle_id] for vehicle_id in vehicle_ids], dtype=np.int64))
+        np.add.at(fleet, rows, 1)
+
+    return [
+        {
+            'car_type': car_type,
+            'vehicles': int(fleet[row]),
+            'booked': booked[row].tolist(),
+            'occupancy': np.round(booked[row] / fleet[row], 3).tolist(),
+        }
+        for row, car_type in enumerate(car_types)
+    ]
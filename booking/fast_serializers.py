@@ -0,0 +1,66 @@
+"""
+Read-only fast path for booking listings: BookingSerializer(many=True)
+output built from one values() query with the user, vehicle and
+locations joined in. Check parity with `manage.py bench_list_serialization`.
+"""
+from vehicles.fast_serializers import datetime_formatter, format_date, format_decimal, image_urls, optional
+
+LOCATION_FIELDS = ('id', 'name', 'address', 'city')
+
+BOOKING_COLUMNS = (
+    'id', 'user_id', 'vehicle_id', 'pickup_location_id', 'dropoff_location_id',
+    'start_date', 'end_date', 'total_price', 'status', 'created_at',
+    'user__email', 'user__full_name', 'user__phone_number', 'user__license_number', 'user__roles',
+    'user__agree_terms', 'user__created_at',
+    'vehicle__name', 'vehicle__image', 'vehicle__daily_rate',
+    *(f'pickup_location__{field}' for field in LOCATION_FIELDS[1:]),
+    *(f'dropoff_location__{field}' for field in LOCATION_FIELDS[1:]),
+)
+
+
+def _location(row, prefix):
+    location_id = row[f'{prefix}_id']
+    if location_id is None:
+        return None
+    return {
+        'id': location_id,
+        'name': row[f'{prefix}__name'],
+        'address': row[f'{prefix}__address'],
+        'city': row[f'{prefix}__city'],
+    }
+
+
+def serialize_bookings(rows, request=None):
+    """BookingSerializer(many=True).data for Booking values(*BOOKING_COLUMNS) rows"""
+    image_url = image_urls(request)
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': row['id'],
+            'user': row['user_id'],
+            'pickup_location': row['pickup_location_id'],
+            'dropoff_location': row['dropoff_location_id'],
+            'pickup_location_detail': _location(row, 'pickup_location'),
+            'dropoff_location_detail': _location(row, 'dropoff_location'),
+            'user_info': {
+                'id': row['user_id'],
+                'email': row['user__email'],
+                'full_name': row['user__full_name'],
+                'phone_number': row['user__phone_number'],
+                'license_number': row['user__license_number'],
+                'roles': row['user__roles'],
+                'agree_terms': bool(row['user__agree_terms']),
+                'created_at': optional(row['user__created_at'], format_datetime),
+            },
+            'vehicle': row['vehicle_id'],
+            'vehicle_name': row['vehicle__name'],
+            'vehicle_image': image_url(row['vehicle__image']),
+            'start_date': optional(row['start_date'], format_date),
+            'end_date': optional(row['end_date'], format_date),
+            'total_price': optional(row['total_price'], format_decimal),
+            'status': row['status'],
+            'daily_rate': optional(row['vehicle__daily_rate'], format_decimal),
+            'created_at': optional(row['created_at'], format_datetime),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobunyacar.benchdata import bench_data_exists
+from jobunyacar.benchmarks import compare_reports, run_benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Measures latency percentiles, query count/time and peak memory for
+    every route in jobunyacar/urls.py against the synthetic data made by
+    generate_bench_data, and writes the results as JSON. Writes are rolled
+    back, so runs are repeatable.
+    """
+    help = 'Benchmark every API route and write the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per case')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per case first')
+        parser.add_argument('--route', action='append', dest='routes', help='Only this url name (repeatable)')
+        parser.add_argument('--output', default='bench-results.json', help='Where to write the JSON report')
+        parser.add_argument('--compare', help='Earlier JSON report to print p50/p95 changes against')
+
+    def handle(self, *args, **options):
+        if not bench_data_exists():
+            raise CommandError('No synthetic data found; run generate_bench_data first')
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        report = run_benchmarks(
+            iterations=options['iterations'], warmup=options['warmup'], only=options['routes'],
+            progress=self._print_result,
+        )
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(report['results'])} results to {options['output']}"))
+        for route in report['unbenchmarked']:
+            self.stdout.write(self.style.WARNING(f"No benchmark case for {route['name']} ({route['route']})"))
+
+        if options['compare']:
+            baseline = json.loads(Path(options['compare']).read_text())
+            self.stdout.write(f"\n{'route':<28} {'case':<20} {'p50 ms':>18} {'p95 ms':>18}")
+            for name, case, old_p50, p50, old_p95, p95 in compare_reports(baseline, report):
+                self.stdout.write(
+                    f'{name:<28} {case:<20} {old_p50:>8.2f} -> {p50:<7.2f} {old_p95:>8.2f} -> {p95:<7.2f}'
+                )
+
+    def _print_result(self, result):
+        latency = result['latency_ms']
+        self.stdout.write(
+            f"{result['method']:<6} {result['name']:<28} {result['case']:<20} {result['status']} "
+            f"p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms  "
+            f"{result['queries']:>3} queries  {result['peak_memory_kb']:>9.1f} KiB"
+        )
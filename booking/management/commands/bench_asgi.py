@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+
+from jobunyacar.benchdata import bench_data_exists
+from jobunyacar.benchmarks import bench_context
+
+
+def _routes(ctx):
+    """url name -> (path, query string, headers) of the read endpoints that have async views"""
+    auth = [('Authorization', f"Token {ctx['tokens']['customer']}")]
+    # The availability window keeps the vehicle list out of the catalog cache, so every request queries
+    return {
+        'location-list': ('/api/locations/', '', []),
+        'vehicle-list-create': ('/api/vehicles/', f"available_from={ctx['today']}&available_to={ctx['today']}", []),
+        'vehicle-detail': (f"/api/vehicles/{ctx['vehicle'].slug}/", '', []),
+        'user-profile': ('/api/user/me/', '', auth),
+        'booking-my-list': ('/api/my-bookings/', '', auth),
+    }
+
+
+def _wsgi_request(application, path, query, headers):
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update(PATH_INFO=path, QUERY_STRING=query, REQUEST_METHOD='GET', HTTP_HOST='testserver')
+    for name, value in headers:
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    status = []
+    body = b''.join(application(environ, lambda line, response_headers, exc_info=None: status.append(line)))
+    return int(status[0].split()[0]), body
+
+
+async def _asgi_request(application, path, query, headers):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'testserver')] + [(name.lower().encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # The client never disconnects early; the handler cancels this once it has responded
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    return sent[0]['status'], b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def _summary(latencies, errors, elapsed):
+    latencies = np.array(latencies) * 1000
+    return {
+        'throughput': len(latencies) / elapsed,
+        'p50': float(np.percentile(latencies, 50)),
+        'p95': float(np.percentile(latencies, 95)),
+        'errors': errors,
+    }
+
+
+def run_wsgi(application, request, total, connections, workers):
+    """
+    `connections` clients send `total` requests to a WSGI deployment whose
+    `workers` worker threads take queued requests first come, first served
+    """
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    remaining = iter(range(total))
+
+    def handle():
+        try:
+            return _wsgi_request(application, *request)[0]
+        finally:
+            connection.close()
+
+    def client(pool):
+        nonlocal errors
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            status = pool.submit(handle).result()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                errors += status != 200
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        clients = [threading.Thread(target=client, args=(pool,)) for _ in range(connections)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+    return _summary(latencies, errors, time.perf_counter() - started)
+
+
+def run_asgi(application, request, total, connections):
+    """`connections` clients send `total` requests to the ASGI application on one event loop"""
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        while next(remaining, None) is not None:
+            started = time.perf_counter()
+            status, _ = await _asgi_request(application, *request)
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+
+    async def main():
+        await asyncio.gather(*(client() for _ in range(connections)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return _summary(latencies, errors, time.perf_counter() - started)
+
+
+class Command(BaseCommand):
+    """
+    Load test for the async read views: the same requests against the WSGI
+    application (a fixed pool of worker threads, like gunicorn --threads)
+    and the ASGI application (one event loop), with the same number of
+    concurrent client connections. Both run in this process, without
+    sockets, against the synthetic data made by generate_bench_data.
+
+    --query-latency-ms adds a delay to every query, standing in for a
+    database across the network or a slow query.
+    """
+    help = 'Compare concurrent-connection throughput of the hot read endpoints under WSGI and ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per route and deployment')
+        parser.add_argument('--connections', type=int, default=64, help='Concurrent client connections')
+        parser.add_argument('--wsgi-workers', type=int, default=8, help='Worker threads of the WSGI deployment')
+        parser.add_argument('--query-latency-ms', type=float, default=0, help='Delay added to every query')
+        parser.add_argument('--route', action='append', dest='routes', help='Only this url name (repeatable)')
+
+    def handle(self, *args, **options):
+        if not bench_data_exists():
+            raise CommandError('No synthetic data found; run generate_bench_data first')
+
+        routes = _routes(bench_context())
+        unknown = set(options['routes'] or ()) - set(routes)
+        if unknown:
+            raise CommandError(f"No load test for {', '.join(sorted(unknown))}; choose from {', '.join(routes)}")
+        connection.close()
+
+        from jobunyacar.asgi import application as asgi_application
+        from jobunyacar.wsgi import application as wsgi_application
+
+        delay = options['query_latency_ms'] / 1000
+
+        def sleep_then_execute(execute, *args):
+            time.sleep(delay)
+            return execute(*args)
+
+        def slow_queries(sender, connection, **kwargs):
+            # Fires on every reconnect of the same connection object
+            if sleep_then_execute not in connection.execute_wrappers:
+                connection.execute_wrappers.append(sleep_then_execute)
+
+        if delay:
+            connection_created.connect(slow_queries)
+        total, connections = options['requests'], options['connections']
+        self.stdout.write(
+            f"{'route':<22}{'WSGI req/s':>12}{'p50 ms':>8}{'p95 ms':>8}{'ASGI req/s':>12}{'p50 ms':>8}{'p95 ms':>8}{'gain':>7}"
+        )
+        # The injected delay would flood the slow-query log
+        slow_query_logger = logging.getLogger('jobunyacar.slow_queries')
+        slow_query_level = slow_query_logger.level
+        slow_query_logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], SECURE_SSL_REDIRECT=False):
+                for name, request in routes.items():
+                    if options['routes'] and name not in options['routes']:
+                        continue
+                    wsgi = run_wsgi(wsgi_application, request, total, connections, options['wsgi_workers'])
+                    asgi = run_asgi(asgi_application, request, total, connections)
+                    self.stdout.write(
+                        f"{name:<22}{wsgi['throughput']:>12.1f}{wsgi['p50']:>8.1f}{wsgi['p95']:>8.1f}"
+                        f"{asgi['throughput']:>12.1f}{asgi['p50']:>8.1f}{asgi['p95']:>8.1f}"
+                        f"{asgi['throughput'] / wsgi['throughput']:>6.2f}x"
+                    )
+                    if wsgi['errors'] or asgi['errors']:
+                        self.stdout.write(self.style.WARNING(
+                            f"  non-200 responses: WSGI {wsgi['errors']}, ASGI {asgi['errors']}"
+                        ))
+        finally:
+            connection_created.disconnect(slow_queries)
+            slow_query_logger.setLevel(slow_query_level)
@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from booking.models import Booking, Location
+from booking.views import create_booking_view
+from vehicles.models import Vehicle
+
+UserProfile = get_user_model()
+
+BENCH_PREFIX = 'bench-concurrency'
+
+
+class Command(BaseCommand):
+    """
+    Fires N parallel POSTs at create_booking_view and reports throughput and
+    double bookings. Creates its own users/vehicles and removes them afterwards;
+    run it against a development database.
+    """
+    help = 'Benchmark concurrent booking creation and check for double bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Total booking attempts')
+        parser.add_argument('--workers', type=int, default=16, help='Parallel client threads')
+        parser.add_argument('--vehicles', type=int, default=4, help='Vehicles the attempts are spread over')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        workers = options['workers']
+        vehicle_count = options['vehicles']
+
+        users, vehicles, location = self._setup(workers, vehicle_count)
+        factory = APIRequestFactory()
+        start_date = date.today() + timedelta(days=30)
+        results = {'created': 0, 'rejected': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def attempt(i):
+            # Every attempt on a vehicle asks for the same dates, so exactly one may win
+            payload = {
+                'vehicle': vehicles[i % vehicle_count].pk,
+                'pickup_location': location.pk,
+                'dropoff_location': location.pk,
+                'start_date': start_date.isoformat(),
+                'end_date': (start_date + timedelta(days=2)).isoformat(),
+            }
+            request = factory.post('/api/bookings/', payload, format='json')
+            force_authenticate(request, user=users[i % len(users)])
+            try:
+                response = create_booking_view(request)
+                outcome = 'created' if response.status_code == 201 else 'rejected'
+            except Exception:
+                outcome = 'errors'
+            finally:
+                connection.close()
+            with lock:
+                results[outcome] += 1
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(attempt, range(total)))
+            elapsed = time.perf_counter() - started
+
+            conflicts = self._count_conflicts(vehicles)
+        finally:
+            self._teardown()
+
+        self.stdout.write(f"attempts:    {total} ({workers} workers, {vehicle_count} vehicles)")
+        self.stdout.write(f"created:     {results['created']}")
+        self.stdout.write(f"rejected:    {results['rejected']}")
+        self.stdout.write(f"errors:      {results['errors']}")
+        self.stdout.write(f"elapsed:     {elapsed:.3f}s")
+        self.stdout.write(f"throughput:  {total / elapsed:.1f} req/s")
+        style = self.style.SUCCESS if conflicts == 0 else self.style.ERROR
+        self.stdout.write(style(f"conflicts:   {conflicts}"))
+
+    def _setup(self, user_count, vehicle_count):
+        self._teardown()
+        users = [
+            UserProfile.objects.create_user(
+                f'{BENCH_PREFIX}-{i}@example.com', 'bench-password', roles='customer', is_active=True
+            )
+            for i in range(user_count)
+        ]
+        vehicles = [
+            Vehicle.objects.create(
+                name=f'{BENCH_PREFIX} {i}', model='bench', car_type='Small Car', description='bench',
+                seats=4, transmission='Manual', fuel_type='Petrol', daily_rate=50, min_days=1,
+                status='Available', image='vehicles/bench.jpg',
+            )
+            for i in range(vehicle_count)
+        ]
+        location = Location.objects.create(name=BENCH_PREFIX, address='bench', city='bench')
+        return users, vehicles, location
+
+    def _teardown(self):
+        Booking.objects.filter(vehicle__name__startswith=BENCH_PREFIX).delete()
+        Vehicle.objects.filter(name__startswith=BENCH_PREFIX).delete()
+        UserProfile.objects.filter(email__startswith=BENCH_PREFIX).delete()
+        Location.objects.filter(name=BENCH_PREFIX).delete()
+
+    def _count_conflicts(self, vehicles):
+        """Number of active bookings that overlap an earlier one on the same vehicle"""
+        conflicts = 0
+        for vehicle in vehicles:
+            ranges = sorted(
+                Booking.objects.active().filter(vehicle=vehicle).values_list('start_date', 'end_date')
+            )
+            latest_end = None
+            for start_date, end_date in ranges:
+                if latest_end is not None and start_date <= latest_end:
+                    conflicts += 1
+                latest_end = max(latest_end or end_date, end_date)
+        return conflicts
@@ -0,0 +1,165 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from booking.models import Booking, Location
+from booking.views import create_booking_view
+from jobunyacar.sqlite import LOCK_RETRIES
+from rental_app.views import register_view
+from vehicles.models import Vehicle
+
+UserProfile = get_user_model()
+
+BENCH_PREFIX = 'bench-writers'
+BENCH_PASSWORD = 'Bench-writers-2025'
+
+# What a SQLite connection looked like before the tuned OPTIONS: rollback journal,
+# deferred transactions, Python's default 5s lock wait and no view retries
+BASELINE_OPTIONS = {'init_command': 'PRAGMA journal_mode=DELETE'}
+
+
+class Command(BaseCommand):
+    """
+    Hammers the SQLite database with parallel registrations and bookings,
+    once with the connection settings from settings.py ("tuned") and once
+    with SQLite's defaults ("baseline"), and reports throughput and
+    "database is locked" failures for each.
+
+    Password hashing is switched to MD5 for the run so the numbers measure
+    database contention rather than PBKDF2. Creates its own rows and removes
+    them afterwards; run it against a development database.
+    """
+    help = 'Benchmark concurrent writers on SQLite: tuned connection settings vs SQLite defaults'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help='Write requests per mode')
+        parser.add_argument('--workers', type=int, default=16, help='Parallel client threads')
+        parser.add_argument('--vehicles', type=int, default=8, help='Vehicles the bookings are spread over')
+        parser.add_argument('--mode', choices=['both', 'tuned', 'baseline'], default='both')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark is about SQLite locking; the default database is not SQLite')
+
+        modes = ['baseline', 'tuned'] if options['mode'] == 'both' else [options['mode']]
+        results = {}
+        # Every registration comes from one address; measure SQLite, not the rate limiter
+        with override_settings(
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], AUTH_RATE_LIMITS={}
+        ):
+            for mode in modes:
+                results[mode] = self._run(mode, options['requests'], options['workers'], options['vehicles'])
+
+        self.stdout.write(f"{'mode':<10}{'req/s':>10}{'ok':>7}{'locked':>8}{'other':>7}{'retries':>9}{'p95 ms':>9}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<10}{result['throughput']:>10.1f}{result['ok']:>7}{result['locked']:>8}"
+                f"{result['other']:>7}{result['retries']:>9}{result['p95']:>9.1f}"
+            )
+        if len(results) == 2 and results['baseline']['throughput']:
+            gain = results['tuned']['throughput'] / results['baseline']['throughput']
+            self.stdout.write(self.style.SUCCESS(f'tuned/baseline throughput: {gain:.2f}x'))
+
+    def _run(self, mode, total, workers, vehicle_count):
+        settings_dict = connection.settings_dict
+        tuned_options = settings_dict['OPTIONS']
+        connection.close()
+        if mode == 'baseline':
+            # Worker threads open their connections from this same dict
+            settings_dict['OPTIONS'] = BASELINE_OPTIONS
+
+        overrides = {'DB_LOCK_RETRIES': 0} if mode == 'baseline' else {}
+        try:
+            with override_settings(**overrides):
+                return self._hammer(total, workers, vehicle_count)
+        finally:
+            connection.close()
+            settings_dict['OPTIONS'] = tuned_options
+
+    def _hammer(self, total, workers, vehicle_count):
+        users, vehicles, location = self._setup(workers, vehicle_count)
+        factory = APIRequestFactory()
+        first_day = date.today() + timedelta(days=30)
+        counts = {'ok': 0, 'locked': 0, 'other': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def attempt(i):
+            # Even attempts register a customer, odd ones book a free slot
+            if i % 2 == 0:
+                request = factory.post('/api/user/register/', {
+                    'full_name': 'Bench Writer', 'email': f'{BENCH_PREFIX}-new-{i}@example.com',
+                    'phone_number': '0700000000', 'agree_terms': True,
+                    'password': BENCH_PASSWORD, 'password2': BENCH_PASSWORD,
+                }, format='json')
+                view = register_view
+            else:
+                start_date = first_day + timedelta(days=3 * (i // 2 // vehicle_count))
+                request = factory.post('/api/bookings/', {
+                    'vehicle': vehicles[i // 2 % vehicle_count].pk,
+                    'pickup_location': location.pk, 'dropoff_location': location.pk,
+                    'start_date': start_date.isoformat(), 'end_date': (start_date + timedelta(days=1)).isoformat(),
+                }, format='json')
+                force_authenticate(request, user=users[i % len(users)])
+                view = create_booking_view
+
+            started = time.perf_counter()
+            try:
+                response = view(request)
+                outcome = 'ok' if response.status_code == 201 else 'other'
+            except Exception as exc:
+                outcome = 'locked' if 'locked' in str(exc) else 'other'
+            finally:
+                connection.close()
+            with lock:
+                counts[outcome] += 1
+                latencies.append(time.perf_counter() - started)
+
+        retries_before = LOCK_RETRIES.total()
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(attempt, range(total)))
+            elapsed = time.perf_counter() - started
+        finally:
+            self._teardown()
+
+        latencies.sort()
+        return {
+            **counts,
+            'throughput': counts['ok'] / elapsed,
+            'retries': LOCK_RETRIES.total() - retries_before,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+        }
+
+    def _setup(self, user_count, vehicle_count):
+        self._teardown()
+        users = [
+            UserProfile.objects.create_user(
+                f'{BENCH_PREFIX}-{i}@example.com', BENCH_PASSWORD, roles='customer', is_active=True
+            )
+            for i in range(user_count)
+        ]
+        vehicles = [
+            Vehicle.objects.create(
+                name=f'{BENCH_PREFIX} {i}', model='bench', car_type='Small Car', description='bench',
+                seats=4, transmission='Manual', fuel_type='Petrol', daily_rate=50, min_days=1,
+                status='Available', image='vehicles/bench.jpg',
+            )
+            for i in range(vehicle_count)
+        ]
+        location = Location.objects.create(name=BENCH_PREFIX, address='bench', city='bench')
+        return users, vehicles, location
+
+    def _teardown(self):
+        Booking.objects.filter(vehicle__name__startswith=BENCH_PREFIX).delete()
+        Vehicle.objects.filter(name__startswith=BENCH_PREFIX).delete()
+        UserProfile.objects.filter(email__startswith=BENCH_PREFIX).delete()
+        Location.objects.filter(name=BENCH_PREFIX).delete()
@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from booking.fast_serializers import BOOKING_COLUMNS, serialize_bookings
+from booking.models import Booking
+from booking.serializers import BookingSerializer
+from vehicles.fast_serializers import VEHICLE_COLUMNS, serialize_vehicles
+from vehicles.models import Vehicle
+from vehicles.serializers import VehicleSerializer
+
+ORDERING = ('-created_at', '-id')
+
+
+class Command(BaseCommand):
+    """
+    Renders the same rows through the DRF serializers and through the
+    values() fast paths, fails if the JSON differs by a single byte, and
+    reports how long each path takes (query + build + render).
+    """
+    help = 'Check the fast list serializers against DRF and benchmark both'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per list (0 = every row)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path')
+
+    def handle(self, *args, **options):
+        rows = options['rows'] or None
+        renderer = JSONRenderer()
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            request = APIRequestFactory().get('/api/')
+            cases = [
+                ('vehicles', Vehicle.objects.order_by(*ORDERING)[:rows], request,
+                 lambda qs, request: VehicleSerializer(
+                     qs.prefetch_related('images'), many=True, context={'request': request}
+                 ).data,
+                 lambda qs, request: serialize_vehicles(qs.values(*VEHICLE_COLUMNS), request)),
+                ('bookings', Booking.objects.order_by(*ORDERING)[:rows], None,
+                 lambda qs, request: BookingSerializer(qs.with_details(), many=True, context={'request': request}).data,
+                 lambda qs, request: serialize_bookings(qs.values(*BOOKING_COLUMNS), request)),
+            ]
+
+            failures = 0
+            for name, queryset, case_request, drf, fast in cases:
+                # Check with and without a request: it decides absolute vs relative URLs
+                for label, check_request in (('absolute urls', request), ('relative urls', None)):
+                    expected = renderer.render(drf(queryset.all(), check_request))
+                    actual = renderer.render(fast(queryset.all(), check_request))
+                    if expected != actual:
+                        failures += 1
+                        self.stdout.write(self.style.ERROR(f'{name} ({label}): {self._first_difference(expected, actual)}'))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(
+                            f'{name} ({label}): identical, {len(expected)} bytes, {queryset.count()} rows'
+                        ))
+
+                drf_ms = self._time(lambda: renderer.render(drf(queryset.all(), case_request)), options['repeat'])
+                fast_ms = self._time(lambda: renderer.render(fast(queryset.all(), case_request)), options['repeat'])
+                self.stdout.write(
+                    f'{name}: serializer {drf_ms:.1f} ms, fast path {fast_ms:.1f} ms, '
+                    f'{drf_ms / fast_ms if fast_ms else float("inf"):.1f}x faster (median of {options["repeat"]})'
+                )
+
+        if failures:
+            raise CommandError(f'{failures} parity check(s) failed')
+
+    def _time(self, run, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def _first_difference(self, expected, actual):
+        index = next(
+            (i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual))
+        )
+        return f'differs at byte {index}: {expected[index - 60:index + 60]!r} vs {actual[index - 60:index + 60]!r}'
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobunyacar.benchdata import bench_data_exists, flush_bench_data, generate_bench_data
+
+
+class Command(BaseCommand):
+    """
+    Creates a reproducible synthetic fleet for bench_api, e.g.
+    --bookings 10000 / 100000 / 1000000. Use a throwaway database:
+    flushing a large data set is much slower than creating it.
+    """
+    help = 'Generate synthetic vehicles, users, locations and bookings for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--bookings', type=int, default=100_000)
+        parser.add_argument('--damage-rate', type=float, default=0.01,
+                            help='Share of completed bookings that get a damage report')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true', help='Remove earlier synthetic data first')
+
+    def handle(self, *args, **options):
+        if options['vehicles'] < 1 or options['users'] < 1 or options['locations'] < 1:
+            raise CommandError('Need at least one vehicle, user and location')
+        if bench_data_exists():
+            if not options['flush']:
+                raise CommandError('Synthetic data already exists; pass --flush to replace it')
+            self.stdout.write('Removing earlier synthetic data...')
+            flush_bench_data()
+
+        counts = generate_bench_data(
+            vehicles=options['vehicles'], users=options['users'], locations=options['locations'],
+            bookings=options['bookings'], damage_rate=options['damage_rate'], seed=options['seed'],
+            batch_size=options['batch_size'], progress=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Created ' + ', '.join(f'{count} {model}' for model, count in counts.items())
+        ))
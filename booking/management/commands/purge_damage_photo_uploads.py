@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from booking.models import DamagePhotoUpload
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable damage photo uploads left unfinished for DAMAGE_PHOTO_UPLOAD_EXPIRY_HOURS, and their bytes'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=settings.DAMAGE_PHOTO_UPLOAD_EXPIRY_HOURS)
+        # Deleted one by one so post_delete removes each partial file
+        expired = list(DamagePhotoUpload.objects.filter(created_at__lt=cutoff))
+        for upload in expired:
+            upload.delete()
+        self.stdout.write(self.style.SUCCESS(f'{len(expired)} expired upload(s) removed'))
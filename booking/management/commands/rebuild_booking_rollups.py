@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from booking.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily revenue/utilisation rollups from every booking"
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'{written} rollup row(s) written'))
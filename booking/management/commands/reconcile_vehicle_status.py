@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from booking.vehicle_status import recompute_vehicle_status
+
+
+class Command(BaseCommand):
+    help = "Recompute every vehicle's status from its bookings"
+
+    def handle(self, *args, **options):
+        changed = recompute_vehicle_status()
+        self.stdout.write(self.style.SUCCESS(f'{changed} vehicle status(es) corrected'))
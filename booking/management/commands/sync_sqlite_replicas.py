@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobunyacar.db_routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = "Copy the SQLite primary into every DATABASE_REPLICAS file (local stand-in for replication)"
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_DATABASE_PATHS:
+            raise CommandError('No replicas configured: set DATABASE_REPLICAS')
+
+        for alias in replica_aliases():
+            connections[alias].close()
+
+        # The online backup API gives a consistent snapshot even while the primary is being written
+        source = sqlite3.connect(settings.DATABASES['default']['NAME'])
+        try:
+            for path in settings.REPLICA_DATABASE_PATHS:
+                target = sqlite3.connect(path)
+                try:
+                    source.backup(target)
+                    # The copy inherits the primary's WAL mode, which a read-only connection can't open reliably
+                    target.execute('PRAGMA journal_mode=DELETE')
+                finally:
+                    target.close()
+                self.stdout.write(self.style.SUCCESS(f'Synced {path}'))
+        finally:
+            source.close()
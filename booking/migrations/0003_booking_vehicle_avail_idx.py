@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_location_damagereport_booking_dropoff_location_and_more'),
+        ('vehicles', '0002_vehicle_color_vehicle_engine_vehicle_engine_power_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['vehicle', 'status', 'start_date', 'end_date'], name='booking_vehicle_avail_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:59
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_booking_vehicle_avail_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DurationDiscount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_days', models.PositiveIntegerField(unique=True)),
+                ('percent', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeasonalRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('car_type', models.CharField(blank=True, choices=[('Small Car', 'Small Car'), ('Medium Car', 'Medium Car'), ('Mid-Size Car', 'Mid-Size Car'), ('SUV Car', 'SUV Car'), ('Luxury Car', 'Luxury Car'), ('Luxury SUV', 'Luxury SUV'), ('Minivan', 'Minivan'), ('Passenger Van', 'Passenger Van'), ('Bus', 'Bus'), ('Safari Vehicle', 'Safari Vehicle')], max_length=150)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('multiplier', models.DecimalField(decimal_places=2, max_digits=4, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(10)])),
+            ],
+        ),
+    ]
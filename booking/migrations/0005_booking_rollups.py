@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_pricing_rules'),
+        ('vehicles', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('car_type', models.CharField(blank=True, max_length=150)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('booked_days', models.PositiveIntegerField(default=0)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('location', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_rollups', to='booking.location')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='vehicles.vehicle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'car_type'], name='rollup_date_car_type_idx'), models.Index(fields=['vehicle', 'date'], name='rollup_vehicle_date_idx')],
+            },
+        ),
+    ]
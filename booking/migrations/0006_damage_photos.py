@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:31
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_booking_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DamagePhoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(blank=True, upload_to='damage-reports/')),
+                ('thumbnail', models.ImageField(blank=True, upload_to='damage-reports/thumbnails/')),
+                ('pending_file', models.CharField(blank=True, editable=False, max_length=255)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('damage_report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photos', to='booking.damagereport')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DamagePhotoUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('damage_report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photo_uploads', to='booking.damagereport')),
+            ],
+        ),
+    ]
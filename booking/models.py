@@ -1,10 +1,30 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.validators import MinValueValidator, MaxValueValidator
 from vehicles.models import Vehicle
 
 UserProfile = get_user_model()
 
 # Create your models here.
+class BookingQuerySet(models.QuerySet):
+    def active(self):
+        """Bookings that still hold the vehicle (pending or confirmed)"""
+        return self.filter(status__in=Booking.ACTIVE_STATUSES)
+
+    def overlapping(self, start_date, end_date):
+        """
+        Active bookings sharing at least one day with the inclusive
+        range start_date..end_date
+        """
+        return self.active().filter(start_date__lte=end_date, end_date__gte=start_date)
+
+    def with_details(self):
+        """Join everything BookingSerializer renders so listings cost one query"""
+        return self.select_related('user', 'vehicle', 'pickup_location', 'dropoff_location')
+
+
 class Location(models.Model):
     name = models.CharField(max_length=150)
     address = models.TextField()
@@ -20,6 +40,16 @@ class Booking(models.Model):
         ("cancelled", "Cancelled"),
         ("completed", "Completed"),
     ]
+    ACTIVE_STATUSES = ["pending", "confirmed"]
+    # Statuses that count towards revenue and utilisation reporting
+    REVENUE_STATUSES = ["confirmed", "completed"]
+    # status -> statuses an admin may move it to
+    ALLOWED_TRANSITIONS = {
+        "pending": ["confirmed", "cancelled"],
+        "confirmed": ["completed", "cancelled"],
+        "cancelled": [],
+        "completed": [],
+    }
 
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE)
@@ -31,6 +61,17 @@ class Booking(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves the availability anti-join: vehicle = ? AND status IN (...) AND date range
+            models.Index(fields=['vehicle', 'status', 'start_date', 'end_date'], name='booking_vehicle_avail_idx'),
+            # Keyset pages (jobunyacar.pagination): all-bookings, and my-bookings per user
+            models.Index(fields=['created_at', 'id'], name='booking_created_id_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='booking_user_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"Booking {self.user.email} for {self.vehicle.name}"
 
@@ -47,3 +88,93 @@ class DamageReport(models.Model):
 
     def __str__(self):
         return f"Damage report for {self.booking.vehicle}"
+
+
+class DamagePhoto(models.Model):
+    """
+    Evidence photo for a damage report. The upload waits in
+    DAMAGE_PHOTO_UPLOAD_DIR (pending_file) until booking.photos has
+    re-encoded it without EXIF and made its thumbnail; only then are
+    image and thumbnail set.
+    """
+    damage_report = models.ForeignKey(DamageReport, on_delete=models.CASCADE, related_name='photos')
+    image = models.ImageField(upload_to='damage-reports/', blank=True)
+    thumbnail = models.ImageField(upload_to='damage-reports/thumbnails/', blank=True)
+    pending_file = models.CharField(max_length=255, blank=True, editable=False)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Photo {self.pk} of damage report {self.damage_report_id}"
+
+
+class DamagePhotoUpload(models.Model):
+    """
+    A resumable photo upload in progress. The bytes received so far are
+    DAMAGE_PHOTO_UPLOAD_DIR/<id>.part; its length is the resume offset.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    damage_report = models.ForeignKey(DamageReport, on_delete=models.CASCADE, related_name='photo_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Upload of {self.filename} for damage report {self.damage_report_id}"
+
+
+class SeasonalRate(models.Model):
+    """
+    Multiplies the daily rate on every day between start_date and end_date
+    (inclusive), for one car type or, when car_type is blank, the whole fleet.
+    Where rules overlap the highest multiplier wins.
+    """
+    name = models.CharField(max_length=100)
+    car_type = models.CharField(max_length=150, choices=Vehicle.CAR_TYPE, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    multiplier = models.DecimalField(
+        max_digits=4, decimal_places=2, validators=[MinValueValidator(0), MaxValueValidator(10)]
+    )
+
+    def __str__(self):
+        return f"{self.name} x{self.multiplier} ({self.start_date} - {self.end_date})"
+
+
+class DurationDiscount(models.Model):
+    """
+    Percentage off the whole booking once it lasts at least min_days.
+    The discount with the highest qualifying min_days applies.
+    """
+    min_days = models.PositiveIntegerField(unique=True)
+    percent = models.DecimalField(
+        max_digits=5, decimal_places=2, validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+
+    def __str__(self):
+        return f"{self.percent}% off from {self.min_days} days"
+
+
+class DailyBookingRollup(models.Model):
+    """
+    Revenue and utilisation of confirmed/completed bookings for one day,
+    vehicle and pickup location, kept up to date by booking.rollups.
+    A booking's price is spread evenly over its days; it counts as one
+    booking on its start date. car_type is copied from the vehicle so
+    reports never join back to bookings or vehicles.
+    """
+    date = models.DateField()
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='daily_rollups')
+    car_type = models.CharField(max_length=150, blank=True)
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, related_name='daily_rollups')
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    booked_days = models.PositiveIntegerField(default=0)
+    bookings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'car_type'], name='rollup_date_car_type_idx'),
+            models.Index(fields=['vehicle', 'date'], name='rollup_vehicle_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} vehicle {self.vehicle_id}: {self.revenue}"
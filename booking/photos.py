@@ -0,0 +1,213 @@
+import fcntl
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.http import UnreadablePostError
+from PIL import Image, ImageOps
+
+from .models import DamagePhoto
+
+logger = logging.getLogger(__name__)
+
+# Request bodies are copied to disk this much at a time
+CHUNK_SIZE = 64 * 1024
+
+# Pillow format -> extension of the pending file
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'MPO': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+# Longest edge of the stored photo and of its thumbnail
+PHOTO_MAX_EDGE = 2560
+THUMBNAIL_EDGE = 320
+
+_executor = None
+
+
+class UploadInProgress(Exception):
+    """Another request is appending to the same upload"""
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'DAMAGE_PHOTO_WORKERS', 2),
+            thread_name_prefix='damage-photos',
+        )
+    return _executor
+
+
+def upload_dir():
+    path = Path(settings.DAMAGE_PHOTO_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def partial_path(upload):
+    return upload_dir() / f'{upload.pk}.part'
+
+
+def received_bytes(upload):
+    """Resume offset of a DamagePhotoUpload: how much of it is on disk"""
+    try:
+        return partial_path(upload).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+@contextmanager
+def open_partial(upload):
+    """
+    The upload's partial file, opened for appending under an exclusive
+    flock, so one request writes to it at a time whichever worker process
+    serves it (they share DAMAGE_PHOTO_UPLOAD_DIR). Raises UploadInProgress
+    if another request holds it; closing the file releases the lock.
+    """
+    with open(partial_path(upload), 'ab') as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadInProgress
+        yield handle
+
+
+def append_chunks(handle, stream, length):
+    """
+    Copy up to `length` bytes of `stream` to the end of the partial file
+    `handle` (from open_partial), CHUNK_SIZE at a time. A client that goes
+    away keeps what arrived so far. Returns the new offset.
+    """
+    remaining = length
+    while remaining > 0:
+        try:
+            chunk = stream.read(min(CHUNK_SIZE, remaining))
+        except UnreadablePostError:
+            break
+        if not chunk:
+            break
+        handle.write(chunk)
+        remaining -= len(chunk)
+    handle.flush()
+    return handle.tell()
+
+
+def _check_pixels(image):
+    max_pixels = settings.IMAGE_UPLOAD_MAX_PIXELS
+    if image.width * image.height > max_pixels:
+        raise ValueError(f'Photos must be at most {max_pixels // 1_000_000} megapixels.')
+
+
+def check_image(path):
+    """
+    Extension for the image at `path`; ValueError unless it is a JPEG, PNG
+    or WebP within IMAGE_UPLOAD_MAX_PIXELS
+    """
+    try:
+        with Image.open(path) as image:
+            image_format = image.format
+            _check_pixels(image)
+            image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValueError('Upload a valid image. The file is not an image or is corrupted.')
+    if image_format not in ALLOWED_FORMATS:
+        raise ValueError('Only JPEG, PNG and WebP photos are accepted.')
+    return ALLOWED_FORMATS[image_format]
+
+
+def attach_photos(damage_report, files):
+    """
+    Move each checked (path, extension) of `files` into the pending area
+    as a new photo of `damage_report`, created in one INSERT, and queue
+    their processing. Returns the photos in the order of `files`.
+    """
+    pending_files = []
+    for path, extension in files:
+        pending_file = f'{uuid.uuid4().hex}.{extension}'
+        file_move_safe(str(path), str(upload_dir() / pending_file))
+        pending_files.append(pending_file)
+    photos = DamagePhoto.objects.bulk_create(
+        [DamagePhoto(damage_report=damage_report, pending_file=pending_file) for pending_file in pending_files]
+    )
+    for photo in photos:
+        schedule_processing(photo)
+    return photos
+
+
+def schedule_processing(photo):
+    """Queue processing of photo once the current transaction commits"""
+    pk = photo.pk
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, pk))
+
+
+def _run_in_worker(pk):
+    try:
+        process_photo(pk)
+    except Exception:
+        logger.exception("Could not process damage photo %s", pk)
+    finally:
+        # Worker threads own their connection; don't leave it open between jobs
+        connection.close()
+
+
+def _encode(image, file_format, options):
+    buffer = BytesIO()
+    # Nothing from the upload's metadata is passed on: no EXIF, XMP or comments
+    image.save(buffer, file_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def process_photo(pk):
+    """
+    Turn a pending upload into the stored photo: rotated upright, scaled
+    down to PHOTO_MAX_EDGE, re-encoded as JPEG without any metadata, plus
+    a WebP thumbnail. The pending file is removed once the photo points
+    at the results.
+    """
+    photo = DamagePhoto.objects.filter(pk=pk).only('pk', 'damage_report_id', 'pending_file').first()
+    if photo is None or not photo.pending_file:
+        return
+    pending = upload_dir() / photo.pending_file
+
+    with Image.open(pending) as source:
+        # Checked on upload too, but decoding is where a pixel flood would hurt
+        _check_pixels(source)
+        # Apply the EXIF orientation while it is still there
+        image = ImageOps.exif_transpose(source).convert('RGB')
+    image.thumbnail((PHOTO_MAX_EDGE, PHOTO_MAX_EDGE), Image.LANCZOS)
+    thumbnail = image.copy()
+    thumbnail.thumbnail((THUMBNAIL_EDGE, THUMBNAIL_EDGE), Image.LANCZOS)
+
+    stem = f'damage-reports/{photo.damage_report_id}/{os.path.splitext(photo.pending_file)[0]}'
+    image_name = default_storage.save(
+        f'{stem}.jpg', _encode(image, 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True})
+    )
+    thumbnail_name = default_storage.save(
+        f'{stem}-thumb.webp', _encode(thumbnail, 'WEBP', {'quality': 75, 'method': 4})
+    )
+
+    updated = DamagePhoto.objects.filter(pk=pk, pending_file=photo.pending_file).update(
+        image=image_name, thumbnail=thumbnail_name, pending_file=''
+    )
+    if updated:
+        pending.unlink(missing_ok=True)
+    else:
+        # Deleted while being processed
+        default_storage.delete(image_name)
+        default_storage.delete(thumbnail_name)
+
+
+def delete_photo_files(image_name, thumbnail_name, pending_file):
+    for name in (image_name, thumbnail_name):
+        if name:
+            default_storage.delete(name)
+    if pending_file:
+        (upload_dir() / pending_file).unlink(missing_ok=True)
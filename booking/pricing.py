@@ -0,0 +1,198 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from jobunyacar.caches import cache_is_shared
+from vehicles.models import Vehicle
+
+from .models import SeasonalRate, DurationDiscount
+
+# Multipliers and discounts are held as integer basis points (1.00x == 10000)
+# and money as integer cents, so quotes are exact and match Decimal pricing.
+BASIS = 10000
+
+# Days from today covered by the cached multiplier tables
+PRICING_HORIZON_DAYS = 400
+
+# Bumped when a pricing rule change commits; tables also expire (PRICING_TABLE_TTL),
+# which is what other workers rely on when the cache is per process
+PRICING_VERSION_KEY = 'pricing:rules:version'
+
+# All car types, plus a row for vehicles whose car_type is not a known choice
+CAR_TYPES = [value for value, _ in Vehicle.CAR_TYPE]
+CAR_TYPE_INDEX = {car_type: index for index, car_type in enumerate(CAR_TYPES)}
+OTHER_TYPE = len(CAR_TYPES)
+
+CENT = Decimal('0.01')
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def _first_version():
+    # Not 1: after the cache is flushed, a restarted count could match a stale table
+    return time.time_ns()
+
+
+def pricing_version():
+    version = cache.get(PRICING_VERSION_KEY)
+    if version is None:
+        cache.add(PRICING_VERSION_KEY, _first_version(), None)
+        version = cache.get(PRICING_VERSION_KEY)
+    return version
+
+
+def invalidate_pricing():
+    """
+    Rebuild the rate tables on next use, in every worker sharing the cache.
+    Call once the rule change has committed, or a rebuild in between would
+    keep the old rules under the new version.
+    """
+    try:
+        cache.incr(PRICING_VERSION_KEY)
+    except ValueError:
+        cache.set(PRICING_VERSION_KEY, _first_version(), None)
+
+
+class RateTable:
+    """
+    Seasonal multipliers precomputed for a window of days, per car type.
+
+    `cumulative[t, d]` is the sum of car type t's daily multipliers over the
+    first d days of the window, so any date range is priced for every
+    vehicle with two array lookups.
+    """
+
+    def __init__(self, start, days):
+        self.start = start
+        self.days = days
+        max_age = settings.PRICING_TABLE_TTL if cache_is_shared() else settings.PRICING_TABLE_LOCAL_TTL
+        self.expires = time.monotonic() + max_age
+
+        # -1 marks days no rule covers; rules below 1.00x must still win over the default
+        multipliers = np.full((OTHER_TYPE + 1, days), -1, dtype=np.int64)
+        end = start + timedelta(days=days - 1)
+        rules = SeasonalRate.objects.filter(start_date__lte=end, end_date__gte=start)
+        for rule in rules:
+            first = max((rule.start_date - start).days, 0)
+            last = min((rule.end_date - start).days, days - 1) + 1
+            rows = [CAR_TYPE_INDEX[rule.car_type]] if rule.car_type in CAR_TYPE_INDEX else slice(None)
+            value = int(rule.multiplier * BASIS)
+            # Overlapping rules: the highest multiplier wins
+            multipliers[rows, first:last] = np.maximum(multipliers[rows, first:last], value)
+        multipliers[multipliers < 0] = BASIS
+
+        self.cumulative = np.zeros((OTHER_TYPE + 1, days + 1), dtype=np.int64)
+        np.cumsum(multipliers, axis=1, out=self.cumulative[:, 1:])
+
+        # (min_days, basis points off), ascending
+        self.discounts = sorted(
+            (discount.min_days, int(discount.percent * 100)) for discount in DurationDiscount.objects.all()
+        )
+
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def covers(self, start_date, end_date):
+        return self.start <= start_date and (end_date - self.start).days < self.days
+
+    def multiplier_sums(self, type_indexes, start_date, end_date):
+        first = (start_date - self.start).days
+        last = (end_date - self.start).days + 1
+        return self.cumulative[type_indexes, last] - self.cumulative[type_indexes, first]
+
+    def discount_for(self, days):
+        discount = 0
+        for min_days, basis_points in self.discounts:
+            if days >= min_days:
+                discount = basis_points
+        return discount
+
+
+def get_rate_table(start_date, end_date):
+    """
+    This worker's table for the standard window, rebuilt when the shared
+    version moves, the day changes or it expires; or a one-off table for
+    far-off dates
+    """
+    today = timezone.localdate()
+    key = (pricing_version(), today)
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None or table.expired():
+            _tables.clear()
+            table = _tables[key] = RateTable(today, PRICING_HORIZON_DAYS)
+    if table.covers(start_date, end_date):
+        return table
+    return RateTable(start_date, (end_date - start_date).days + 1)
+
+
+def quote_totals(daily_rates, car_types, start_date, end_date):
+    """
+    Price every vehicle for start_date..end_date (inclusive) in one pass.
+
+    daily_rates are Decimals and car_types strings, one per vehicle.
+    Returns an int64 array of totals in cents.
+    """
+    table = get_rate_table(start_date, end_date)
+    days = (end_date - start_date).days + 1
+
+    rate_cents = np.array([int(rate * 100) for rate in daily_rates], dtype=np.int64)
+    type_indexes = np.array([CAR_TYPE_INDEX.get(car_type, OTHER_TYPE) for car_type in car_types], dtype=np.int64)
+
+    # sum(rate * multiplier) over the days, rounded half up once per vehicle
+    totals = (rate_cents * table.multiplier_sums(type_indexes, start_date, end_date) + BASIS // 2) // BASIS
+
+    discount = table.discount_for(days)
+    if discount:
+        totals = (totals * (BASIS - discount) + BASIS // 2) // BASIS
+    return totals
+
+
+def _to_money(cents):
+    return (Decimal(int(cents)) / 100).quantize(CENT)
+
+
+def quote_vehicle(vehicle, start_date, end_date):
+    """Total price for one vehicle as a Decimal"""
+    cents = quote_totals([vehicle.daily_rate], [vehicle.car_type], start_date, end_date)[0]
+    return _to_money(cents)
+
+
+def quote_catalog(vehicles, start_date, end_date, limit=None):
+    """
+    Quote a Vehicle queryset for a date range, cheapest first.
+
+    Reads the catalog in one query, drops vehicles whose min_days exceeds
+    the rental length and prices the rest with one vectorised computation.
+    """
+    days = (end_date - start_date).days + 1
+    rows = list(
+        vehicles.order_by().values_list('id', 'name', 'slug', 'car_type', 'daily_rate', 'min_days')
+    )
+    rows = [row for row in rows if (row[5] or 1) <= days]
+    if not rows:
+        return []
+
+    totals = quote_totals([row[4] for row in rows], [row[3] for row in rows], start_date, end_date)
+    order = np.argsort(totals, kind='stable')
+    if limit is not None:
+        order = order[:limit]
+
+    return [
+        {
+            'vehicle': rows[index][0],
+            'name': rows[index][1],
+            'slug': rows[index][2],
+            'car_type': rows[index][3],
+            'daily_rate': str(rows[index][4]),
+            'total_price': str(_to_money(totals[index])),
+        }
+        for index in order
+    ]
@@ -0,0 +1,109 @@
+import copy
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from jobunyacar.caches import cache_is_shared
+from vehicles.models import Vehicle
+
+from .models import Location
+
+# Bumping the version makes every worker sharing the cache backend
+# reload its reference data on the next request. Snapshots also expire
+# (REFERENCE_DATA_TTL), which is what other workers rely on when the
+# cache is per process (REFERENCE_DATA_LOCAL_TTL).
+REFERENCE_VERSION_KEY = 'booking:reference:version'
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def _first_version():
+    # Not 1: after the cache is flushed, a restarted count could match a stale snapshot
+    return time.time_ns()
+
+
+def reference_version():
+    version = cache.get(REFERENCE_VERSION_KEY)
+    if version is None:
+        cache.add(REFERENCE_VERSION_KEY, _first_version(), None)
+        version = cache.get(REFERENCE_VERSION_KEY)
+    return version
+
+
+async def areference_version():
+    version = await cache.aget(REFERENCE_VERSION_KEY)
+    if version is None:
+        await cache.aadd(REFERENCE_VERSION_KEY, _first_version(), None)
+        version = await cache.aget(REFERENCE_VERSION_KEY)
+    return version
+
+
+def invalidate_reference_data():
+    """Reload locations on next use, in every worker sharing the cache"""
+    try:
+        cache.incr(REFERENCE_VERSION_KEY)
+    except ValueError:
+        cache.set(REFERENCE_VERSION_KEY, _first_version(), None)
+
+
+def _choices(choices):
+    return [{'value': value, 'label': label} for value, label in choices]
+
+
+class ReferenceData:
+    """
+    Everything the booking form picks from: locations (rows and rendered)
+    and the vehicle choice lists. Read-only once built; shared between
+    requests and threads.
+    """
+
+    def __init__(self, version):
+        from .serializers import LocationSerializer
+
+        self.version = version
+        max_age = settings.REFERENCE_DATA_TTL if cache_is_shared() else settings.REFERENCE_DATA_LOCAL_TTL
+        self.expires = time.monotonic() + max_age
+        # Always from the primary: a lagging replica would be cached until the next change
+        self.locations = list(Location.objects.using(DEFAULT_DB_ALIAS).order_by('pk'))
+        self.locations_by_id = {location.pk: location for location in self.locations}
+        self.location_data = LocationSerializer(self.locations, many=True).data
+        self.vehicle_choices = {
+            'car_types': _choices(Vehicle.CAR_TYPE),
+            'fuel_types': _choices(Vehicle.FUEL_CHOICES),
+            'transmissions': _choices(Vehicle.TRANSMISSION_CHOICES),
+        }
+
+    def current(self, version):
+        return self.version == version and time.monotonic() < self.expires
+
+    def location(self, pk):
+        """A private copy of location `pk`, or None"""
+        location = self.locations_by_id.get(pk)
+        return copy.copy(location) if location is not None else None
+
+
+def reference_data():
+    """This worker's ReferenceData, rebuilt when the shared version moves or it expires"""
+    global _snapshot
+    version = reference_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.current(version):
+        return snapshot
+    with _snapshot_lock:
+        if _snapshot is None or not _snapshot.current(version):
+            _snapshot = ReferenceData(version)
+        return _snapshot
+
+
+async def areference_data():
+    """reference_data() for async views; only a rebuild leaves the event loop"""
+    version = await areference_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.current(version):
+        return snapshot
+    return await sync_to_async(reference_data)()
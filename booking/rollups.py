@@ -0,0 +1,126 @@
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Max, Min, Q
+
+from jobunyacar.transactions import on_commit_batch
+from vehicles.models import Vehicle
+
+from .models import Booking, DailyBookingRollup
+
+# Vehicles refreshed per query batch, well below SQLite's expression depth limit
+REFRESH_BATCH_SIZE = 200
+
+
+def _booking_days(start_date, end_date, total_price, first_day, last_day):
+    """
+    (day, revenue in cents, is_start_day) for each day of a booking inside
+    first_day..last_day. Cents left over by the even split go to the
+    earliest days, so the days always add up to total_price.
+    """
+    days = (end_date - start_date).days + 1
+    if days <= 0:
+        return
+    base, extra = divmod(int(total_price * 100), days)
+    first = max((first_day - start_date).days, 0)
+    last = min((last_day - start_date).days, days - 1)
+    for offset in range(first, last + 1):
+        yield start_date + timedelta(days=offset), base + (offset < extra), offset == 0
+
+
+def _refresh_batch(ranges):
+    vehicle_ids = list(ranges)
+    with transaction.atomic():
+        # Write first: on SQLite this takes the write lock up front instead of
+        # upgrading a read lock, which can fail against a concurrent writer
+        DailyBookingRollup.objects.filter(reduce(or_, (
+            Q(vehicle_id=vehicle_id, date__range=(first_day, last_day))
+            for vehicle_id, (first_day, last_day) in ranges.items()
+        ))).delete()
+        # Serialises refreshes of the same vehicles on databases with row locks; on
+        # SQLite the transaction's write lock (BEGIN IMMEDIATE) already serialises them
+        car_types = dict(
+            Vehicle.objects.select_for_update().filter(pk__in=vehicle_ids).values_list('id', 'car_type')
+        )
+
+        booking_filter = reduce(or_, (
+            Q(vehicle_id=vehicle_id, start_date__lte=last_day, end_date__gte=first_day)
+            for vehicle_id, (first_day, last_day) in ranges.items()
+        ))
+        bookings = Booking.objects.filter(booking_filter, status__in=Booking.REVENUE_STATUSES).values_list(
+            'vehicle_id', 'pickup_location_id', 'start_date', 'end_date', 'total_price'
+        )
+
+        totals = {}
+        for vehicle_id, location_id, start_date, end_date, total_price in bookings.iterator(chunk_size=2000):
+            first_day, last_day = ranges[vehicle_id]
+            for day, cents, is_start in _booking_days(start_date, end_date, total_price, first_day, last_day):
+                row = totals.setdefault((day, vehicle_id, location_id), [0, 0, 0])
+                row[0] += cents
+                row[1] += 1
+                row[2] += is_start
+
+        DailyBookingRollup.objects.bulk_create(
+            [
+                DailyBookingRollup(
+                    date=day, vehicle_id=vehicle_id, car_type=car_types.get(vehicle_id, ''), location_id=location_id,
+                    revenue=Decimal(cents) / 100, booked_days=booked_days, bookings=count,
+                )
+                for (day, vehicle_id, location_id), (cents, booked_days, count) in totals.items()
+                if vehicle_id in car_types
+            ],
+            batch_size=1000,
+        )
+        return len(totals)
+
+
+def refresh_rollups(ranges):
+    """
+    Recompute the rollup rows of each vehicle over its inclusive
+    (first_day, last_day) range from the bookings touching it.
+
+    ranges is {vehicle_id: (first_day, last_day)}. Only those rows are
+    rewritten, so the cost follows the size of the change, not of the
+    bookings table. Returns the number of rows written.
+    """
+    items = list(ranges.items())
+    written = 0
+    for index in range(0, len(items), REFRESH_BATCH_SIZE):
+        written += _refresh_batch(dict(items[index:index + REFRESH_BATCH_SIZE]))
+    return written
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from scratch"""
+    ranges = {
+        vehicle_id: (first_day, last_day)
+        for vehicle_id, first_day, last_day in Booking.objects.order_by().values('vehicle_id')
+        .annotate(first_day=Min('start_date'), last_day=Max('end_date'))
+        .values_list('vehicle_id', 'first_day', 'last_day')
+    }
+    with transaction.atomic():
+        DailyBookingRollup.objects.all().delete()
+        return refresh_rollups(ranges)
+
+
+def queue_rollup(vehicle_id, start_date, end_date):
+    """
+    Refresh this vehicle's rollups for start_date..end_date once the
+    current transaction commits. Ranges queued for the same vehicle in
+    one transaction are merged and refreshed together; a rollback forgets
+    them.
+    """
+    def add(ranges):
+        current = ranges.get(vehicle_id)
+        if current is None:
+            ranges[vehicle_id] = (start_date, end_date)
+        else:
+            ranges[vehicle_id] = (min(start_date, current[0]), max(end_date, current[1]))
+
+    # robust: a failed refresh (e.g. SQLite still locked) is logged instead of
+    # failing a request whose booking is already committed; rebuild_booking_rollups
+    # catches the rollups up again
+    on_commit_batch(refresh_rollups, add, dict)
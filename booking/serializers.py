@@ -1,7 +1,12 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
-from .models import Booking, DamageReport, Location
+from .models import Booking, DamagePhoto, DamagePhotoUpload, DamageReport, Location
+from .pricing import quote_vehicle
+from .reference import reference_data
+from .photos import received_bytes
 from vehicles.models import Vehicle
 
 from rental_app.serializers import UserSerializer
@@ -24,18 +29,35 @@ class LocationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class CachedLocationField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves location ids from the in-process reference data instead of a
+    query per field; unknown ids still go to the database.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', Location.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if self.pk_field is None and not isinstance(data, bool):
+            try:
+                location = reference_data().location(int(data))
+            except (TypeError, ValueError):
+                location = None
+            if location is not None:
+                return location
+        return super().to_internal_value(data)
+
+
 class BookingSerializer(serializers.ModelSerializer):
     user_info = UserSerializer(source='user', read_only=True)
     vehicle_name = serializers.CharField(source='vehicle.name', read_only=True)
     vehicle_image = serializers.ImageField(source='vehicle.image', read_only=True)
     daily_rate = serializers.DecimalField(source='vehicle.daily_rate', read_only=True, max_digits=10, decimal_places=2)
 
-    pickup_location = serializers.PrimaryKeyRelatedField(
-        queryset=Location.objects.all()
-    ) 
-    dropoff_location = serializers.PrimaryKeyRelatedField(
-        queryset = Location.objects.all()
-    )
+    pickup_location = CachedLocationField()
+    dropoff_location = CachedLocationField()
 
     # For read-only nested details
     pickup_location_detail = LocationSerializer(source='pickup_location', read_only=True)
@@ -65,7 +87,7 @@ class BookingSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         # Aurtomatically calculate total price
-        # Total price = vehicle.dailyrate * number of days  
+        # Total price = vehicle.dailyrate * number of days, adjusted by pricing rules (see pricing.py)
         request = self.context.get('request')
         user = request.user if request else None
 
@@ -86,33 +108,82 @@ class BookingSerializer(serializers.ModelSerializer):
         if number_of_days < min_days:
             raise serializers.ValidationError(f"Number of days cant be less than {min_days} period")
 
-        # compute total price   
-        total_price = vehicle.daily_rate * number_of_days
-
-        #create the booking
-        booking = Booking.objects.create(
-            user=user,
-            vehicle=vehicle,
-            pickup_location=pickup_location,
-            dropoff_location=dropoff_location,
-            start_date=start_date,
-            end_date=end_date,
-            total_price=total_price,
-            status='pending'
-        )
+        # compute total price with seasonal rates and duration discounts
+        total_price = quote_vehicle(vehicle, start_date, end_date)
+
+        with transaction.atomic():
+            # On SQLite select_for_update() is a no-op. What serialises checkouts there is
+            # the database write lock, taken at BEGIN (transaction_mode IMMEDIATE): no
+            # other writer runs between the overlap check and the insert, so checkouts
+            # for different vehicles queue behind each other too. On databases with row
+            # locks this locks only the vehicle's row, and only same-car checkouts queue
+            Vehicle.objects.select_for_update().only('id').get(pk=vehicle.pk)
+
+            if Booking.objects.overlapping(start_date, end_date).filter(vehicle=vehicle).exists():
+                raise serializers.ValidationError("This vehicle is already booked for the selected dates")
+
+            #create the booking
+            booking = Booking.objects.create(
+                user=user,
+                vehicle=vehicle,
+                pickup_location=pickup_location,
+                dropoff_location=dropoff_location,
+                start_date=start_date,
+                end_date=end_date,
+                total_price=total_price,
+                status='pending'
+            )
         return booking 
 
 
+class DamagePhotoThumbnailSerializer(serializers.ModelSerializer):
+    """What report listings show of a photo; thumbnail is null while it is being processed"""
+    processing = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DamagePhoto
+        fields = ['id', 'thumbnail', 'processing', 'uploaded_at']
+        read_only_fields = fields
+
+    def get_processing(self, obj):
+        return bool(obj.pending_file)
+
+
+class DamagePhotoSerializer(DamagePhotoThumbnailSerializer):
+    class Meta(DamagePhotoThumbnailSerializer.Meta):
+        fields = ['id', 'image', 'thumbnail', 'processing', 'uploaded_at']
+        read_only_fields = fields
+
+
+class DamagePhotoUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DamagePhotoUpload
+        fields = ['id', 'filename', 'size', 'offset', 'created_at']
+        read_only_fields = ['id', 'offset', 'created_at']
+
+    def get_offset(self, obj):
+        return received_bytes(obj)
+
+    def validate_size(self, size):
+        max_bytes = settings.DAMAGE_PHOTO_MAX_BYTES
+        if not 0 < size <= max_bytes:
+            raise serializers.ValidationError(f"Photos must be between 1 byte and {max_bytes // (1024 * 1024)} MB.")
+        return size
+
+
 class DamageReportSerializer(serializers.ModelSerializer):
     booking = serializers.PrimaryKeyRelatedField(queryset=Booking.objects.none())
     booking_details = BookingSerializer(source='booking', read_only=True)
     user_details = UserSerializer(source='booking.user', read_only=True)
     vehicle_details = serializers.SerializerMethodField()
+    photos = DamagePhotoThumbnailSerializer(many=True, read_only=True)
 
     class Meta:
         model = DamageReport
-        fields = ['id', 'booking', 'booking_details', 'user_details', 'vehicle_details', 'description', 'status', 'created_at']
-        read_only_fields = ['id', 'created_at', 'booking_details', 'user_details', 'vehicle_details']
+        fields = ['id', 'booking', 'booking_details', 'user_details', 'vehicle_details', 'description', 'status', 'photos', 'created_at']
+        read_only_fields = ['id', 'created_at', 'booking_details', 'user_details', 'vehicle_details', 'photos']
 
     def get_vehicle_details(self, obj):
         if not obj.booking or not obj.booking.vehicle:
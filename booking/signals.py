@@ -1,26 +1,85 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Booking, Vehicle
+from .models import Booking, DamagePhoto, DamagePhotoUpload, Location, SeasonalRate, DurationDiscount
+from .vehicle_status import queue_vehicle_status
+from .pricing import invalidate_pricing
+from .calendar import invalidate_vehicle_calendars
+from .rollups import queue_rollup
+from .reference import invalidate_reference_data
+from .photos import delete_photo_files, partial_path
 
-@receiver(post_save, sender=Booking)
+@receiver([post_save, post_delete], sender=Booking)
 def update_vehicle_status(sender, instance: Booking, **kwargs):
     """
-    Automatically updates the vehicle status based on booking status.
+    Recompute the vehicle status after the booking change commits.
     """
-    vehicle = instance.vehicle
+    queue_vehicle_status(instance.vehicle_id)
 
-    status = instance.status.lower()
 
-    if status == 'confirmed':
-        vehicle.status = 'Booked'
-    elif status in ['pending', 'completed', 'cancelled']:
-        # Check if other active bookings exist for this vehicle
-        other_active_bookings = Booking.objects.filter(
-            vehicle=vehicle,
-            status__in=['pending', 'confirmed']
-        ).exclude(id=instance.id)
-        
-        if not other_active_bookings.exists():
-            vehicle.status = 'Available'
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_calendar(sender, instance: Booking, **kwargs):
+    """
+    Drop the vehicle's cached availability calendars once the change commits.
+    """
+    vehicle_id = instance.vehicle_id
+    transaction.on_commit(lambda: invalidate_vehicle_calendars([vehicle_id]))
+
+
+@receiver(pre_save, sender=Booking)
+def remember_rollup_range(sender, instance: Booking, update_fields=None, **kwargs):
+    """
+    Note where an existing booking was, so moving its vehicle or dates
+    also refreshes the rollups it leaves behind.
+    """
+    instance._rollup_previous = None
+    if instance.pk and (update_fields is None or {'vehicle', 'start_date', 'end_date'} & set(update_fields)):
+        instance._rollup_previous = Booking.objects.filter(pk=instance.pk).values_list(
+            'vehicle_id', 'start_date', 'end_date'
+        ).first()
+
 
-    vehicle.save()
+@receiver([post_save, post_delete], sender=Booking)
+def update_rollups(sender, instance: Booking, **kwargs):
+    """
+    Refresh the daily revenue/utilisation rollups the booking touches.
+    """
+    queue_rollup(instance.vehicle_id, instance.start_date, instance.end_date)
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        queue_rollup(*previous)
+
+
+@receiver([post_save, post_delete], sender=SeasonalRate)
+@receiver([post_save, post_delete], sender=DurationDiscount)
+def invalidate_rate_tables(sender, **kwargs):
+    """
+    Pricing rules changed, rebuild the precomputed rate tables once the change commits.
+    """
+    transaction.on_commit(invalidate_pricing)
+
+
+@receiver([post_save, post_delete], sender=Location)
+def invalidate_locations(sender, **kwargs):
+    """
+    Locations changed, reload the cached reference data once the change commits.
+    """
+    transaction.on_commit(invalidate_reference_data)
+
+
+@receiver(post_delete, sender=DamagePhoto)
+def delete_damage_photo_files(sender, instance: DamagePhoto, **kwargs):
+    """
+    Remove the photo's stored files (or its pending upload) once the delete commits.
+    """
+    names = (instance.image.name, instance.thumbnail.name, instance.pending_file)
+    transaction.on_commit(lambda: delete_photo_files(*names))
+
+
+@receiver(post_delete, sender=DamagePhotoUpload)
+def delete_partial_upload(sender, instance: DamagePhotoUpload, **kwargs):
+    """
+    Remove the bytes of a finished, cancelled or expired resumable upload.
+    """
+    path = partial_path(instance)
+    transaction.on_commit(lambda: path.unlink(missing_ok=True))
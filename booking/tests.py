@@ -1,3 +1,662 @@
-from django.test import TestCase
+import io
+import re
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from rental_app.models import UserProfile
+from vehicles.models import Vehicle
+
+from .calendar import month_bitmaps
+from .fast_serializers import BOOKING_COLUMNS, serialize_bookings
+from .models import Booking, DamagePhoto, DamagePhotoUpload, DamageReport, Location, SeasonalRate
+from .photos import open_partial, partial_path, process_photo, upload_dir
+from .pricing import pricing_version, quote_vehicle
+from .reference import reference_data
+from .rollups import queue_rollup
+from .serializers import BookingSerializer
+from .vehicle_status import queue_vehicle_status
+
+
+class SeasonalRateQuoteTests(TestCase):
+    def setUp(self):
+        self.start = timezone.localdate() + timedelta(days=10)
+        self.end = self.start + timedelta(days=4)
+        self.vehicle = Vehicle(daily_rate=Decimal('100.00'), car_type='Small Car')
+
+    def rule(self, multiplier, first=0, last=4, car_type=''):
+        with self.captureOnCommitCallbacks(execute=True):
+            return SeasonalRate.objects.create(
+                name=f'x{multiplier}', car_type=car_type, multiplier=Decimal(multiplier),
+                start_date=self.start + timedelta(days=first), end_date=self.start + timedelta(days=last),
+            )
+
+    def test_no_rules(self):
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('500.00'))
+
+    def test_rule_above_one(self):
+        self.rule('1.50')
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('750.00'))
+
+    def test_rule_below_one(self):
+        self.rule('0.50')
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('250.00'))
+
+    def test_rule_below_one_on_some_days(self):
+        self.rule('0.50', first=3, last=4)
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('400.00'))
+
+    def test_overlapping_rules_highest_wins(self):
+        # days 0-1: 0.80, days 2-3: max(0.80, 1.20), day 4: 1.20
+        self.rule('0.80', first=0, last=3)
+        self.rule('1.20', first=2, last=4)
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('520.00'))
+
+    def test_overlapping_rules_below_one(self):
+        self.rule('0.50', car_type='Small Car')
+        self.rule('0.90')
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('450.00'))
+
+    def test_rule_for_other_car_type_ignored(self):
+        self.rule('0.50', car_type='Bus')
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('500.00'))
+
+    def test_tables_rebuilt_after_commit(self):
+        quote_vehicle(self.vehicle, self.start, self.end)
+        with self.captureOnCommitCallbacks() as callbacks:
+            SeasonalRate.objects.create(
+                name='x1.50', multiplier=Decimal('1.50'), start_date=self.start, end_date=self.end,
+            )
+            version = pricing_version()
+        # Not before: a rebuild could still read the old rules and keep them under the new version
+        self.assertEqual(pricing_version(), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(pricing_version(), version)
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('750.00'))
+
+    def change_elsewhere(self):
+        rule = self.rule('1.50')
+        quote_vehicle(self.vehicle, self.start, self.end)
+        # As another worker would: the version bump only reaches this one through a shared cache
+        SeasonalRate.objects.filter(pk=rule.pk).update(multiplier=Decimal('2.00'))
+
+    def test_table_kept_until_it_expires(self):
+        self.change_elsewhere()
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('750.00'))
+
+    @override_settings(PRICING_TABLE_LOCAL_TTL=0)
+    def test_expired_table_rebuilt(self):
+        self.change_elsewhere()
+        self.assertEqual(quote_vehicle(self.vehicle, self.start, self.end), Decimal('1000.00'))
+
+
+def make_vehicle(name='Vitz', **fields):
+    fields = {
+        'model': '2018', 'car_type': 'Small Car', 'description': '', 'seats': 5, 'transmission': 'Automatic',
+        'fuel_type': 'Petrol', 'daily_rate': Decimal('100.00'), 'status': 'Available', 'min_days': 1, **fields,
+    }
+    return Vehicle.objects.create(name=name, **fields)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ExportTests(TestCase):
+    def test_csv_formulas_neutralised(self):
+        admin = UserProfile.objects.create_user('exports@example.com', 'Secret-pass-123', is_active=True, roles='admin')
+        customer = UserProfile.objects.create_user(
+            'formula@example.com', 'Secret-pass-123', is_active=True, full_name='=HYPERLINK("http://evil.example")',
+        )
+        Booking.objects.create(
+            user=customer, vehicle=make_vehicle('+Vitz'), start_date=timezone.localdate(),
+            end_date=timezone.localdate(), total_price=Decimal('-5.00'), status='pending',
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/api/admin/export/bookings/')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertIn('"\'=HYPERLINK(', lines[1])
+        self.assertIn(",'+Vitz,", lines[1])
+        # Numbers are left alone
+        self.assertIn(',-5.00,', lines[1])
+
+        response = client.get('/api/admin/export/bookings/', {'output': 'ndjson'})
+        self.assertIn(b'"=HYPERLINK', b''.join(response.streaming_content))
+
+
+class ReferenceDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.location = Location.objects.create(name='Airport', address='Terminal 1', city='Nairobi')
+
+    def rename_elsewhere(self):
+        # As another worker would: the version bump only reaches this one through a shared cache
+        Location.objects.filter(pk=self.location.pk).update(name='Airport Terminal 2')
+
+    def test_snapshot_kept_until_it_expires(self):
+        reference_data()
+        self.rename_elsewhere()
+        self.assertEqual(reference_data().location(self.location.pk).name, 'Airport')
+
+    @override_settings(REFERENCE_DATA_LOCAL_TTL=0)
+    def test_expired_snapshot_reloaded(self):
+        reference_data()
+        self.rename_elsewhere()
+        self.assertEqual(reference_data().location(self.location.pk).name, 'Airport Terminal 2')
+
+    @override_settings(REFERENCE_DATA_LOCAL_TTL=0, CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'unused',
+    }})
+    def test_shared_cache_uses_long_ttl(self):
+        with mock.patch('booking.reference.reference_version', return_value=1):
+            reference_data()
+            self.rename_elsewhere()
+            self.assertEqual(reference_data().location(self.location.pk).name, 'Airport')
+
+
+class CalendarCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.vehicle = make_vehicle()
+        self.day = timezone.localdate() + timedelta(days=40)
+        self.user = UserProfile.objects.create_user('calendar@example.com', 'Secret-pass-123', is_active=True)
+
+    def booked(self):
+        return month_bitmaps([self.vehicle.pk], self.day.year, self.day.month)[self.vehicle.pk][self.day.day - 1]
+
+    def book_elsewhere(self):
+        # As another worker would: its version bump only reaches this one through a shared cache
+        Booking.objects.create(
+            user=self.user, vehicle=self.vehicle, start_date=self.day, end_date=self.day,
+            total_price=Decimal('100.00'), status='confirmed',
+        )
+
+    def test_month_kept_until_it_expires(self):
+        self.assertFalse(self.booked())
+        self.book_elsewhere()
+        self.assertFalse(self.booked())
+
+    @override_settings(CALENDAR_CACHE_LOCAL_TTL=0)
+    def test_expired_month_recomputed(self):
+        self.assertFalse(self.booked())
+        self.book_elsewhere()
+        self.assertTrue(self.booked())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class QueryBudgetTests(TestCase):
+    """
+    Every endpoint in booking/urls.py runs a fixed number of queries, however
+    many rows there are. Requests are force-authenticated, so the budgets
+    leave out the token lookup; on_commit work (rollups, vehicle status) is
+    not counted either.
+    """
+    ROWS = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = UserProfile.objects.create_user('admin@example.com', 'Secret-pass-123', is_active=True, roles='admin')
+        cls.customer = UserProfile.objects.create_user('budget@example.com', 'Secret-pass-123', is_active=True)
+        cls.locations = [
+            Location.objects.create(name=f'Branch {n}', address=f'{n} Moi Avenue', city='Nairobi') for n in range(2)
+        ]
+        start = timezone.localdate() + timedelta(days=30)
+        cls.bookings = []
+        for n in range(cls.ROWS):
+            booking = Booking.objects.create(
+                user=cls.customer, vehicle=make_vehicle(f'Car {n}'), pickup_location=cls.locations[0],
+                dropoff_location=cls.locations[1], start_date=start, end_date=start + timedelta(days=2),
+                total_price=Decimal('300.00'), status='pending',
+            )
+            cls.bookings.append(booking)
+            report = DamageReport.objects.create(booking=booking, description='Scratched door')
+            DamagePhoto.objects.create(damage_report=report, image=f'damage-reports/{n}.jpg', thumbnail=f'damage-reports/thumbnails/{n}.webp')
+        cls.free_vehicle = make_vehicle('Free car')
+
+    def setUp(self):
+        # Warm the per-process reference data the way a running worker has it
+        cache.clear()
+        reference_data()
+        self.client = APIClient()
+
+    def use_temporary_media(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            DAMAGE_PHOTO_UPLOAD_DIR=f'{directory.name}/private', MEDIA_ROOT=f'{directory.name}/media'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def as_user(self, user):
+        self.client.force_authenticate(user)
+        return self.client
+
+    def test_my_bookings(self):
+        client = self.as_user(self.customer)
+        with self.assertNumQueries(1):
+            response = client.get('/api/my-bookings/')
+        self.assertEqual(len(response.data['results']), self.ROWS)
+
+    def test_all_bookings(self):
+        client = self.as_user(self.admin)
+        with self.assertNumQueries(1):
+            response = client.get('/api/all-bookings/')
+        self.assertEqual(len(response.data['results']), self.ROWS)
+
+    def test_booking_status_update(self):
+        client = self.as_user(self.admin)
+        # the booking with its details, the old dates for the rollups, the update
+        with self.assertNumQueries(3):
+            response = client.put(f'/api/bookings/{self.bookings[0].pk}/status/', {'status': 'confirmed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_booking(self):
+        client = self.as_user(self.customer)
+        start = timezone.localdate() + timedelta(days=5)
+        # vehicle, seasonal rates, discounts, then the locked check-and-insert
+        # (its SAVEPOINT/RELEASE are BEGIN/COMMIT outside a test); locations
+        # come from the reference data
+        with self.assertNumQueries(8):
+            response = client.post('/api/bookings/', {
+                'vehicle': self.free_vehicle.pk, 'pickup_location': self.locations[0].pk,
+                'dropoff_location': self.locations[1].pk, 'start_date': start, 'end_date': start + timedelta(days=2),
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_locations(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/locations/')
+        self.assertEqual(len(response.data), 2)
+
+    def test_reference(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/reference/')
+        self.assertEqual(len(response.data['locations']), 2)
+
+    def test_create_location(self):
+        client = self.as_user(self.admin)
+        with self.assertNumQueries(1):
+            response = client.post('/api/locations/new/', {'name': 'Airport', 'address': 'Terminal 1', 'city': 'Nairobi'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_customer_damage_reports(self):
+        client = self.as_user(self.customer)
+        # count, page, photos
+        with self.assertNumQueries(3):
+            response = client.get('/api/damage-reports/')
+        self.assertEqual(len(response.data['results']), self.ROWS)
+
+    def test_admin_damage_reports(self):
+        client = self.as_user(self.admin)
+        # count, page, photos
+        with self.assertNumQueries(3):
+            response = client.get('/api/admin/damage-reports/')
+        self.assertEqual(len(response.data['results']), self.ROWS)
+
+    def test_admin_damage_report_detail(self):
+        client = self.as_user(self.admin)
+        report = self.bookings[0].damagereport
+        with self.assertNumQueries(2):
+            response = client.get(f'/api/admin/damage-reports/{report.pk}/')
+        self.assertEqual(len(response.data['photos']), 1)
+
+    def test_create_damage_report(self):
+        booking = Booking.objects.create(
+            user=self.customer, vehicle=self.free_vehicle, start_date=timezone.localdate(),
+            end_date=timezone.localdate(), total_price=Decimal('100.00'), status='completed',
+        )
+        client = self.as_user(self.customer)
+        with self.assertNumQueries(6):
+            response = client.post('/api/damage-reports/', {'booking': booking.pk, 'description': 'Flat tyre'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+
+    def test_delete_booking(self):
+        client = self.as_user(self.admin)
+        # the booking, what cascades from it (report, photos, uploads), three DELETEs
+        with self.assertNumQueries(7):
+            response = client.delete(f'/api/bookings/{self.bookings[0].pk}/delete/')
+        self.assertEqual(response.status_code, 204)
+
+    def test_bulk_status_update(self):
+        client = self.as_user(self.admin)
+        # the locked read and one UPDATE, whatever the number of ids
+        with self.assertNumQueries(4):
+            response = client.post(
+                '/api/bookings/bulk-status/', {'ids': [booking.pk for booking in self.bookings], 'status': 'confirmed'},
+                format='json',
+            )
+        self.assertEqual(response.data['updated'], self.ROWS)
+
+    def test_update_location(self):
+        client = self.as_user(self.admin)
+        with self.assertNumQueries(2):
+            response = client.patch(f'/api/locations/{self.locations[0].pk}/update/', {'city': 'Mombasa'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_location(self):
+        client = self.as_user(self.admin)
+        # the location, one UPDATE per foreign key set to NULL, the DELETE
+        with self.assertNumQueries(5):
+            response = client.delete(f'/api/locations/{self.locations[0].pk}/delete/')
+        self.assertEqual(response.status_code, 204)
+
+    def test_export_bookings(self):
+        client = self.as_user(self.admin)
+        with self.assertNumQueries(1):
+            lines = b''.join(client.get('/api/admin/export/bookings/').streaming_content).splitlines()
+        self.assertEqual(len(lines), self.ROWS + 1)
+
+    def test_export_damage_reports(self):
+        client = self.as_user(self.admin)
+        with self.assertNumQueries(1):
+            lines = b''.join(client.get('/api/admin/export/damage-reports/').streaming_content).splitlines()
+        self.assertEqual(len(lines), self.ROWS + 1)
+
+    def test_quotes(self):
+        start = timezone.localdate() + timedelta(days=5)
+        # seasonal rates and discounts for this worker's rate table (the cache was
+        # cleared, so its version moved), then the vehicles
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/quotes/', {'start_date': start, 'end_date': start + timedelta(days=2)})
+        self.assertEqual(len(response.data['results']), self.ROWS + 1)
+
+    def test_calendar(self):
+        ids = ','.join(str(booking.vehicle_id) for booking in self.bookings)
+        month = self.bookings[0].start_date.strftime('%Y-%m')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/calendar/', {'vehicle': ids, 'month': month})
+        self.assertEqual(len(response.data['vehicles']), self.ROWS)
+        # Cached bitmaps: only the vehicle lookup
+        with self.assertNumQueries(1):
+            self.client.get('/api/calendar/', {'vehicle': ids, 'month': month})
+
+    def test_analytics(self):
+        client = self.as_user(self.admin)
+        with self.assertNumQueries(2):
+            response = client.get('/api/admin/analytics/', {'group_by': 'car_type,location'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_occupancy(self):
+        client = self.as_user(self.admin)
+        month = self.bookings[0].start_date.strftime('%Y-%m')
+        with self.assertNumQueries(2):
+            response = client.get('/api/admin/occupancy/', {'month': month})
+        self.assertEqual(response.data['car_types'][0]['vehicles'], self.ROWS + 1)
+
+    def test_photo_upload(self):
+        self.use_temporary_media()
+        client = self.as_user(self.customer)
+        report = self.bookings[0].damagereport
+        photos = [io.BytesIO(jpeg_bytes()) for _ in range(3)]
+        for number, photo in enumerate(photos):
+            photo.name = f'door-{number}.jpg'
+        # the report, the photo slots, one INSERT for all the photos
+        with self.assertNumQueries(6):
+            response = client.post(f'/api/damage-reports/{report.pk}/photos/', {'photos': photos}, format='multipart')
+        self.assertEqual(len(response.data), 3)
+
+    def test_resumable_photo_upload(self):
+        self.use_temporary_media()
+        client = self.as_user(self.customer)
+        report = self.bookings[0].damagereport
+        photo = jpeg_bytes()
+        with self.assertNumQueries(4):
+            response = client.post(
+                f'/api/damage-reports/{report.pk}/photo-uploads/', {'filename': 'door.jpg', 'size': len(photo)},
+                format='json',
+            )
+        url = response['Location']
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get(url).data['offset'], 0)
+        with self.assertNumQueries(5):
+            response = client.patch(
+                url, photo, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0'
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_cancel_photo_upload(self):
+        self.use_temporary_media()
+        upload = DamagePhotoUpload.objects.create(
+            damage_report=self.bookings[0].damagereport, filename='door.jpg', size=100
+        )
+        client = self.as_user(self.customer)
+        with self.assertNumQueries(2):
+            response = client.delete(f'/api/damage-photo-uploads/{upload.pk}/')
+        self.assertEqual(response.status_code, 204)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = UserProfile.objects.create_user('pages@example.com', 'Secret-pass-123', is_active=True)
+        vehicle = make_vehicle()
+        start = timezone.localdate()
+        Booking.objects.bulk_create([
+            Booking(user=cls.customer, vehicle=vehicle, start_date=start, end_date=start,
+                    total_price=Decimal('100.00'), status='pending')
+            for _ in range(5)
+        ])
+        # As from the importer or one bulk_create: every row shares created_at
+        Booking.objects.update(created_at=timezone.now())
+        cls.ids = list(Booking.objects.order_by('-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def walk(self, url, direction):
+        ids = []
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                ids.append([row['id'] for row in response.data['results']])
+                url = response.data[direction]
+        # Every page is a range scan from the cursor, never an OFFSET
+        self.assertFalse(any('OFFSET' in query['sql'] for query in queries))
+        return ids, response
+
+    def test_rows_sharing_created_at(self):
+        pages, last = self.walk('/api/my-bookings/?page_size=2', 'next')
+        self.assertEqual(pages, [self.ids[0:2], self.ids[2:4], self.ids[4:]])
+
+        pages, _ = self.walk(last.data['previous'], 'previous')
+        self.assertEqual(pages, [self.ids[2:4], self.ids[0:2]])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ServerTimingTests(TestCase):
+    def test_building_rows_is_serialization(self):
+        customer = UserProfile.objects.create_user('timing@example.com', 'Secret-pass-123', is_active=True)
+        client = APIClient()
+        client.force_authenticate(customer)
+
+        def slow_serialize(*args, **kwargs):
+            time.sleep(0.05)
+            return serialize_bookings(*args, **kwargs)
+
+        with mock.patch('booking.views.serialize_bookings', slow_serialize):
+            timing = client.get('/api/my-bookings/')['Server-Timing']
+        durations = dict(re.findall(r'(\w+);dur=([\d.]+)', timing))
+        self.assertGreaterEqual(float(durations['serialize']), 50)
+        self.assertLess(float(durations['app']), 50)
+
+
+class FastBookingSerializerParityTests(TestCase):
+    """serialize_bookings() renders byte for byte what BookingSerializer does"""
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = UserProfile.objects.create_user(
+            'parity@example.com', 'Secret-pass-123', is_active=True, full_name='Wanjiru Kamau',
+            phone_number='+254700000000', license_number='DL-1234', agree_terms=True,
+        )
+        bare_customer = UserProfile.objects.create_user('bare@example.com', 'Secret-pass-123', is_active=True)
+        location = Location.objects.create(name='Airport', address='Terminal 1', city='Nairobi')
+        start = timezone.localdate() + timedelta(days=7)
+        # Both locations and a vehicle photo
+        Booking.objects.create(
+            user=customer, vehicle=make_vehicle('Prado', image='vehicles/prado.jpg', daily_rate=Decimal('85.50')),
+            pickup_location=location, dropoff_location=location, start_date=start, end_date=start + timedelta(days=3),
+            total_price=Decimal('342.00'), status='confirmed',
+        )
+        # Null locations (deleted branch), no vehicle photo, sparse user
+        Booking.objects.create(
+            user=bare_customer, vehicle=make_vehicle('Probox'), pickup_location=None, dropoff_location=None,
+            start_date=start, end_date=start, total_price=Decimal('100.00'), status='pending',
+        )
+
+    def assert_parity(self, request):
+        queryset = Booking.objects.order_by('-created_at', '-id')
+        expected = BookingSerializer(queryset.with_details(), many=True, context={'request': request}).data
+        actual = serialize_bookings(queryset.values(*BOOKING_COLUMNS), request)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+        return actual
+
+    def test_absolute_urls(self):
+        rows = self.assert_parity(APIRequestFactory().get('/api/my-bookings/'))
+        self.assertTrue(rows[1]['vehicle_image'].startswith('http://testserver/'))
+
+    def test_relative_urls(self):
+        rows = self.assert_parity(None)
+        self.assertIsNone(rows[0]['vehicle_image'])
+        self.assertIsNone(rows[0]['pickup_location_detail'])
+
+
+def jpeg_bytes(width=40, height=30):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 10, 10)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ResumablePhotoUploadTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            DAMAGE_PHOTO_UPLOAD_DIR=f'{directory.name}/private', MEDIA_ROOT=f'{directory.name}/media'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = UserProfile.objects.create_user('photos@example.com', 'Secret-pass-123', is_active=True)
+        booking = Booking.objects.create(
+            user=user, vehicle=make_vehicle(), start_date=timezone.localdate(), end_date=timezone.localdate(),
+            total_price=Decimal('100.00'), status='completed',
+        )
+        self.report = DamageReport.objects.create(booking=booking, description='Dented bumper')
+        self.photo = jpeg_bytes()
+        self.upload = DamagePhotoUpload.objects.create(damage_report=self.report, filename='bumper.jpg', size=len(self.photo))
+        self.url = f'/api/damage-photo-uploads/{self.upload.pk}/'
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def patch(self, data, offset):
+        return self.client.patch(
+            self.url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_resumed_upload(self):
+        half = len(self.photo) // 2
+        response = self.patch(self.photo[:half], 0)
+        self.assertEqual(response.data, {'offset': half})
+        self.assertEqual(self.patch(self.photo[half:], 0).status_code, 409)
+        response = self.patch(self.photo[half:], half)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['processing'])
+        self.assertFalse(DamagePhotoUpload.objects.exists())
+
+    def test_second_writer_gets_conflict(self):
+        # As a request in another worker process would: flock works across processes
+        with open_partial(self.upload):
+            self.assertEqual(self.patch(self.photo, 0).status_code, 409)
+        self.assertEqual(self.patch(self.photo, 0).status_code, 201)
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=40 * 30 - 1)
+    def test_too_many_pixels(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.patch(self.photo, 0)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('megapixels', response.data['error'])
+        self.assertFalse(partial_path(self.upload).exists())
+
+    def test_processing_checks_pixels(self):
+        (upload_dir() / 'pending.jpg').write_bytes(self.photo)
+        photo = DamagePhoto.objects.create(damage_report=self.report, pending_file='pending.jpg')
+        with override_settings(IMAGE_UPLOAD_MAX_PIXELS=40 * 30 - 1), self.assertRaisesMessage(ValueError, 'megapixels'):
+            process_photo(photo.pk)
+        process_photo(photo.pk)
+        photo.refresh_from_db()
+        self.assertEqual(photo.pending_file, '')
+        self.assertTrue(photo.thumbnail.name.endswith('-thumb.webp'))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class LockAfterCommitTests(TransactionTestCase):
+    """A lock error in an on_commit hook must not re-run a view whose writes are committed"""
+
+    def setUp(self):
+        self.user = UserProfile.objects.create_user('locks@example.com', 'Secret-pass-123', is_active=True)
+        self.vehicle = make_vehicle()
+        self.location = Location.objects.create(name='Airport', address='Terminal 1', city='Nairobi')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        locked = mock.patch('booking.rollups.refresh_rollups', side_effect=OperationalError('database is locked'))
+        locked.start()
+        self.addCleanup(locked.stop)
+
+    def test_create_booking(self):
+        start = timezone.localdate() + timedelta(days=3)
+        response = self.client.post('/api/bookings/', {
+            'vehicle': self.vehicle.pk, 'pickup_location': self.location.pk, 'dropoff_location': self.location.pk,
+            'start_date': start, 'end_date': start + timedelta(days=2),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_delete_booking(self):
+        start = timezone.localdate() + timedelta(days=3)
+        booking = Booking.objects.create(
+            user=self.user, vehicle=self.vehicle, start_date=start, end_date=start, total_price=Decimal('100.00'),
+            status='pending',
+        )
+        self.assertEqual(self.client.delete(f'/api/bookings/{booking.pk}/delete/').status_code, 204)
+        self.assertFalse(Booking.objects.exists())
+
+
+class VehicleStatusQueueTests(TestCase):
+    @mock.patch('booking.vehicle_status.recompute_vehicle_status')
+    def test_rolled_back_vehicles_forgotten(self, recompute):
+        with self.assertRaises(ValueError), transaction.atomic():
+            queue_vehicle_status(1)
+            raise ValueError
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_vehicle_status(2)
+            queue_vehicle_status(3)
+        recompute.assert_called_once_with({2, 3})
+
+
+class RollupQueueTests(TestCase):
+    @mock.patch('booking.rollups.refresh_rollups')
+    def test_rolled_back_ranges_forgotten(self, refresh):
+        day = timezone.localdate()
+        with self.assertRaises(ValueError), transaction.atomic():
+            queue_rollup(1, day, day)
+            raise ValueError
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_rollup(2, day, day)
+            queue_rollup(2, day - timedelta(days=1), day)
+        refresh.assert_called_once_with({2: (day - timedelta(days=1), day)})
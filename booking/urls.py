@@ -5,11 +5,18 @@ urlpatterns = [
     # Customer endpoints
     path('bookings/', views.create_booking_view, name='booking-create'),   # POST - user creates booking
     path('my-bookings/', views.my_bookings, name='booking-my-list'),       # GET  - user views own bookings
+    path('quotes/', views.quote_view, name='booking-quotes'),              # GET  - price the catalog for a date range
+    path('calendar/', views.calendar_view, name='booking-calendar'),       # GET  - booked/free days per vehicle for a month
 
     # Admin endpoints
     path('all-bookings/', views.all_booking_view, name='booking-all-list'),   # GET - admin: view all bookings
     path('bookings/<int:pk>/status/', views.update_booking_status_view, name='booking-status-update'),  # PUT - admin updates booking status
+    path('bookings/bulk-status/', views.bulk_update_booking_status_view, name='booking-bulk-status-update'),  # POST - admin updates many
     path('bookings/<int:pk>/delete/', views.delete_booking_view, name='delete-booking'),
+    path('admin/export/bookings/', views.export_bookings_view, name='export-bookings'),   # GET - admin: stream CSV/NDJSON
+    path('admin/analytics/', views.analytics_view, name='booking-analytics'),   # GET - admin: revenue/utilisation rollups
+    path('admin/occupancy/', views.occupancy_view, name='booking-occupancy'),   # GET - admin: occupancy heatmap by car type
+    path('admin/export/damage-reports/', views.export_damage_reports_view, name='export-damage-reports'),
 
 
     # Location Endpoints
@@ -17,9 +24,13 @@ urlpatterns = [
     path('locations/', views.location_list_view, name='location-list'),
     path('locations/<int:pk>/update/', views.update_location, name='location-update'),
     path('locations/<int:pk>/delete/', views.location_delete_view, name='location-delete'),
+    path('reference/', views.reference_view, name='booking-reference'),   # GET - locations and vehicle choices for the booking form
 
     # Damage Report Endpoints
     path('damage-reports/', views.DamageReportView.as_view(), name='damage-report-list-create'),
     path('admin/damage-reports/', views.AdminDamageReportView.as_view(), name='admin-damage-reports'),
-    path('admin/damage-reports/<int:pk>/', views.AdminDamageReportDetailView.as_view, name='admin-damage-report-detail')
+    path('admin/damage-reports/<int:pk>/', views.AdminDamageReportDetailView.as_view(), name='admin-damage-report-detail'),
+    path('damage-reports/<int:pk>/photos/', views.damage_photo_upload_view, name='damage-photo-upload'),   # POST - multipart, several photos
+    path('damage-reports/<int:pk>/photo-uploads/', views.damage_photo_upload_create_view, name='damage-photo-upload-create'),   # POST - start a resumable upload
+    path('damage-photo-uploads/<uuid:upload_id>/', views.damage_photo_upload_detail_view, name='damage-photo-upload-detail'),   # GET offset, PATCH bytes, DELETE cancel
 ]
\ No newline at end of file
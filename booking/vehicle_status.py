@@ -0,0 +1,41 @@
+from django.db.models import Exists, OuterRef
+
+from jobunyacar.transactions import on_commit_batch
+from vehicles.cache import invalidate_catalog
+from vehicles.models import Vehicle
+
+from .models import Booking
+
+
+def recompute_vehicle_status(vehicle_ids=None):
+    """
+    Set Vehicle.status from its bookings in two set-based UPDATEs:
+    'Booked' while it has a confirmed booking, 'Available' otherwise.
+
+    Only rows whose status actually changes are written, and only the
+    status column. vehicle_ids=None reconciles the whole fleet.
+    Returns the number of vehicles changed.
+    """
+    vehicles = Vehicle.objects.all()
+    if vehicle_ids is not None:
+        vehicles = vehicles.filter(pk__in=vehicle_ids)
+
+    confirmed = Exists(Booking.objects.filter(vehicle=OuterRef('pk'), status='confirmed'))
+    changed = vehicles.filter(confirmed).exclude(status='Booked').update(status='Booked')
+    changed += vehicles.filter(~confirmed).exclude(status='Available').update(status='Available')
+
+    if changed:
+        # update() bypasses the Vehicle signals that normally do this
+        invalidate_catalog()
+    return changed
+
+
+def queue_vehicle_status(vehicle_id):
+    """
+    Recompute this vehicle's status once the current transaction commits.
+    Vehicles queued by several booking changes in one transaction are
+    recomputed together, once; a rollback forgets them.
+    """
+    # robust: a failed recompute is logged instead of failing a request whose
+    # booking is already committed; reconcile_vehicle_status repairs it
+    on_commit_batch(recompute_vehicle_status, lambda vehicle_ids: vehicle_ids.add(vehicle_id), set)
@@ -1,13 +1,43 @@
+import calendar
+import re
+from decimal import Decimal
+
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 from rest_framework import generics, permissions
-
-from .serializers import BookingSerializer, DamageReportSerializer, LocationSerializer
-from .models import Booking, DamageReport, Location
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.db import transaction
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .serializers import (
+    BookingSerializer, DamagePhotoSerializer, DamagePhotoUploadSerializer, DamageReportSerializer, LocationSerializer
+)
+from .models import Booking, DailyBookingRollup, DamagePhotoUpload, DamageReport, Location
 from .permissions import IsAdminRole
+from .vehicle_status import queue_vehicle_status
+from .pricing import quote_catalog
+from .calendar import invalidate_vehicle_calendars, month_bitmaps, occupancy_by_car_type
+from .rollups import queue_rollup
+from .reference import reference_data
+from .photos import (
+    UploadInProgress, append_chunks, attach_photos, check_image, open_partial, partial_path
+)
+from .fast_serializers import BOOKING_COLUMNS, serialize_bookings
+from vehicles.models import Vehicle
+from vehicles.filters import VehicleFilter, available_between
+from .exports import (
+    EXPORT_FORMATS, BOOKING_EXPORT_FIELDS, DAMAGE_REPORT_EXPORT_FIELDS, stream_export
+)
+from jobunyacar.pagination import paginate_rows
+from jobunyacar.sqlite import retry_on_lock
 
 # Create your views here.
 
@@ -40,9 +70,18 @@ def location_list_view(request):
     """
     Display List Of Location Options
     """
-    location = Location.objects.all()
-    serializer = LocationSerializer(location, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(reference_data().location_data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def reference_view(request):
+    """
+    Everything the booking form picks from: locations and the vehicle
+    car type, fuel and transmission choices
+    """
+    reference = reference_data()
+    return Response({'locations': reference.location_data, **reference.vehicle_choices}, status=status.HTTP_200_OK)
 
 
 
@@ -101,10 +140,123 @@ def location_delete_view(request,pk):
     return Response({'message': 'Location deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
 
+# ---------Quotes-------
+
+QUOTE_DEFAULT_LIMIT = 50
+QUOTE_MAX_LIMIT = 500
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def quote_view(request):
+    """
+    GET: Price the (filtered) catalog for a date range, cheapest first
+    Query: ?start_date=&end_date= plus any vehicle filter (car_type, min_seats, ...),
+    &available_only=true to skip vehicles booked on those dates, &limit=
+    """
+    start_date = parse_date(request.query_params.get('start_date', ''))
+    end_date = parse_date(request.query_params.get('end_date', ''))
+    if not start_date or not end_date:
+        return Response({'error': 'start_date and end_date (YYYY-MM-DD) are required'}, status=status.HTTP_400_BAD_REQUEST)
+    if end_date < start_date:
+        return Response({'error': 'End date cannot be before start date'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = min(int(request.query_params.get('limit', QUOTE_DEFAULT_LIMIT)), QUOTE_MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+    vehicle_filter = VehicleFilter(request.query_params, queryset=Vehicle.objects.all(), request=request)
+    if not vehicle_filter.is_valid():
+        return Response(vehicle_filter.errors, status=status.HTTP_400_BAD_REQUEST)
+    vehicles = vehicle_filter.qs
+    if request.query_params.get('available_only') in ('true', '1'):
+        vehicles = available_between(vehicles, start_date, end_date)
+
+    return Response({
+        'start_date': start_date,
+        'end_date': end_date,
+        'days': (end_date - start_date).days + 1,
+        'results': quote_catalog(vehicles, start_date, end_date, limit=max(limit, 0)),
+    }, status=status.HTTP_200_OK)
+
+
+# ---------Availability Calendar-------
+
+CALENDAR_MAX_VEHICLES = 100
+
+
+def _parse_month(value):
+    """'YYYY-MM' -> (year, month), the current month when empty, None if invalid"""
+    if not value:
+        today = timezone.localdate()
+        return today.year, today.month
+    match = re.fullmatch(r'(\d{4})-(\d{2})', value)
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def calendar_view(request):
+    """
+    GET: Booked/free days of one or more vehicles for a month
+    Query: ?vehicle=1,2,3&month=YYYY-MM (defaults to the current month)
+    Each vehicle gets a bitmap string with one character per day, '1' = booked.
+    """
+    month = _parse_month(request.query_params.get('month'))
+    if month is None:
+        return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        ids = [int(pk) for pk in request.query_params.get('vehicle', '').split(',') if pk.strip()]
+    except ValueError:
+        return Response({'error': 'vehicle must be a comma separated list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if not ids:
+        return Response({'error': 'vehicle is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > CALENDAR_MAX_VEHICLES:
+        return Response({'error': f'At most {CALENDAR_MAX_VEHICLES} vehicles per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+    vehicle_ids = list(Vehicle.objects.filter(pk__in=ids).order_by('id').values_list('id', flat=True))
+    bitmaps = month_bitmaps(vehicle_ids, *month)
+    return Response({
+        'month': '%04d-%02d' % month,
+        'days': calendar.monthrange(*month)[1],
+        'vehicles': [
+            {'vehicle': vehicle_id, 'booked': ''.join('1' if day else '0' for day in bitmaps[vehicle_id])}
+            for vehicle_id in vehicle_ids
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def occupancy_view(request):
+    """
+    GET: Admin heatmap of fleet occupancy per car type and day of a month
+    Query: ?month=YYYY-MM (defaults to the current month)
+    """
+    if request.user.roles != 'admin':
+        return Response({'error': 'Only Admins can view fleet occupancy'}, status=status.HTTP_403_FORBIDDEN)
+
+    month = _parse_month(request.query_params.get('month'))
+    if month is None:
+        return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+
+    vehicles = list(Vehicle.objects.order_by('id').values_list('id', 'car_type'))
+    return Response({
+        'month': '%04d-%02d' % month,
+        'days': calendar.monthrange(*month)[1],
+        'car_types': occupancy_by_car_type(vehicles, *month),
+    }, status=status.HTTP_200_OK)
+
+
 # Booking placements 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@retry_on_lock
 def create_booking_view(request):
     """
     POST: Logged in users can book a vehicle
@@ -121,6 +273,7 @@ def create_booking_view(request):
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
+@retry_on_lock
 def delete_booking_view(request, pk):
     """
     DELETE: Allow user to delete a booking slot
@@ -134,7 +287,7 @@ def delete_booking_view(request, pk):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    if booking.user != request.user and not request.user.roles == 'admin':
+    if booking.user_id != request.user.pk and not request.user.roles == 'admin':
         return Response(
             {'detail' : "You don't have permissions to delete this booking slot."},
             status=status.HTTP_403_FORBIDDEN
@@ -154,9 +307,8 @@ def my_bookings(request):
     """
     GET: List all booking made by customer in their dashboard
     """
-    bookings = Booking.objects.filter(user=request.user)
-    serializer = BookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = Booking.objects.filter(user=request.user).values(*BOOKING_COLUMNS)
+    return paginate_rows(request, bookings, serialize_bookings)
 
 
     
@@ -169,13 +321,13 @@ def  all_booking_view(request):
     if request.user.roles != 'admin':
         return Response({'error': 'Only Admins can view all bookings'}, status=status.HTTP_403_FORBIDDEN)
     
-    bookings = Booking.objects.all().order_by('-created_at')
-    serializer = BookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = Booking.objects.values(*BOOKING_COLUMNS)
+    return paginate_rows(request, bookings, serialize_bookings)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
+@retry_on_lock
 def update_booking_status_view(request, pk):
     """
     PUT:Admin updates the booking status 
@@ -184,7 +336,7 @@ def update_booking_status_view(request, pk):
         return Response({'error' : 'Only Admin can update booking status'}, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        booking = Booking.objects.get(pk=pk)
+        booking = Booking.objects.with_details().get(pk=pk)
     except Booking.DoesNotExist:
         return Response({'error' : 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -199,6 +351,191 @@ def update_booking_status_view(request, pk):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+BULK_STATUS_MAX_IDS = 1000
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@retry_on_lock
+def bulk_update_booking_status_view(request):
+    """
+    POST: Admin moves many bookings to one status
+    Body: { "ids": [1, 2, 3], "status": "completed" }
+    Valid transitions are applied with a single UPDATE and each affected
+    vehicle's status is recomputed once. Returns a result per id.
+    """
+    if request.user.roles != 'admin':
+        return Response({'error' : 'Only Admin can update booking status'}, status=status.HTTP_403_FORBIDDEN)
+
+    status_value = request.data.get('status')
+    if status_value not in ['confirmed',  'cancelled', 'completed']:
+        return Response({'error' : 'Invalid status value'}, status=status.HTTP_400_BAD_REQUEST)
+
+    ids = request.data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+        return Response({'error': 'ids must be a non-empty list of booking ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > BULK_STATUS_MAX_IDS:
+        return Response({'error': f'At most {BULK_STATUS_MAX_IDS} bookings per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+    allowed_from = [
+        current for current, targets in Booking.ALLOWED_TRANSITIONS.items() if status_value in targets
+    ]
+
+    with transaction.atomic():
+        current = {
+            pk: (booking_status.lower(), vehicle_id, start_date, end_date)
+            for pk, booking_status, vehicle_id, start_date, end_date in Booking.objects.select_for_update()
+            .filter(pk__in=ids).values_list('id', 'status', 'vehicle_id', 'start_date', 'end_date')
+        }
+
+        results, to_update = [], []
+        for pk in dict.fromkeys(ids):
+            if pk not in current:
+                results.append({'id': pk, 'result': 'not_found'})
+            elif current[pk][0] not in allowed_from:
+                results.append({'id': pk, 'result': 'invalid_transition', 'from': current[pk][0]})
+            else:
+                results.append({'id': pk, 'result': 'updated', 'from': current[pk][0]})
+                to_update.append(pk)
+
+        if to_update:
+            Booking.objects.filter(pk__in=to_update).update(status=status_value)
+            # update() sends no post_save, so queue the vehicles ourselves
+            vehicle_ids = {current[pk][1] for pk in to_update}
+            for vehicle_id in vehicle_ids:
+                queue_vehicle_status(vehicle_id)
+            transaction.on_commit(lambda: invalidate_vehicle_calendars(vehicle_ids))
+            for pk in to_update:
+                queue_rollup(*current[pk][1:])
+
+    return Response(
+        {'status': status_value, 'updated': len(to_update), 'results': results},
+        status=status.HTTP_200_OK
+    )
+
+
+# ---------Admin Export Endpoints-------
+
+def _filter_export(request, queryset, date_field, status_choices):
+    """
+    Apply ?date_from, ?date_to and ?status to an export queryset.
+    Returns (queryset, error_response).
+    """
+    for param, lookup in (('date_from', 'gte'), ('date_to', 'lte')):
+        value = request.query_params.get(param)
+        if value:
+            parsed = parse_date(value)
+            if parsed is None:
+                return None, Response({'error': f'{param} must be a YYYY-MM-DD date'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(**{f'{date_field}__{lookup}': parsed})
+
+    status_value = request.query_params.get('status')
+    if status_value:
+        if status_value not in dict(status_choices):
+            return None, Response({'error': 'Invalid status value'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = queryset.filter(status=status_value)
+
+    return queryset, None
+
+
+def _export_format(request):
+    export_format = request.query_params.get('output', 'csv')
+    return export_format if export_format in EXPORT_FORMATS else None
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def export_bookings_view(request):
+    """
+    GET: Admin streams bookings as CSV or NDJSON
+    Query: ?output=csv|ndjson&date_from=&date_to= (on start_date)&status=
+    """
+    export_format = _export_format(request)
+    if export_format is None:
+        return Response({'error': 'output must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+
+    bookings, error = _filter_export(request, Booking.objects.order_by('id'), 'start_date', Booking.STATUS_CHOICES)
+    if error:
+        return error
+    return stream_export(bookings, BOOKING_EXPORT_FIELDS, export_format, 'bookings')
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def export_damage_reports_view(request):
+    """
+    GET: Admin streams damage reports as CSV or NDJSON
+    Query: ?output=csv|ndjson&date_from=&date_to= (on created_at)&status=
+    """
+    export_format = _export_format(request)
+    if export_format is None:
+        return Response({'error': 'output must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+
+    reports, error = _filter_export(
+        request, DamageReport.objects.order_by('id'), 'created_at__date', DamageReport.STATUS_CHOICES
+    )
+    if error:
+        return error
+    return stream_export(reports, DAMAGE_REPORT_EXPORT_FIELDS, export_format, 'damage-reports')
+
+
+# ---------Admin Analytics-------
+
+ANALYTICS_GROUPS = {
+    'date': ['date'],
+    'month': ['month'],
+    'car_type': ['car_type'],
+    'vehicle': ['vehicle_id', 'vehicle__name'],
+    'location': ['location_id', 'location__name'],
+}
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def analytics_view(request):
+    """
+    GET: Admin revenue and utilisation report, read from the daily rollups
+    Query: ?group_by=car_type,location (any of date, month, car_type, vehicle, location)
+    &date_from=&date_to= (YYYY-MM-DD, inclusive)
+    """
+    group_by = [name for name in request.query_params.get('group_by', '').split(',') if name]
+    unknown = [name for name in group_by if name not in ANALYTICS_GROUPS]
+    if unknown:
+        return Response(
+            {'error': f"Cannot group by {', '.join(unknown)}; choose from {', '.join(ANALYTICS_GROUPS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    rollups = DailyBookingRollup.objects.all()
+    for param, lookup in (('date_from', 'gte'), ('date_to', 'lte')):
+        value = request.query_params.get(param)
+        if value:
+            parsed = parse_date(value)
+            if parsed is None:
+                return Response({'error': f'{param} must be a YYYY-MM-DD date'}, status=status.HTTP_400_BAD_REQUEST)
+            rollups = rollups.filter(**{f'date__{lookup}': parsed})
+
+    if 'month' in group_by:
+        rollups = rollups.annotate(month=TruncMonth('date'))
+    columns = [column for name in group_by for column in ANALYTICS_GROUPS[name]]
+    totals = {
+        'revenue': Coalesce(Sum('revenue'), Value(Decimal('0')), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        'booked_days': Coalesce(Sum('booked_days'), 0),
+        'bookings': Coalesce(Sum('bookings'), 0),
+    }
+
+    results = list(rollups.values(*columns).annotate(**totals).order_by(*columns)) if columns else []
+    overall = rollups.aggregate(**totals)
+    for row in [overall, *results]:
+        # Money as a string, the way BookingSerializer renders total_price
+        row['revenue'] = format(row['revenue'], '.2f')
+    return Response({
+        'group_by': group_by,
+        'totals': overall,
+        'results': results,
+    }, status=status.HTTP_200_OK)
+
+
 # ---------Damge Report Enpoints-------
 
 class DamageReportView(generics.ListCreateAPIView):
@@ -210,7 +547,9 @@ class DamageReportView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """Only return reports for bookings owned by the logged in user"""
-        return DamageReport.objects.filter(booking__user=self.request.user)
+        return DamageReport.objects.filter(booking__user=self.request.user).select_related(
+            'booking__user', 'booking__vehicle', 'booking__pickup_location', 'booking__dropoff_location'
+        ).prefetch_related('photos').order_by('-created_at')
     
     def perform_create(self,serializer):
         """Save a new damage report"""
@@ -219,7 +558,9 @@ class DamageReportView(generics.ListCreateAPIView):
 
 class AdminDamageReportView(generics.ListAPIView):
     """Lists all damage reports from the users"""
-    queryset = DamageReport.objects.all().select_related('booking__vehicle', 'booking__user')
+    queryset = DamageReport.objects.all().select_related(
+        'booking__vehicle', 'booking__user', 'booking__pickup_location', 'booking__dropoff_location'
+    ).prefetch_related('photos').order_by('-created_at')
     serializer_class = DamageReportSerializer
     permission_classes = [IsAdminRole]
 
@@ -228,7 +569,9 @@ class AdminDamageReportDetailView(generics.RetrieveUpdateAPIView):
     """
     Admin can view or update the status of a damage report.
     """
-    queryset = DamageReport.objects.all().select_related('booking', 'booking__vehicle', 'booking__user')
+    queryset = DamageReport.objects.all().select_related(
+        'booking__vehicle', 'booking__user', 'booking__pickup_location', 'booking__dropoff_location'
+    ).prefetch_related('photos')
     serializer_class = DamageReportSerializer
     permission_classes = [IsAdminRole]
 
@@ -237,14 +580,166 @@ class AdminDamageReportDetailView(generics.RetrieveUpdateAPIView):
         Override serializer for PATCH (update) requests to only allow updating `status`.
         """
         serializer_class = self.get_serializer_class()
+        kwargs.setdefault('context', self.get_serializer_context())
         if self.request.method in ['PATCH', 'PUT']:
             # Only make 'status' writable
             kwargs['partial'] = True
             serializer = serializer_class(*args, **kwargs)
             serializer.fields['booking'].read_only = True
             serializer.fields['description'].read_only = True
-            serializer.fields['images'].read_only = True
             serializer.fields['user_details'] = serializer.fields.get('user_details', None)
         else:
             serializer = serializer_class(*args, **kwargs)
-        return serializer
\ No newline at end of file
+        # Unlike the listings, a single report links the full-size photos
+        serializer.fields['photos'] = DamagePhotoSerializer(many=True, read_only=True)
+        return serializer
+
+
+def _damage_report_for(request, pk):
+    """The report if the user may add photos to it (its customer or an admin), else None"""
+    reports = DamageReport.objects.all()
+    if request.user.roles != 'admin':
+        reports = reports.filter(booking__user=request.user)
+    return reports.filter(pk=pk).first()
+
+
+def _photo_slots(report):
+    """How many more photos (finished or still uploading) the report can take"""
+    taken = report.photos.count() + report.photo_uploads.count()
+    return settings.DAMAGE_PHOTOS_PER_REPORT - taken
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def damage_photo_upload_view(request, pk):
+    """
+    Attach photos to a damage report in one multipart request (field `photos`,
+    repeatable). Files are streamed to disk, never held in memory; for large
+    photos on flaky connections use the resumable uploads below.
+    """
+    report = _damage_report_for(request, pk)
+    if report is None:
+        return Response({'error': 'Damage report not found'}, status=status.HTTP_404_NOT_FOUND)
+    if not request.content_type.startswith('multipart/form-data'):
+        return Response({'error': 'Send the photos as multipart/form-data'}, status=status.HTTP_400_BAD_REQUEST)
+
+    request._request.upload_handlers = [TemporaryFileUploadHandler(request._request)]
+    files = request.FILES.getlist('photos')
+    if not files:
+        return Response({'error': 'No photos were sent'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(files) > _photo_slots(report):
+        return Response(
+            {'error': f'A damage report can have at most {settings.DAMAGE_PHOTOS_PER_REPORT} photos'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Check every file before keeping any
+    checked, errors = [], {}
+    for upload in files:
+        if upload.size > settings.DAMAGE_PHOTO_MAX_BYTES:
+            errors[upload.name] = f'Photos must be at most {settings.DAMAGE_PHOTO_MAX_BYTES // (1024 * 1024)} MB.'
+            continue
+        try:
+            checked.append((upload, check_image(upload.temporary_file_path())))
+        except ValueError as exc:
+            errors[upload.name] = str(exc)
+    if errors:
+        return Response({'photos': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        photos = attach_photos(report, [(upload.temporary_file_path(), extension) for upload, extension in checked])
+    serializer = DamagePhotoSerializer(photos, many=True, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def damage_photo_upload_create_view(request, pk):
+    """
+    Start a resumable photo upload: `{"filename": "...", "size": <bytes>}`.
+    Send the bytes with PATCH to the returned upload's URL.
+    """
+    report = _damage_report_for(request, pk)
+    if report is None:
+        return Response({'error': 'Damage report not found'}, status=status.HTTP_404_NOT_FOUND)
+    if _photo_slots(report) < 1:
+        return Response(
+            {'error': f'A damage report can have at most {settings.DAMAGE_PHOTOS_PER_REPORT} photos'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = DamagePhotoUploadSerializer(data=request.data)
+    if serializer.is_valid():
+        upload = serializer.save(damage_report=report)
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED,
+            headers={'Location': reverse('damage-photo-upload-detail', args=[upload.pk]), 'Upload-Offset': '0'}
+        )
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def damage_photo_upload_detail_view(request, upload_id):
+    """
+    GET/HEAD: how far a resumable upload got (`offset`, also the Upload-Offset header).
+    PATCH: append the raw request body at the `Upload-Offset` header, which must equal
+    the current offset. The request that completes the file returns the new photo (201).
+    DELETE: cancel the upload.
+    """
+    uploads = DamagePhotoUpload.objects.select_related('damage_report')
+    if request.user.roles != 'admin':
+        uploads = uploads.filter(damage_report__booking__user=request.user)
+    upload = uploads.filter(pk=upload_id).first()
+    if upload is None:
+        return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'DELETE':
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    if request.method == 'GET':
+        serializer = DamagePhotoUploadSerializer(upload)
+        return Response(serializer.data, headers={'Upload-Offset': str(serializer.data['offset'])})
+
+    # One writer per upload; a retry racing a request still in flight gets a 409
+    try:
+        with open_partial(upload) as partial:
+            return _append_to_upload(request, upload, partial)
+    except UploadInProgress:
+        return Response({'error': 'This upload is already receiving data'}, status=status.HTTP_409_CONFLICT)
+
+
+def _append_to_upload(request, upload, partial):
+    """PATCH of damage_photo_upload_detail_view, holding the partial file's lock"""
+    offset = partial.tell()
+    if request.headers.get('Upload-Offset') != str(offset):
+        return Response(
+            {'error': 'Upload-Offset does not match the bytes received so far', 'offset': offset},
+            status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': str(offset)}
+        )
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or '')
+    except ValueError:
+        return Response({'error': 'Content-Length is required'}, status=status.HTTP_411_LENGTH_REQUIRED)
+    if offset + length > upload.size:
+        return Response(
+            {'error': f'The upload is {upload.size} bytes; {upload.size - offset} remain'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    # request.stream is the unparsed body: read in chunks, never loaded whole
+    offset = append_chunks(partial, request.stream, length)
+    if offset < upload.size:
+        return Response({'offset': offset}, headers={'Upload-Offset': str(offset)})
+
+    try:
+        extension = check_image(partial_path(upload))
+    except ValueError as exc:
+        upload.delete()
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    with transaction.atomic():
+        [photo] = attach_photos(upload.damage_report, [(partial_path(upload), extension)])
+        upload.delete()
+    serializer = DamagePhotoSerializer(photo, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_201_CREATED, headers={'Upload-Offset': str(offset)})
\ No newline at end of file
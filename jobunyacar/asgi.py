@@ -2,6 +2,8 @@
 ASGI config for jobunyacar project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests are resolved against ASGI_URLCONF, which serves the hot read
+endpoints from async views; everything else runs the same sync views as WSGI.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -9,8 +11,20 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobunyacar.settings')
 
-application = get_asgi_application()
+
+class JobunyacarASGIHandler(ASGIHandler):
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = JobunyacarASGIHandler()
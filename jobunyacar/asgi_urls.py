@@ -0,0 +1,38 @@
+"""
+URLconf served by jobunyacar.asgi: the routes of jobunyacar.urls, in the
+same order and under the same names, with the hot read endpoints swapped
+for their async views.
+"""
+from django.urls import URLPattern, URLResolver
+
+from booking import async_views as booking_views
+from rental_app import async_views as rental_views
+from vehicles import async_views as vehicle_views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+# url name -> async view
+ASYNC_VIEWS = {
+    'location-list': booking_views.location_list_view,
+    'booking-my-list': booking_views.my_bookings,
+    'vehicle-list-create': vehicle_views.vehicle_list_view,
+    'vehicle-detail': vehicle_views.vehicle_detail_view,
+    'user-profile': rental_views.me_view,
+}
+
+
+def _swap(patterns):
+    swapped = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver) and pattern.app_name != 'admin':
+            pattern = URLResolver(
+                pattern.pattern, _swap(pattern.url_patterns), pattern.default_kwargs,
+                pattern.app_name, pattern.namespace,
+            )
+        elif isinstance(pattern, URLPattern) and pattern.name in ASYNC_VIEWS:
+            pattern = URLPattern(pattern.pattern, ASYNC_VIEWS[pattern.name], pattern.default_args, pattern.name)
+        swapped.append(pattern)
+    return swapped
+
+
+urlpatterns = _swap(sync_urlpatterns)
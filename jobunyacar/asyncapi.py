@@ -0,0 +1,75 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from rental_app.authentication import CachedTokenAuthentication
+
+from .renderers import TimedJSONRenderer
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+authenticator = CachedTokenAuthentication()
+
+
+def json_response(data, status=200, headers=None):
+    """What DRF would send for `data` with the JSON renderer, built on the event loop"""
+    response = HttpResponse(
+        TimedJSONRenderer().render(data), status=status, content_type='application/json', headers=headers
+    )
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _finalize(response):
+    if not isinstance(response, Response):
+        return response
+    headers = {header: value for header, value in response.items() if header != 'Content-Type'}
+    return json_response(response.data, response.status_code, headers)
+
+
+def _error_response(request, exc):
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        exc.auth_header = authenticator.authenticate_header(request)
+    return _finalize(exception_handler(exc, {}))
+
+
+def async_read_view(sync_view, authenticated=False):
+    """
+    Serve GET/HEAD on `sync_view`'s route from the decorated coroutine,
+    and every other method from `sync_view` itself, in a thread as Django
+    runs any sync view under ASGI.
+
+    The coroutine gets a DRF Request authenticated by token like the sync
+    views (authenticated=True answers anonymous requests with DRF's 401)
+    and may return a DRF Response, rendered as JSON, or any HttpResponse.
+    API errors it raises become DRF's usual error responses.
+    """
+    fallback = sync_to_async(sync_view)
+
+    def decorator(handler):
+        @csrf_exempt
+        @functools.wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return await fallback(request, *args, **kwargs)
+
+            drf_request = Request(request)
+            try:
+                drf_request.user, drf_request.auth = (
+                    await authenticator.aauthenticate(drf_request) or (AnonymousUser(), None)
+                )
+                if authenticated and not drf_request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                return _finalize(await handler(drf_request, *args, **kwargs))
+            except (exceptions.APIException, Http404) as exc:
+                return _error_response(drf_request, exc)
+        return view
+    return decorator
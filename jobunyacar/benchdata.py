@@ -0,0 +1,177 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import Booking, DamageReport, Location
+from booking.rollups import rebuild_rollups
+from booking.vehicle_status import recompute_vehicle_status
+from vehicles.cache import invalidate_catalog
+from vehicles.models import Vehicle
+
+UserProfile = get_user_model()
+
+# Every synthetic row is tagged so it can be found and flushed again
+BENCH_EMAIL_DOMAIN = 'bench.example.com'
+BENCH_ADMIN_EMAIL = f'admin@{BENCH_EMAIL_DOMAIN}'
+BENCH_PASSWORD = 'Bench-password-2025'
+BENCH_NAME_PREFIX = 'Bench'
+BENCH_IMAGE = 'vehicles/bench.jpg'
+
+MAKES = ['Toyota Corolla', 'Toyota Land Cruiser', 'Nissan X-Trail', 'Subaru Forester', 'Mazda Demio',
+         'Mercedes GLE', 'Range Rover Sport', 'Toyota Hiace', 'Isuzu NQR', 'Volkswagen Golf']
+CITIES = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret', 'Naivasha', 'Malindi', 'Nanyuki']
+
+
+def bench_data_exists():
+    return UserProfile.objects.filter(email=BENCH_ADMIN_EMAIL).exists()
+
+
+def flush_bench_data():
+    """Remove every row created by generate_bench_data"""
+    with transaction.atomic():
+        Booking.objects.filter(vehicle__slug__startswith='bench-').delete()
+        Vehicle.objects.filter(slug__startswith='bench-').delete()
+        UserProfile.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').delete()
+        Location.objects.filter(name__startswith=BENCH_NAME_PREFIX).delete()
+
+
+def _batched(objects, model, batch_size):
+    """bulk_create an iterable of unsaved objects batch by batch, returning the saved ones"""
+    created, batch = [], []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            created += model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        created += model.objects.bulk_create(batch)
+    return created
+
+
+def _vehicles(rng, count):
+    car_types = [value for value, _ in Vehicle.CAR_TYPE]
+    for i in range(count):
+        make = rng.choice(MAKES)
+        yield Vehicle(
+            name=f'{BENCH_NAME_PREFIX} {make} {i}', model=make.split()[-1], car_type=rng.choice(car_types),
+            description=f'{make} with air conditioning and unlimited mileage',
+            seats=rng.choice([2, 4, 5, 7, 14, 30]), transmission=rng.choice(['Automatic', 'Manual']),
+            fuel_type=rng.choice(['Diesel', 'Petrol', 'Hybrid', 'Electric']),
+            daily_rate=Decimal(rng.randrange(30, 400)), status='Available', features='AC, Bluetooth',
+            image=BENCH_IMAGE, slug=f'bench-{i}', min_days=rng.choice([None, 1, 2, 3]),
+        )
+
+
+def _users(count):
+    # Hash once: one PBKDF2 run per synthetic user would dominate generation time
+    password = make_password(BENCH_PASSWORD)
+    yield UserProfile(
+        email=BENCH_ADMIN_EMAIL, full_name='Bench Admin', phone_number='0700000000',
+        roles='admin', is_active=True, agree_terms=True, password=password,
+    )
+    for i in range(count):
+        yield UserProfile(
+            email=f'customer{i}@{BENCH_EMAIL_DOMAIN}', full_name=f'Bench Customer {i}',
+            phone_number=f'07{i:08d}', roles='customer', is_active=True, agree_terms=True, password=password,
+        )
+
+
+def _bookings(rng, count, vehicles, user_ids, location_ids, today):
+    """
+    Non-overlapping booking timelines per vehicle, centred on today:
+    finished bookings are completed (some cancelled), current and future
+    ones confirmed or pending.
+    """
+    per_vehicle, extra = divmod(count, len(vehicles))
+    for index, (vehicle_id, daily_rate) in enumerate(vehicles):
+        vehicle_count = per_vehicle + (index < extra)
+        day = today - timedelta(days=vehicle_count * 7 // 2)
+        for _ in range(vehicle_count):
+            day += timedelta(days=rng.randint(0, 6))
+            days = rng.randint(1, 7)
+            start_date, end_date = day, day + timedelta(days=days - 1)
+            day = end_date + timedelta(days=1)
+
+            if end_date < today:
+                status = 'cancelled' if rng.random() < 0.1 else 'completed'
+            elif start_date <= today:
+                status = 'confirmed'
+            else:
+                status = rng.choice(['pending', 'confirmed'])
+            yield Booking(
+                user_id=rng.choice(user_ids), vehicle_id=vehicle_id,
+                pickup_location_id=rng.choice(location_ids), dropoff_location_id=rng.choice(location_ids),
+                start_date=start_date, end_date=end_date, total_price=daily_rate * days, status=status,
+            )
+
+
+def generate_bench_data(vehicles=1000, users=5000, locations=20, bookings=100_000,
+                        damage_rate=0.01, seed=42, batch_size=5000, progress=None):
+    """
+    Fill the database with a synthetic fleet using bulk_create.
+
+    The same arguments and seed always produce the same rows. bulk_create
+    skips model signals, so the derived state they normally maintain
+    (vehicle status, rollups, catalog cache) is rebuilt at the end.
+    Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    progress = progress or (lambda message: None)
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        created_locations = _batched(
+            (Location(name=f'{BENCH_NAME_PREFIX} {CITIES[i % len(CITIES)]} {i}', address=f'{i} Bench Road',
+                      city=CITIES[i % len(CITIES)]) for i in range(locations)),
+            Location, batch_size,
+        )
+        created_users = _batched(_users(users), UserProfile, batch_size)
+        progress(f'{len(created_locations)} locations, {len(created_users)} users')
+
+        created_vehicles = _batched(_vehicles(rng, vehicles), Vehicle, batch_size)
+        progress(f'{len(created_vehicles)} vehicles')
+
+        customer_ids = [user.pk for user in created_users if user.roles == 'customer']
+        created_bookings = 0
+        damage_reports = []
+        booking_rows = _bookings(
+            rng, bookings, [(vehicle.pk, vehicle.daily_rate) for vehicle in created_vehicles],
+            customer_ids, [location.pk for location in created_locations], today,
+        )
+        batch = []
+        for booking in booking_rows:
+            batch.append(booking)
+            if len(batch) >= batch_size:
+                created_bookings += len(_save_bookings(batch, rng, damage_rate, damage_reports))
+                batch = []
+                progress(f'{created_bookings} bookings')
+        if batch:
+            created_bookings += len(_save_bookings(batch, rng, damage_rate, damage_reports))
+        DamageReport.objects.bulk_create(damage_reports, batch_size=batch_size)
+        progress(f'{created_bookings} bookings, {len(damage_reports)} damage reports')
+
+    recompute_vehicle_status()
+    rollups = rebuild_rollups()
+    invalidate_catalog()
+    progress(f'{rollups} rollup rows')
+
+    return {
+        'locations': len(created_locations),
+        'users': len(created_users),
+        'vehicles': len(created_vehicles),
+        'bookings': created_bookings,
+        'damage_reports': len(damage_reports),
+    }
+
+
+def _save_bookings(batch, rng, damage_rate, damage_reports):
+    saved = Booking.objects.bulk_create(batch)
+    for booking in saved:
+        if booking.status == 'completed' and rng.random() < damage_rate:
+            damage_reports.append(DamageReport(booking_id=booking.pk, description='Scratch on the rear bumper'))
+    return saved
@@ -0,0 +1,355 @@
+import io
+import logging
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+import django
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from booking.models import Booking, DailyBookingRollup, DamageReport, Location
+from vehicles.models import Vehicle
+
+from .benchdata import BENCH_ADMIN_EMAIL, BENCH_EMAIL_DOMAIN, BENCH_NAME_PREFIX, BENCH_PASSWORD
+
+UserProfile = get_user_model()
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def discover_routes(patterns=None, prefix=''):
+    """(url name, route) for every named API route, skipping the Django admin"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    routes = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name == 'admin':
+                continue
+            routes += discover_routes(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            routes.append((pattern.name, prefix + str(pattern.pattern)))
+    return routes
+
+
+def _jpeg(name='bench.jpg'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (200, 30, 30)).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+def bench_context():
+    """The sample rows route cases point at, picked from the synthetic data"""
+    admin = UserProfile.objects.get(email=BENCH_ADMIN_EMAIL)
+    booking = (
+        Booking.objects.filter(user__email__endswith=f'@{BENCH_EMAIL_DOMAIN}', status='pending')
+        .select_related('user', 'vehicle').order_by('id').first()
+    )
+    if booking is None:
+        booking = Booking.objects.filter(user__email__endswith=f'@{BENCH_EMAIL_DOMAIN}') \
+            .select_related('user', 'vehicle').order_by('id').first()
+    customer = booking.user
+    today = timezone.localdate()
+    return {
+        'admin': admin,
+        'customer': customer,
+        'booking': booking,
+        'customer_bookings': list(Booking.objects.filter(user=customer).values_list('id', flat=True)[:20]),
+        'unreported_booking': Booking.objects.filter(user=customer, damagereport__isnull=True).first(),
+        'damage_report': DamageReport.objects.order_by('id').first(),
+        'vehicle': booking.vehicle,
+        'vehicle_ids': list(Vehicle.objects.filter(slug__startswith='bench-').values_list('id', flat=True)[:20]),
+        'location': Location.objects.filter(name__startswith=BENCH_NAME_PREFIX).order_by('id').first(),
+        'today': today,
+        'tokens': {
+            'admin': Token.objects.get_or_create(user=admin)[0].key,
+            'customer': Token.objects.get_or_create(user=customer)[0].key,
+        },
+    }
+
+
+def _case(label, method, path, user=None, data=None, content_type='application/json'):
+    return {'label': label, 'method': method, 'path': path, 'user': user, 'data': data, 'content_type': content_type}
+
+
+def route_cases(ctx):
+    """
+    url name -> request cases. Every write runs inside a rolled back
+    transaction, so cases can reuse the same rows run after run.
+    """
+    today = ctx['today']
+    vehicle = ctx['vehicle']
+    booking = ctx['booking']
+    location = ctx['location']
+    report = ctx['damage_report']
+    month = today.strftime('%Y-%m')
+    window = f'start_date={today + timedelta(days=30)}&end_date={today + timedelta(days=36)}'
+    far_future = today + timedelta(days=3650)
+    vehicle_payload = {
+        'name': 'Bench Import', 'model': 'Corolla', 'car_type': 'Small Car', 'description': 'bench',
+        'seats': 5, 'transmission': 'Manual', 'fuel_type': 'Petrol', 'daily_rate': '55.00',
+        'status': 'Available', 'image': 'vehicles/bench.jpg',
+    }
+
+    cases = {
+        # rental_app
+        'user-register': [_case('register', 'post', '/api/user/register/', data={
+            'full_name': 'Bench Signup', 'email': f'signup@{BENCH_EMAIL_DOMAIN}', 'phone_number': '0711111111',
+            'agree_terms': True, 'password': BENCH_PASSWORD, 'password2': BENCH_PASSWORD,
+        })],
+        'user-login': [_case('login', 'post', '/api/user/login/', data={
+            'email': ctx['customer'].email, 'password': BENCH_PASSWORD,
+        })],
+        'password-reset-request': [_case('reset request', 'post', '/api/user/password-reset/', data={
+            'email': ctx['customer'].email,
+        })],
+        'password-reset-confirm': [_case('reset confirm', 'post', '/api/user/password-reset-confirm/', data={
+            'uid': urlsafe_base64_encode(force_bytes(ctx['customer'].pk)),
+            'user_id': urlsafe_base64_encode(force_bytes(ctx['customer'].pk)),
+            'token': default_token_generator.make_token(ctx['customer']),
+            'new_password': 'Another-bench-password-1',
+        })],
+        'user-logout': [_case('logout', 'post', '/api/user/logout/', user='customer')],
+        'user-profile': [_case('me', 'get', '/api/user/me/', user='customer')],
+        'user-change-password': [_case('change password', 'post', '/api/user/change-password/', user='customer', data={
+            'old_password': BENCH_PASSWORD, 'new_password': 'Another-bench-password-1',
+        })],
+        'user-list': [_case('customer list', 'get', '/api/user/customer-list/', user='admin')],
+
+        # vehicles
+        'vehicle-list-create': [
+            _case('list', 'get', '/api/vehicles/'),
+            _case('list filtered', 'get', '/api/vehicles/?car_type=SUV%20Car&ordering=daily_rate'),
+            _case('search', 'get', '/api/vehicles/?search=toyota'),
+            _case('available between', 'get',
+                  f'/api/vehicles/?available_from={today + timedelta(days=30)}&available_to={today + timedelta(days=36)}'),
+            _case('create', 'post', '/api/vehicles/', user='admin', content_type=None,
+                  data=lambda: {**vehicle_payload, 'image': _jpeg()}),
+        ],
+        'vehicle-import': [_case('import 50', 'post', '/api/vehicles/import/', user='admin',
+                                 data=[{**vehicle_payload, 'name': f'Bench Import {i}'} for i in range(50)])],
+        'vehicle-detail': [
+            _case('detail', 'get', f'/api/vehicles/{vehicle.slug}/'),
+            _case('update', 'put', f'/api/vehicles/{vehicle.slug}/', user='admin', data={'daily_rate': '99.00'}),
+            _case('delete', 'delete', f'/api/vehicles/{vehicle.slug}/', user='admin'),
+        ],
+
+        # booking
+        'booking-create': [_case('create', 'post', '/api/bookings/', user='customer', data={
+            'vehicle': vehicle.pk, 'pickup_location': location.pk, 'dropoff_location': location.pk,
+            'start_date': str(far_future), 'end_date': str(far_future + timedelta(days=3)),
+        })],
+        'booking-my-list': [_case('my bookings', 'get', '/api/my-bookings/', user='customer')],
+        'booking-quotes': [
+            _case('quote catalog', 'get', f'/api/quotes/?{window}'),
+            _case('quote available', 'get', f'/api/quotes/?{window}&available_only=true&limit=10'),
+        ],
+        'booking-calendar': [_case('20 vehicles', 'get',
+                                   f"/api/calendar/?month={month}&vehicle={','.join(map(str, ctx['vehicle_ids']))}")],
+        'booking-all-list': [_case('all bookings', 'get', '/api/all-bookings/', user='admin')],
+        'booking-status-update': [_case('confirm', 'put', f'/api/bookings/{booking.pk}/status/', user='admin',
+                                        data={'status': 'confirmed'})],
+        'booking-bulk-status-update': [_case('cancel 20', 'post', '/api/bookings/bulk-status/', user='admin',
+                                             data={'ids': ctx['customer_bookings'], 'status': 'cancelled'})],
+        'delete-booking': [_case('delete', 'delete', f'/api/bookings/{booking.pk}/delete/', user='customer')],
+        'export-bookings': [_case('one month csv', 'get',
+                                  f'/api/admin/export/bookings/?date_from={today.replace(day=1)}'
+                                  f'&date_to={today.replace(day=1) + timedelta(days=30)}', user='admin')],
+        'export-damage-reports': [_case('ndjson', 'get', '/api/admin/export/damage-reports/?output=ndjson', user='admin')],
+        'booking-analytics': [_case('car type x location', 'get',
+                                    '/api/admin/analytics/?group_by=car_type,location', user='admin')],
+        'booking-occupancy': [_case('month heatmap', 'get', f'/api/admin/occupancy/?month={month}', user='admin')],
+        'location-create': [_case('create', 'post', '/api/locations/new/', user='admin',
+                                  data={'name': 'Bench New', 'address': '1 Road', 'city': 'Nairobi'})],
+        'location-list': [_case('list', 'get', '/api/locations/')],
+        'location-update': [_case('update', 'put', f'/api/locations/{location.pk}/update/', user='admin',
+                                  data={'name': location.name, 'address': '2 Road', 'city': location.city})],
+        'location-delete': [_case('delete', 'delete', f'/api/locations/{location.pk}/delete/', user='admin')],
+        'damage-report-list-create': [_case('list', 'get', '/api/damage-reports/', user='customer')],
+        'admin-damage-reports': [_case('list', 'get', '/api/admin/damage-reports/', user='admin')],
+    }
+    if ctx['unreported_booking'] is not None:
+        cases['damage-report-list-create'].append(_case('create', 'post', '/api/damage-reports/', user='customer', data={
+            'booking': ctx['unreported_booking'].pk, 'description': 'Bench dent',
+        }))
+    if report is not None:
+        cases['admin-damage-report-detail'] = [
+            _case('detail', 'get', f'/api/admin/damage-reports/{report.pk}/', user='admin'),
+            _case('resolve', 'patch', f'/api/admin/damage-reports/{report.pk}/', user='admin',
+                  data={'status': 'resolved'}),
+        ]
+    return cases
+
+
+def _send(client, case, tokens):
+    data = case['data']() if callable(case['data']) else case['data']
+    kwargs = {}
+    if case['user']:
+        kwargs['HTTP_AUTHORIZATION'] = f"Token {tokens[case['user']]}"
+    if data is not None:
+        kwargs['data'] = data
+        if case['content_type']:
+            kwargs['content_type'] = case['content_type']
+
+    with transaction.atomic():
+        response = getattr(client, case['method'])(case['path'], **kwargs)
+        # Streaming responses do their work while being consumed
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        transaction.set_rollback(True)
+    return response.status_code, len(body)
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts and times every query"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def measure_case(client, case, tokens, iterations, warmup):
+    for _ in range(warmup):
+        _send(client, case, tokens)
+
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        status_code, size = _send(client, case, tokens)
+
+    tracemalloc.start()
+    try:
+        _send(client, case, tokens)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        _send(client, case, tokens)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings = np.array(timings)
+
+    return {
+        'status': status_code,
+        'response_bytes': size,
+        'latency_ms': {
+            'mean': round(float(timings.mean()), 3),
+            'min': round(float(timings.min()), 3),
+            'max': round(float(timings.max()), 3),
+            **{f'p{p}': round(float(value), 3) for p, value in zip(PERCENTILES, np.percentile(timings, PERCENTILES))},
+        },
+        'queries': queries.count,
+        'query_time_ms': round(queries.seconds * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(iterations=30, warmup=3, only=None, progress=None):
+    """
+    Benchmark every case of every route (or the url names in `only`).
+    Returns a JSON-serialisable report.
+    """
+    progress = progress or (lambda message: None)
+    ctx = bench_context()
+    cases = route_cases(ctx)
+    routes = discover_routes()
+
+    results, missing = [], []
+    media_root = tempfile.TemporaryDirectory(prefix='bench-media-')
+    overrides = override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        SECURE_SSL_REDIRECT=False,
+        MEDIA_ROOT=media_root.name,
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        # Every case repeats the same login/register; measure the views, not the 429s
+        AUTH_RATE_LIMITS={},
+    )
+    # 500s are part of the results; don't also dump their tracebacks
+    request_logger = logging.getLogger('django.request')
+    log_level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        with media_root, overrides:
+            client = Client(raise_request_exception=False)
+            for name, route in routes:
+                if only and name not in only:
+                    continue
+                if name not in cases:
+                    missing.append({'name': name, 'route': route})
+                    continue
+                for case in cases[name]:
+                    result = measure_case(client, case, ctx['tokens'], iterations, warmup)
+                    results.append({
+                        'name': name, 'route': route, 'case': case['label'],
+                        'method': case['method'].upper(), 'path': case['path'], **result,
+                    })
+                    progress(results[-1])
+    finally:
+        request_logger.setLevel(log_level)
+
+    return {
+        'meta': {
+            'generated_at': timezone.now().isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': {'vendor': connection.vendor, 'name': str(connection.settings_dict['NAME'])},
+            'iterations': iterations,
+            'warmup': warmup,
+            'rows': {
+                'vehicles': Vehicle.objects.count(),
+                'users': UserProfile.objects.count(),
+                'locations': Location.objects.count(),
+                'bookings': Booking.objects.count(),
+                'damage_reports': DamageReport.objects.count(),
+                'rollups': DailyBookingRollup.objects.count(),
+            },
+        },
+        'results': results,
+        'unbenchmarked': missing,
+    }
+
+
+def compare_reports(baseline, current):
+    """(name, case, baseline p50, current p50, baseline p95, current p95) for cases in both reports"""
+    previous = {(row['name'], row['case']): row for row in baseline['results']}
+    rows = []
+    for row in current['results']:
+        old = previous.get((row['name'], row['case']))
+        if old is not None:
+            rows.append((row['name'], row['case'], old['latency_ms']['p50'], row['latency_ms']['p50'],
+                         old['latency_ms']['p95'], row['latency_ms']['p95']))
+    return rows
@@ -0,0 +1,15 @@
+from django.conf import settings
+
+# Backends whose entries live in (or never leave) one worker process
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared(alias='default'):
+    """
+    Whether every worker process sees the same `alias` cache, so a key set
+    by one (a revocation, a version bump, a pin) is seen by all of them
+    """
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
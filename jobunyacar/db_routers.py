@@ -0,0 +1,39 @@
+import contextvars
+
+from django.conf import settings
+
+# Alias of the replica the current request may read from, None for the primary, or a
+# callable returning either, asked on each read (ReplicaRoutingMiddleware's choice)
+replica_alias = contextvars.ContextVar('replica_alias', default=None)
+
+# A token or session issued a moment ago must authenticate, however far a replica lags
+PRIMARY_ONLY_APPS = {'authtoken', 'sessions'}
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads go to the replica ReplicaRoutingMiddleware picked for the request,
+    everything else (writes, reads outside eligible requests) to `default`.
+    Replicas are copies of the primary and are never migrated themselves.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return 'default'
+        alias = replica_alias.get()
+        if callable(alias):
+            alias = alias()
+        return alias or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
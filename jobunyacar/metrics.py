@@ -0,0 +1,165 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; roughly exponential from 5ms to 10s
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def total(self):
+        with self._lock:
+            return sum(self._values.values())
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (not cumulative), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", _number(bound))])} {cumulative}'
+                    )
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", "+Inf")])} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text format.
+    Each worker process keeps its own; scrape every worker.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'Requests handled, by view, method and status code', ('view', 'method', 'status')
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Wall time from the first middleware to the response', ('view', 'method')
+)
+DB_QUERIES = REGISTRY.histogram(
+    'http_request_db_queries', 'Database queries per request', ('view', 'method'), QUERY_COUNT_BUCKETS
+)
+DB_DURATION = REGISTRY.histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request', ('view', 'method')
+)
+SERIALIZE_DURATION = REGISTRY.histogram(
+    'http_request_serialize_duration_seconds',
+    'Time spent turning rows into response data (list endpoints) and encoding the response body per request',
+    ('view', 'method'),
+)
+SLOW_QUERIES = REGISTRY.counter(
+    'db_slow_queries_total', 'Queries slower than SLOW_QUERY_THRESHOLD_MS, by view', ('view',)
+)
+
+
+class RequestTimings:
+    """What PerformanceMiddleware accumulates while one request runs"""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+current_timings = contextvars.ContextVar('current_timings', default=None)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Count the block as serialization time of the current request, less
+    the time of any queries it runs (lazy relations), which stay db time
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started, db_seconds = time.perf_counter(), timings.db_seconds
+    try:
+        yield
+    finally:
+        timings.serialize_seconds += time.perf_counter() - started - (timings.db_seconds - db_seconds)
@@ -0,0 +1,248 @@
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .caches import cache_is_shared
+from .db_routers import replica_alias, replica_aliases
+from .metrics import (
+    DB_DURATION, DB_QUERIES, REQUEST_DURATION, REQUESTS, SERIALIZE_DURATION, SLOW_QUERIES,
+    RequestTimings, current_timings,
+)
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('jobunyacar.slow_queries')
+
+# Label for requests that never resolved to a view (404s), to keep label values bounded
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    return match.view_name or match._func_path
+
+
+class QueryTimer:
+    """
+    connection.execute_wrapper that times the queries of the request in
+    current_timings and logs the slow ones.
+
+    Installed once on every connection rather than around each request, so
+    it also sees the queries an ASGI request runs in its executor thread:
+    the timings travel there in the copied context.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        timings = current_timings.get()
+        if timings is None:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            timings.db_queries += 1
+            timings.db_seconds += elapsed
+            if elapsed >= self.threshold:
+                request = timings.request
+                view = view_name(request)
+                SLOW_QUERIES.inc(view)
+                slow_query_logger.warning(
+                    '%.1f ms on %s [view=%s %s %s]: %s',
+                    elapsed * 1000, context['connection'].alias, view, request.method, request.path, sql,
+                )
+
+
+def install_query_timer(connection, threshold):
+    if not any(isinstance(wrapper, QueryTimer) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryTimer(threshold))
+
+
+class PerformanceMiddleware:
+    """
+    Times every request: wall time, database queries (count and time) and
+    serialization (metrics.timed_serialization). Adds a Server-Timing header, feeds the /metrics
+    histograms (labelled by resolved view name) and logs queries slower
+    than SLOW_QUERY_THRESHOLD_MS to the jobunyacar.slow_queries logger.
+
+    Streaming responses are timed up to the first byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+        connection_created.connect(
+            lambda sender, connection, **kwargs: install_query_timer(connection, threshold),
+            weak=False, dispatch_uid='jobunyacar.query_timer',
+        )
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(connection, threshold)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        timings = RequestTimings(request)
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._record(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings(request)
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self._record(request, response, timings, time.perf_counter() - started)
+
+    def _record(self, request, response, timings, total):
+        view = view_name(request)
+        REQUESTS.inc(view, request.method, str(response.status_code))
+        REQUEST_DURATION.observe(total, view, request.method)
+        DB_QUERIES.observe(timings.db_queries, view, request.method)
+        DB_DURATION.observe(timings.db_seconds, view, request.method)
+        SERIALIZE_DURATION.observe(timings.serialize_seconds, view, request.method)
+
+        app = max(total - timings.db_seconds - timings.serialize_seconds, 0)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries"',
+            f'serialize;dur={timings.serialize_seconds * 1000:.1f}',
+            f'app;dur={app * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        return response
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _pin_key(user_id):
+    return f'db:primary-pin:user:{user_id}'
+
+
+def _user_id(request):
+    # DRF puts the user it authenticated back on the Django request
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+class ReplicaChoice:
+    """
+    The database a replica-eligible request reads from, decided on its
+    first read rather than before the view: by then DRF has authenticated
+    the request, so a user pinned to the primary is recognised whatever
+    credentials they send.
+    """
+    _undecided = object()
+
+    def __init__(self, request, replicas):
+        self.request = request
+        self.replicas = replicas
+        self.alias = self._undecided
+
+    def __call__(self):
+        if self.alias is self._undecided:
+            # Reads made while finding out who this is go to the primary
+            self.alias = None
+            user_id = _user_id(self.request)
+            if user_id is None or not cache.get(_pin_key(user_id)):
+                self.alias = random.choice(self.replicas)
+        return self.alias
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets safe requests to the views in REPLICA_READ_VIEWS read from a
+    random read replica; everything else stays on the primary.
+
+    A user who just wrote something is pinned to the primary for
+    REPLICA_PIN_SECONDS, by user id in the shared cache, so e.g.
+    my-bookings right after creating a booking never reads from a lagging
+    replica, whichever worker serves it. Without a shared cache
+    (jobunyacar.caches) a pin would only reach one worker, so replicas
+    are not used at all.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.replicas = replica_aliases()
+        if not self.replicas:
+            raise MiddlewareNotUsed
+        if not cache_is_shared():
+            logger.warning('Read replicas are configured but the default cache is per process; reading from the primary only')
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.views = set(getattr(settings, 'REPLICA_READ_VIEWS', ()))
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django would otherwise run the sync hook in a thread on every request
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        token = replica_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_alias.reset(token)
+
+        user_id = self._writer(request, response)
+        if user_id is not None:
+            cache.set(_pin_key(user_id), True, self.pin_seconds)
+        return response
+
+    async def __acall__(self, request):
+        token = replica_alias.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_alias.reset(token)
+
+        # Only writes look the user up, which may query the session
+        user_id = await sync_to_async(self._writer)(request, response) if self._wrote(request, response) else None
+        if user_id is not None:
+            await cache.aset(_pin_key(user_id), True, self.pin_seconds)
+        return response
+
+    def _wrote(self, request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    def _writer(self, request, response):
+        """Id of the user whose successful write this was, if any"""
+        return _user_id(request) if self._wrote(request, response) else None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in SAFE_METHODS and request.resolver_match.view_name in self.views:
+            replica_alias.set(ReplicaChoice(request, self.replicas))
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return self.process_view(request, view_func, view_args, view_kwargs)
@@ -0,0 +1,163 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+from .metrics import timed_serialization
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    The cursor holds the last row's values of every ordering field, and
+    each page is a `(created_at, id) < cursor` range scan on the
+    (created_at, id) index each paginated model has, instead of an OFFSET:
+    page 1,000 costs the same as page 1, even when many rows share a
+    created_at (bulk_create). Orderings from ?ordering= get id appended,
+    so every position is unique.
+
+    Used by the list endpoints that opt in (pagination_class or the
+    helpers below); responses have next/previous links but no `count`.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        # Full-text search results page by relevance unless ?ordering= is given
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get('ordering'):
+            return ('search_rank', '-id')
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not {'id', '-id'} & set(ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination.paginate_queryset, filtering on the whole ordering
+        # instead of its first field
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self._after(current_position, reverse))
+
+        # One extra row tells whether there is a following page
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _after(self, position, reverse):
+        """
+        Rows past `position` in the direction of travel, e.g. for
+        ('-created_at', '-id'): created_at <= c AND (created_at < c OR
+        (created_at = c AND id < i)). The first term is redundant but keeps
+        the query a range scan on the index.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        fields, lookups = [], []
+        for order in self.ordering:
+            fields.append(order.lstrip('-'))
+            # Descending order walks down, unless the cursor walks backwards
+            lookups.append('lt' if order.startswith('-') != reverse else 'gt')
+
+        after = Q()
+        for index, (field, lookup) in enumerate(zip(fields, lookups)):
+            equal = {name: value for name, value in zip(fields[:index], values)}
+            after |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+        return Q(**{f'{fields[0]}__{lookups[0]}e': values[0]}) & after
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            values.append(instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name))
+        return json.dumps([str(value) for value in values])
+
+
+def paginate(request, queryset, serializer_class, **serializer_kwargs):
+    """
+    Paginated Response for function based list views; the serializer's
+    traversal of the page counts as serialization time in the metrics
+    """
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    with timed_serialization():
+        data = serializer_class(page, many=True, **serializer_kwargs).data
+    return paginator.get_paginated_response(data)
+
+
+def paginate_rows(request, queryset, build, **build_kwargs):
+    """
+    paginate() for read-only fast paths: pages a values() queryset and
+    turns the page's rows into response dicts with build(rows, **build_kwargs).
+    """
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    with timed_serialization():
+        data = build(page, **build_kwargs)
+    return paginator.get_paginated_response(data)
+
+
+async def apaginate_rows(request, queryset, build, **build_kwargs):
+    """
+    paginate_rows() for async views. The cursor paginator is synchronous,
+    so its single page query runs in the request's thread.
+    """
+    paginator = KeysetPagination()
+    page = await sync_to_async(paginator.paginate_queryset)(queryset, request)
+    with timed_serialization():
+        data = build(page, **build_kwargs)
+    return paginator.get_paginated_response(data)
@@ -0,0 +1,168 @@
+import functools
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+
+from .metrics import REGISTRY
+
+RATE_LIMIT_ALLOWED = REGISTRY.counter(
+    'auth_rate_limit_allowed_total', 'Attempts let through by the auth rate limiter, by view', ('view',)
+)
+RATE_LIMIT_REJECTED = REGISTRY.counter(
+    'auth_rate_limit_rejected_total',
+    'Attempts rejected by the auth rate limiter before any password work, by view and exhausted bucket (ip/email)',
+    ('view', 'key'),
+)
+
+
+class LocalBuckets:
+    """
+    Token buckets in this worker's memory: bounded, thread-safe, exact.
+    The least recently used buckets are dropped first; a dropped bucket
+    comes back full.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, claims, now):
+        with self._lock:
+            levels = [self._level(key, burst, rate, now) for key, burst, rate in claims]
+            refused = _first_empty(claims, levels)
+            if refused is not None:
+                return refused
+            for (key, _, _), tokens in zip(claims, levels):
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return None
+
+    def _level(self, key, burst, rate, now):
+        tokens, updated = self._buckets.get(key, (burst, now))
+        return min(burst, tokens + (now - updated) * rate)
+
+
+class CacheBuckets:
+    """
+    Token buckets in the default cache, shared by every worker using it.
+    Read-modify-write without a lock, so simultaneous attempts on the same
+    key from different workers may each get the last token.
+    """
+
+    def take(self, claims, now):
+        keys = [key for key, _, _ in claims]
+        stored = cache.get_many(keys)
+        levels = []
+        for key, burst, rate in claims:
+            tokens, updated = stored.get(key, (burst, now))
+            levels.append(min(burst, tokens + (now - updated) * rate))
+        refused = _first_empty(claims, levels)
+        if refused is not None:
+            return refused
+        # Keep a bucket until it would have refilled anyway
+        timeout = max(math.ceil(burst / rate) for _, burst, rate in claims)
+        cache.set_many({key: (tokens - 1, now) for key, tokens in zip(keys, levels)}, timeout)
+        return None
+
+
+def _first_empty(claims, levels):
+    """(index, seconds until it holds a token) of the first empty bucket, or None"""
+    for index, ((_, _, rate), tokens) in enumerate(zip(claims, levels)):
+        if tokens < 1:
+            return index, (1 - tokens) / rate
+    return None
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if getattr(settings, 'AUTH_RATE_LIMIT_BACKEND', 'local') == 'cache':
+            _backend = CacheBuckets()
+        else:
+            _backend = LocalBuckets(getattr(settings, 'AUTH_RATE_LIMIT_MAX_KEYS', 100_000))
+    return _backend
+
+
+def client_ip(request):
+    """
+    The client's address as seen by the outermost of TRUSTED_PROXY_HOPS
+    reverse proxies. Each of them appends the address it was connected
+    from to X-Forwarded-For, so the client is the hops-th entry from the
+    right; entries further left were sent by the client and are ignored.
+    Without trusted proxies, or with fewer entries than hops, REMOTE_ADDR.
+    """
+    hops = getattr(settings, 'TRUSTED_PROXY_HOPS', 0)
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    if hops <= 0:
+        return remote_addr
+    forwarded = [address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+    forwarded = [address for address in forwarded if address]
+    if len(forwarded) < hops:
+        return remote_addr
+    return forwarded[-hops]
+
+
+def normalized_email(request):
+    """The account's email for signed-in users, else the posted one; trimmed and lower-cased"""
+    if request.user.is_authenticated:
+        email = request.user.email
+    else:
+        data = request.data
+        email = data.get('email') if hasattr(data, 'get') else None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+def _bucket_key(scope, kind, value):
+    # Hashed so neither addresses nor emails end up in cache keys
+    return f'ratelimit:{scope}:{kind}:' + hashlib.sha256(value.encode()).hexdigest()
+
+
+def rate_limited(scope):
+    """
+    Token-bucket limit on a view, per client IP and per normalized email,
+    with the budgets in AUTH_RATE_LIMITS[scope]:
+    {'ip': {'burst': .., 'per_minute': ..}, 'email': {...}}. Every attempt
+    takes a token from both buckets; when either is empty the view never
+    runs and DRF answers 429 with Retry-After.
+
+    For views that hash or validate passwords: goes under
+    @api_view/@permission_classes and above @retry_on_lock, so a retried
+    attempt is only counted once.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            budgets = getattr(settings, 'AUTH_RATE_LIMITS', {}).get(scope)
+            if not budgets:
+                return view(request, *args, **kwargs)
+
+            claims, kinds = [], []
+            for kind, value in (('ip', client_ip(request)), ('email', normalized_email(request))):
+                budget = budgets.get(kind)
+                if budget and value:
+                    claims.append((_bucket_key(scope, kind, value), budget['burst'], budget['per_minute'] / 60))
+                    kinds.append(kind)
+
+            refused = get_backend().take(claims, time.time()) if claims else None
+            if refused is not None:
+                index, wait = refused
+                RATE_LIMIT_REJECTED.inc(scope, kinds[index])
+                raise Throttled(wait=math.ceil(wait))
+            RATE_LIMIT_ALLOWED.inc(scope)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
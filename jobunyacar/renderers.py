@@ -0,0 +1,11 @@
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import timed_serialization
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that reports its encoding time to PerformanceMiddleware"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed_serialization():
+            return super().render(data, accepted_media_type, renderer_context)
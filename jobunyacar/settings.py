@@ -11,6 +11,23 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Background threads resizing uploaded vehicle photos (vehicles/images.py)
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+
+# Gallery images uploaded with a vehicle (vehicles/gallery.py): checked before anything
+# is written, then written to storage by this many threads at once
+IMAGE_UPLOAD_WORKERS = int(os.environ.get('IMAGE_UPLOAD_WORKERS', 8))
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 50_000_000
+
+# Damage report photos (booking/photos.py). Uploads wait outside MEDIA_ROOT until
+# a background thread has stripped their EXIF, so GPS tags are never served.
+DAMAGE_PHOTO_UPLOAD_DIR = Path(os.environ.get('DAMAGE_PHOTO_UPLOAD_DIR', BASE_DIR / 'private' / 'damage-photo-uploads'))
+DAMAGE_PHOTO_MAX_BYTES = 20 * 1024 * 1024
+DAMAGE_PHOTOS_PER_REPORT = 10
+DAMAGE_PHOTO_UPLOAD_EXPIRY_HOURS = 24  # unfinished resumable uploads, see purge_damage_photo_uploads
+DAMAGE_PHOTO_WORKERS = int(os.environ.get('DAMAGE_PHOTO_WORKERS', 2))
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -67,6 +84,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobunyacar.middleware.PerformanceMiddleware',
+    'jobunyacar.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -102,6 +121,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'jobunyacar.wsgi.application'
+# jobunyacar.asgi resolves against this: ROOT_URLCONF with async views for the hot reads
+ASGI_URLCONF = 'jobunyacar.asgi_urls'
 
 
 # Database
@@ -111,9 +132,49 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # BEGIN IMMEDIATE: a transaction takes the write lock up front instead of
+            # upgrading a read lock later, which SQLite fails at once with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            # Run on every new connection: WAL lets readers proceed while one writer commits;
+            # synchronous=NORMAL is durable in WAL mode; cache_size is in KiB when negative
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))};"
+                'PRAGMA synchronous=NORMAL;'
+                f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_SIZE_KB', 32768))};"
+            ),
+        },
     }
 }
 
+# Write views (jobunyacar.sqlite.retry_on_lock) re-run this many times when the lock
+# wait above still times out, backing off exponentially between attempts
+DB_LOCK_RETRIES = int(os.environ.get('DB_LOCK_RETRIES', 3))
+DB_LOCK_BACKOFF_MS = 25
+DB_LOCK_BACKOFF_MAX_MS = 400
+
+# Read replicas: comma separated SQLite files kept in step with the primary
+# (locally: `python manage.py sync_sqlite_replicas`). Opened read-only.
+REPLICA_DATABASE_PATHS = [path.strip() for path in os.environ.get('DATABASE_REPLICAS', '').split(',') if path.strip()]
+for index, path in enumerate(REPLICA_DATABASE_PATHS):
+    DATABASES[f'replica_{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{path}?mode=ro',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['jobunyacar.db_routers.PrimaryReplicaRouter']
+
+# Safe requests to these views may read from a replica (only with a shared cache, see
+# jobunyacar.middleware.ReplicaRoutingMiddleware). Not the vehicle catalog: its responses
+# are cached until the next change, so a lagging replica's copy would outlive the lag
+REPLICA_READ_VIEWS = [
+    'booking-my-list', 'booking-all-list', 'user-list', 'admin-damage-reports', 'admin-damage-report-detail',
+]
+# After a write, a user reads from the primary for this long (should exceed replica lag)
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -160,8 +221,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # use token auth by default (you can override per-view)
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'jobunyacar.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'rental_app.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -171,10 +236,66 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    # Keyset pagination (jobunyacar.pagination) is opted into per endpoint; the rest
+    # keep page numbers and their `count`
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 1000,
 }
 
+# The default cache coordinates workers: token revocations, catalog/reference data
+# versions, replica pins, rate limits. Point REDIS_URL at a Redis server (needs the
+# `redis` package) so every worker shares it; without it each process has its own
+# LocMemCache and the features that need sharing fall back (jobunyacar.caches).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+
+# Seconds a worker keeps its locations snapshot (booking/reference.py). Location changes
+# bump a version in the cache, which reloads it sooner in every worker that shares the
+# cache; with a per-process cache other workers only see them after the LOCAL ttl
+REFERENCE_DATA_TTL = 300
+REFERENCE_DATA_LOCAL_TTL = 15
+
+# Seconds a worker keeps its seasonal rate/discount tables (booking/pricing.py), which
+# price quotes and new bookings; reloaded the same way as the reference data above
+PRICING_TABLE_TTL = 300
+PRICING_TABLE_LOCAL_TTL = 15
+
+# Seconds a month of a vehicle's availability (booking/calendar.py) stays cached when the
+# cache is per process; a shared cache keeps it until one of the vehicle's bookings changes
+CALENDAR_CACHE_LOCAL_TTL = 15
+
+# Seconds a vehicle list/detail response (vehicles/cache.py) stays cached when the cache is
+# per process; a shared cache keeps it for 10 minutes or until the catalog changes
+CATALOG_CACHE_LOCAL_TTL = 15
+
+# In-process token -> user cache used by CachedTokenAuthentication
+# Only used with a shared cache, which carries revocations to every worker; 0 disables it
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_TTL = 300  # seconds
+
+# Token buckets in front of the views that hash or validate passwords (jobunyacar/ratelimit.py).
+# Per view, one bucket per client IP and one per email: `burst` attempts at once, then
+# `per_minute` (> 0) more each minute. Excess attempts get a 429 before any hashing.
+AUTH_RATE_LIMITS = {
+    'login': {'ip': {'burst': 20, 'per_minute': 10}, 'email': {'burst': 5, 'per_minute': 2}},
+    'register': {'ip': {'burst': 5, 'per_minute': 2}, 'email': {'burst': 3, 'per_minute': 1}},
+    'change_password': {'ip': {'burst': 10, 'per_minute': 5}, 'email': {'burst': 5, 'per_minute': 1}},
+    'password_reset_request': {'ip': {'burst': 5, 'per_minute': 2}, 'email': {'burst': 3, 'per_minute': 0.5}},
+}
+# Reverse proxies in front of the app that append to X-Forwarded-For (0: clients connect
+# directly). Client IPs (rate limits, /metrics) are read from that header only this many
+# hops deep; with 0 it is ignored, since clients can send anything in it
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+# 'local': buckets in each worker's memory (AUTH_RATE_LIMIT_MAX_KEYS at most).
+# 'cache': in the default cache, shared by every worker that uses it
+AUTH_RATE_LIMIT_BACKEND = os.environ.get('AUTH_RATE_LIMIT_BACKEND', 'local')
+AUTH_RATE_LIMIT_MAX_KEYS = 100_000
+
 # For password reset email in dev:
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # prints emails to console
 DEFAULT_FROM_EMAIL = 'webmaster@localhost'
@@ -183,18 +304,38 @@ FRONTEND_URL = 'https://jobunyacarrentals.vercel.app/'
 
 
 
+# Queries slower than this are logged to jobunyacar.slow_queries with their SQL and view
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+
+# When set, /metrics requires `Authorization: Bearer <METRICS_TOKEN>`; when unset it only
+# answers loopback and private-network clients
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '{asctime} {levelname} {name} {process:d} {message}',
+            'style': '{',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
+            'formatter': 'verbose',
         },
     },
     'loggers': {
         'django.core.mail': {
             'handlers': ['console'],
             'level': 'DEBUG',
+            'propagate': False,
+        },
+        'jobunyacar.slow_queries': {
+            'handlers': ['console'],
+            'level': os.environ.get('SLOW_QUERY_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
         },
     },
 }
@@ -0,0 +1,54 @@
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+from .metrics import REGISTRY
+
+LOCK_RETRIES = REGISTRY.counter(
+    'db_lock_retries_total', 'Write views re-run after SQLite reported a lock, by view', ('view',)
+)
+LOCK_FAILURES = REGISTRY.counter(
+    'db_lock_failures_total', 'Write views that still hit a SQLite lock after every retry, by view', ('view',)
+)
+
+LOCK_MESSAGES = ('database is locked', 'database table is locked', 'database is busy')
+
+
+def is_lock_error(exc):
+    return isinstance(exc, OperationalError) and any(message in str(exc) for message in LOCK_MESSAGES)
+
+
+def retry_on_lock(view):
+    """
+    Re-run a write view when SQLite gives up waiting for the write lock.
+
+    Up to DB_LOCK_RETRIES extra attempts, sleeping a jittered exponential
+    backoff (DB_LOCK_BACKOFF_MS, capped at DB_LOCK_BACKOFF_MAX_MS) in
+    between. Only safe because the view's writes ran in a transaction that
+    was rolled back; inside an outer atomic block the error is re-raised.
+    An error from an on_commit hook comes after the commit, and re-running
+    the view then repeats work that already happened (create_booking would
+    report the vehicle as taken, delete a 404), so hooks that may hit the
+    database must be registered with robust=True: their errors are then
+    logged and never reach this wrapper.
+    Goes under @api_view/@permission_classes.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        retries = settings.DB_LOCK_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                return view(*args, **kwargs)
+            except OperationalError as exc:
+                if not is_lock_error(exc) or connection.in_atomic_block:
+                    raise
+                if attempt == retries:
+                    LOCK_FAILURES.inc(view.__name__)
+                    raise
+            LOCK_RETRIES.inc(view.__name__)
+            delay = min(settings.DB_LOCK_BACKOFF_MS * 2 ** attempt, settings.DB_LOCK_BACKOFF_MAX_MS) / 1000
+            time.sleep(random.uniform(delay / 2, delay))
+    return wrapper
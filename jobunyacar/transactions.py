@@ -0,0 +1,25 @@
+import functools
+
+from django.db import transaction
+
+
+def on_commit_batch(func, add, factory, using=None):
+    """
+    Gather work for one call of func(batch) when the current transaction
+    commits: add(batch) puts this caller's part into the transaction's
+    batch, which factory() creates and on_commit registers (robust) on
+    first use. The batch lives with its hook, so a rollback drops both;
+    outside a transaction func runs right away.
+    """
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        for _, hook, _ in connection.run_on_commit:
+            if isinstance(hook, functools.partial) and hook.func is func:
+                add(hook.args[0])
+                return
+    batch = factory()
+    add(batch)
+    hook = functools.partial(func, batch)
+    # Django names the hook by __qualname__ when logging its errors
+    hook.__qualname__ = getattr(func, '__qualname__', repr(func))
+    transaction.on_commit(hook, using=using, robust=True)
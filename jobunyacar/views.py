@@ -0,0 +1,35 @@
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from .metrics import REGISTRY
+from .ratelimit import client_ip
+
+
+def _internal_client(request):
+    """Whether the client (see TRUSTED_PROXY_HOPS) is on loopback or a private network"""
+    try:
+        address = ipaddress.ip_address(client_ip(request))
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+
+@require_GET
+def metrics_view(request):
+    """
+    GET: Prometheus text metrics of this worker process.
+    When METRICS_TOKEN is set, send it as `Authorization: Bearer <token>`;
+    otherwise only loopback and private-network clients are answered.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = _internal_client(request)
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
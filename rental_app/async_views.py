@@ -0,0 +1,17 @@
+from rest_framework.response import Response
+
+from jobunyacar.asyncapi import async_read_view
+
+from . import views
+from .serializers import UserSerializer
+
+# Async twins of hot read views, routed by jobunyacar.asgi_urls under ASGI.
+# Responses are identical to the sync views'.
+
+
+@async_read_view(views.me_view, authenticated=True)
+async def me_view(request):
+    """
+    GET: Retrieve basic user profile for the currently authenticated user
+    """
+    return Response(UserSerializer(request.user).data)
@@ -0,0 +1,150 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from jobunyacar.caches import cache_is_shared
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU of token key -> (user, token, cached_at) with a TTL.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, user, token):
+        with self._lock:
+            self._entries[key] = (user, token, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0].pk == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    max_size=getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 300),
+)
+
+
+def _revoked_key(user_id):
+    return f'auth:token-revoked:{user_id}'
+
+
+# Outlives every entry cached while the revocation was happening
+REVOCATION_GRACE_SECONDS = 60
+
+
+def token_cache_enabled():
+    """Only with a shared cache: otherwise revocations would never reach the other workers"""
+    return token_cache.max_size > 0 and cache_is_shared()
+
+
+def invalidate_user_tokens(user):
+    """
+    Forget cached authentication for every token of `user`.
+
+    Clears this worker's LRU and records a revocation time in the shared
+    cache. Every worker then stops trusting cached entries for tokens
+    created before it, including ones re-cached by a request that read
+    the token just before it was deleted.
+    """
+    user_id = getattr(user, 'pk', user)
+    token_cache.discard_user(user_id)
+    cache.set(_revoked_key(user_id), time.time(), token_cache.ttl + REVOCATION_GRACE_SECONDS)
+
+
+def _still_valid(token, revoked_at):
+    return revoked_at is None or revoked_at < token.created.timestamp()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers token -> user in an in-process LRU,
+    so steady-state authenticated requests run no auth query.
+
+    Entries expire after TOKEN_AUTH_CACHE_TTL seconds and are dropped early
+    by invalidate_user_tokens() (logout, password change/reset, user saves).
+    Without a shared cache every request authenticates from the database.
+    """
+
+    def authenticate_credentials(self, key):
+        if not token_cache_enabled():
+            return super().authenticate_credentials(key)
+
+        entry = token_cache.get(key)
+        if entry is not None:
+            user, token, _ = entry
+            if _still_valid(token, cache.get(_revoked_key(user.pk))):
+                # Hand out a copy so views mutating request.user never touch the cached one
+                return copy.copy(user), token
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, copy.copy(user), token)
+        return user, token
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views: cache and token lookups go through
+        the async cache/ORM APIs. Malformed headers take the sync path,
+        which raises the usual errors before touching the database.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        try:
+            key = auth[1].decode() if len(auth) == 2 else None
+        except UnicodeError:
+            key = None
+        if key is None:
+            return self.authenticate(request)
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        enabled = token_cache_enabled()
+        entry = token_cache.get(key) if enabled else None
+        if entry is not None:
+            user, token, _ = entry
+            if _still_valid(token, await cache.aget(_revoked_key(user.pk))):
+                return copy.copy(user), token
+
+        try:
+            token = await self.get_model().objects.select_related('user').aget(key=key)
+        except self.get_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        if enabled:
+            token_cache.set(key, copy.copy(token.user), token)
+        return token.user, token
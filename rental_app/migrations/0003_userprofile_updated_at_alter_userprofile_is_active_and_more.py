@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental_app', '0002_alter_userprofile_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='is_active',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='license_number',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+    ]
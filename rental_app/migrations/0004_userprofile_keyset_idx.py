@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('rental_app', '0003_userprofile_updated_at_alter_userprofile_is_active_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['created_at', 'id'], name='userprofile_created_id_idx'),
+        ),
+    ]
@@ -64,6 +64,12 @@ class UserProfile(AbstractUser):
     # 👇 Add the custom manager
     objects = UserProfileManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pages of the admin customer list (jobunyacar.pagination)
+            models.Index(fields=['created_at', 'id'], name='userprofile_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} ({self.roles})"
 
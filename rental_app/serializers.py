@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password # for password validations
+from django.db import transaction
+from rest_framework.authtoken.models import Token
 from datetime import timedelta
 
 # Models
@@ -68,8 +70,12 @@ class RegisterSerializer(serializers.ModelSerializer):
         validated_data['roles'] = 'customer'
 
         user = UserProfile(**validated_data)
+        # Hash before the transaction: PBKDF2 takes far longer than the writes
+        # and must not hold SQLite's write lock
         user.set_password(raw_password)
-        user.save()
+        with transaction.atomic():
+            user.save()
+            Token.objects.create(user=user)
         return user
     
 
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .models import UserProfile
+from .authentication import invalidate_user_tokens
+
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_tokens_on_user_change(sender, instance, created, **kwargs):
+    """
+    Deactivation, role changes or any other edit must not be served from a
+    stale cached user.
+    """
+    if not created:
+        invalidate_user_tokens(instance)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_tokens_on_token_delete(sender, instance, **kwargs):
+    invalidate_user_tokens(instance.user_id)
@@ -1,3 +1,141 @@
-from django.test import TestCase
+import tempfile
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from jobunyacar.ratelimit import client_ip
+
+from .authentication import CachedTokenAuthentication, token_cache
+from .models import UserProfile
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class TokenCacheTestCase(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = UserProfile.objects.create_user('tokens@example.com', 'Secret-pass-123', is_active=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+
+class SharedCacheTokenTests(TokenCacheTestCase):
+    def setUp(self):
+        # A file based cache stands in for Redis: every process would see it
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name,
+        }})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+    def test_cached_token_skips_the_query(self):
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+
+    def test_logout_then_authenticate(self):
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+        self.assertEqual(self.client.post('/api/user/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+    def test_logout_on_another_worker(self):
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+        # Another worker deletes the token: this worker's LRU still has it,
+        # only the revocation in the shared cache tells it otherwise
+        cached = token_cache.get(self.token.key)
+        Token.objects.filter(pk=self.token.pk).delete()
+        token_cache.set(self.token.key, cached[0], cached[1])
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+    def test_token_recached_after_revocation(self):
+        # A request read the token, then the user logged out, then that request cached it
+        user, token = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        self.assertEqual(self.client.post('/api/user/logout/').status_code, 200)
+        token_cache.set(self.token.key, user, token)
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+    def test_new_token_after_password_change_is_cached(self):
+        response = self.client.post('/api/user/change-password/', {
+            'old_password': 'Secret-pass-123', 'new_password': 'Another-pass-456',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+
+
+class LocalCacheTokenTests(TokenCacheTestCase):
+    def test_token_cache_unused(self):
+        # Each worker's LocMemCache would keep revocations to itself
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_logout_then_authenticate(self):
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+        self.assertEqual(self.client.post('/api/user/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ClientIpTests(TestCase):
+    def request(self, forwarded_for=None):
+        headers = {'HTTP_X_FORWARDED_FOR': forwarded_for} if forwarded_for is not None else {}
+        return RequestFactory().post('/api/user/login/', REMOTE_ADDR='10.0.0.2', **headers)
+
+    def test_header_ignored_without_trusted_proxies(self):
+        self.assertEqual(client_ip(self.request('203.0.113.7')), '10.0.0.2')
+
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_one_proxy(self):
+        self.assertEqual(client_ip(self.request('203.0.113.7')), '203.0.113.7')
+        # Whatever the client sent itself comes before what the proxy appended
+        self.assertEqual(client_ip(self.request('198.51.100.1, 203.0.113.7')), '203.0.113.7')
+
+    @override_settings(TRUSTED_PROXY_HOPS=2)
+    def test_two_proxies(self):
+        self.assertEqual(client_ip(self.request('198.51.100.1, 203.0.113.7, 10.0.0.1')), '203.0.113.7')
+
+    @override_settings(TRUSTED_PROXY_HOPS=2)
+    def test_missing_hops_fall_back_to_the_peer(self):
+        self.assertEqual(client_ip(self.request('203.0.113.7')), '10.0.0.2')
+        self.assertEqual(client_ip(self.request()), '10.0.0.2')
+
+    @override_settings(
+        TRUSTED_PROXY_HOPS=1, AUTH_RATE_LIMITS={'login': {'ip': {'burst': 2, 'per_minute': 1}}},
+    )
+    def test_spoofed_header_does_not_reset_the_limit(self):
+        statuses = [
+            self.client.post(
+                '/api/user/login/', {'email': 'nobody@example.com', 'password': 'x'},
+                HTTP_X_FORWARDED_FOR=f'198.51.100.{attempt}, 203.0.113.99',
+            ).status_code
+            for attempt in range(3)
+        ]
+        self.assertEqual(statuses[-1], 429)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class MetricsAccessTests(TestCase):
+    def test_internal_clients_only_by_default(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='93.184.216.34').status_code, 403)
+
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_public_client_behind_proxy(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='93.184.216.34')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_required_when_set(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 403)
+        response = self.client.get('/metrics', REMOTE_ADDR='93.184.216.34', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
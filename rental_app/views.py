@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 
@@ -15,6 +16,10 @@ from .serializers import (
     ChangePasswordSerializer
 ) # Only keep for password reset
 from .models import UserProfile
+from .authentication import invalidate_user_tokens
+from jobunyacar.pagination import paginate
+from jobunyacar.ratelimit import rate_limited
+from jobunyacar.sqlite import retry_on_lock
 
 User = get_user_model()
 
@@ -22,25 +27,20 @@ User = get_user_model()
 # ---------- REGISTER ----------
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limited('register')
+@retry_on_lock
 def register_view(request):
     """
     POST: Register a new user and return a valid token.
     """
     serializer = RegisterSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
-        user.is_active = True  # activate immediately
-        user.save()
-
-        # Delete any old tokens just to be safe
-        Token.objects.filter(user=user).delete()
-
-        # Create authentication token
-        token = Token.objects.create(user=user)
+        # activate immediately; the serializer also issues the authentication token
+        user = serializer.save(is_active=True)
 
         return Response({
             "detail": "User registered successfully.",
-            "token": token.key,
+            "token": user.auth_token.key,
             "user": UserSerializer(user).data
         }, status=status.HTTP_201_CREATED)
 
@@ -51,6 +51,8 @@ def register_view(request):
 # ---------- LOGIN ----------
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limited('login')
+@retry_on_lock
 def login_view(request):
     """
     POST: Login with email and password
@@ -80,6 +82,7 @@ def logout_view(request):
     try:
         token = Token.objects.get(user=request.user)
         token.delete()
+        invalidate_user_tokens(request.user)
         return Response({"detail": "Successfully logged out."}, status=status.HTTP_200_OK)
     except Token.DoesNotExist:
         return Response({"detail": "No active session found."}, status=status.HTTP_400_BAD_REQUEST)
@@ -105,14 +108,15 @@ def customer_list(request):
     if request.user.roles != 'admin':
         return Response({'error': 'Only Admins can view users'}, status=status.HTTP_403_FORBIDDEN)
 
-    users = UserProfile.objects.all().order_by('-created_at')
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    users = UserProfile.objects.all()
+    return paginate(request, users, UserSerializer)
 
 
 # ---------- CHANGE PASSWORD ----------
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@rate_limited('change_password')
+@retry_on_lock
 def change_password_view(request):
     """
     POST: Change password for authenticated user
@@ -125,14 +129,18 @@ def change_password_view(request):
     if not request.user.check_password(old_password):
         return Response({'old_password': 'Wrong password'}, status=status.HTTP_400_BAD_REQUEST)
 
+    # Hash before the transaction so the write lock is held only for the writes
     request.user.set_password(new_password)
-    request.user.save()
+    with transaction.atomic():
+        request.user.save()
 
-    # Invalidate old tokens
-    Token.objects.filter(user=request.user).delete()
+        # Invalidate old tokens, before the new one exists: only tokens created
+        # before the revocation stop being served from the token cache
+        Token.objects.filter(user=request.user).delete()
+        invalidate_user_tokens(request.user)
 
-    # Create new token
-    token = Token.objects.create(user=request.user)
+        # Create new token
+        token = Token.objects.create(user=request.user)
 
     data = {
         "detail": "Password changed successfully",
@@ -145,6 +153,7 @@ def change_password_view(request):
 # ---------- PASSWORD RESET ----------
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limited('password_reset_request')
 def password_reset_request_view(request):
     """
     POST: Request a password reset.
@@ -201,5 +210,6 @@ def password_reset_confirm_view(request):
 
     # Invalidate old tokens
     Token.objects.filter(user=user).delete()
+    invalidate_user_tokens(user)
 
     return Response({'detail': 'Password has been reset successfully.'}, status=status.HTTP_200_OK)
@@ -0,0 +1,37 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.response import Response
+
+from jobunyacar.asyncapi import async_read_view
+
+from . import views
+from .cache import acached_catalog_response
+from .models import Vehicle
+from .serializers import VehicleSerializer
+
+# Async twins of hot read views, routed by jobunyacar.asgi_urls under ASGI.
+# Responses are identical to the sync views'.
+
+
+@async_read_view(views.VehicleListCreateView.as_view())
+async def vehicle_list_view(request):
+    """
+    GET: List all vehicles (public), from the catalog cache when possible.
+    DRF's filter backends and cursor paginator are synchronous, so a cache
+    miss builds the page in the request's thread.
+    """
+    view = views.VehicleListCreateView(request=request, args=(), kwargs={}, format_kwarg=None)
+    return await acached_catalog_response(request, sync_to_async(lambda: view._list_rows(request)))
+
+
+@async_read_view(views.vehicle_detail_view)
+async def vehicle_detail_view(request, slug):
+    return await acached_catalog_response(request, lambda: _vehicle_detail(slug))
+
+
+async def _vehicle_detail(slug):
+    try:
+        vehicle = await Vehicle.objects.prefetch_related('images').aget(slug=slug)
+    except Vehicle.DoesNotExist:
+        return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(VehicleSerializer(vehicle).data)
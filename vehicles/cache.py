@@ -0,0 +1,137 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from jobunyacar.caches import cache_is_shared
+
+# Bumping the version orphans every cached catalog response at once,
+# in every worker sharing the cache backend. With a per-process cache
+# other workers never see the bump, so their responses are only kept
+# for CATALOG_CACHE_LOCAL_TTL.
+CATALOG_VERSION_KEY = 'vehicles:catalog:version'
+CATALOG_MODIFIED_KEY = 'vehicles:catalog:modified'
+CATALOG_CACHE_TIMEOUT = 60 * 10
+
+# Availability depends on bookings, not on the catalog, so never cache it
+UNCACHED_PARAMS = {'available_from', 'available_to'}
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+async def acatalog_version():
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, 1, None)
+        version = await cache.aget(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def catalog_modified():
+    modified = cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        modified = int(time.time())
+        cache.add(CATALOG_MODIFIED_KEY, modified, None)
+    return modified
+
+
+async def acatalog_modified():
+    modified = await cache.aget(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        modified = int(time.time())
+        await cache.aadd(CATALOG_MODIFIED_KEY, modified, None)
+    return modified
+
+
+def invalidate_catalog():
+    """Drop every cached vehicle list/detail response"""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 1, None)
+    cache.set(CATALOG_MODIFIED_KEY, int(time.time()), None)
+
+
+def _cache_timeout():
+    return CATALOG_CACHE_TIMEOUT if cache_is_shared() else settings.CATALOG_CACHE_LOCAL_TTL
+
+
+def _cache_key(request, version):
+    # Same filters in any order, or with empty values, share one entry
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+        if value != ''
+    )
+    raw = json.dumps([request.build_absolute_uri(request.path), params])
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'vehicles:catalog:{version}:{digest}'
+
+
+def _entry(data, last_modified):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return {
+        'data': data,
+        'etag': '"%s"' % hashlib.md5(body.encode()).hexdigest(),
+        'last_modified': last_modified,
+    }
+
+
+def _entry_response(request, entry):
+    response = Response(entry['data'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'], response=response
+    )
+
+
+def cached_catalog_response(request, build_response):
+    """
+    Serve a public catalog GET from cache, with ETag/Last-Modified so
+    repeat clients get a bodiless 304.
+
+    build_response() is only called on a miss; non-200 responses are
+    returned as is and never cached.
+    """
+    if UNCACHED_PARAMS.intersection(request.query_params):
+        return build_response()
+
+    key = _cache_key(request, catalog_version())
+    entry = cache.get(key)
+    if entry is None:
+        response = build_response()
+        if response.status_code != 200:
+            return response
+        entry = _entry(response.data, catalog_modified())
+        cache.set(key, entry, _cache_timeout())
+    return _entry_response(request, entry)
+
+
+async def acached_catalog_response(request, build_response):
+    """cached_catalog_response() for async views; build_response is a coroutine function"""
+    if UNCACHED_PARAMS.intersection(request.query_params):
+        return await build_response()
+
+    key = _cache_key(request, await acatalog_version())
+    entry = await cache.aget(key)
+    if entry is None:
+        response = await build_response()
+        if response.status_code != 200:
+            return response
+        entry = _entry(response.data, await acatalog_modified())
+        await cache.aset(key, entry, _cache_timeout())
+    return _entry_response(request, entry)
@@ -0,0 +1,118 @@
+"""
+Read-only fast path for vehicle listings.
+
+Builds exactly what VehicleSerializer(many=True) renders, from values()
+rows instead of model instances, skipping per-row serializer and field
+binding. Scalar formats come from the same DRF field classes, so output
+stays identical; check with `manage.py bench_list_serialization`.
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .images import srcsets_for
+from .models import Vehicle, VehicleImage
+
+VEHICLE_COLUMNS = (
+    'id', 'name', 'model', 'car_type', 'description', 'seats', 'transmission', 'fuel_type', 'daily_rate',
+    'status', 'features', 'slug', 'image', 'image_variants', 'min_days', 'engine', 'color', 'engine_power',
+    'engine_torque', 'created_at',
+)
+VEHICLE_IMAGE_COLUMNS = ('id', 'vehicle_id', 'image', 'image_variants', 'uploaded_at')
+
+format_decimal = serializers.DecimalField(max_digits=10, decimal_places=2).to_representation
+format_date = serializers.DateField().to_representation
+_datetime_field = serializers.DateTimeField()
+
+_image_storage = Vehicle._meta.get_field('image').storage
+
+
+def optional(value, convert):
+    return None if value is None else convert(value)
+
+
+def datetime_formatter():
+    """
+    serializers.DateTimeField().to_representation with the active time
+    zone looked up once, for formatting many rows.
+    """
+    if not settings.USE_TZ or api_settings.DATETIME_FORMAT.lower() != ISO_8601:
+        return _datetime_field.to_representation
+    zone = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if timezone.is_naive(value):
+            return _datetime_field.to_representation(value)
+        text = value.astimezone(zone).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return format_datetime
+
+
+def image_urls(request=None):
+    """
+    What serializers.ImageField renders for a stored file name, remembering
+    names already seen (many rows share a vehicle's photo).
+    """
+    urls = {}
+
+    def image_url(name):
+        if not name:
+            return None
+        url = urls.get(name)
+        if url is None:
+            url = _image_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[name] = url
+        return url
+    return image_url
+
+
+def serialize_vehicle_images(vehicle_ids, request=None):
+    """{vehicle_id: [VehicleImageSerializer output, ...]} in one query"""
+    image_url = image_urls(request)
+    images = {}
+    rows = VehicleImage.objects.filter(vehicle_id__in=vehicle_ids).order_by('id').values(*VEHICLE_IMAGE_COLUMNS)
+    for row in rows:
+        images.setdefault(row['vehicle_id'], []).append({
+            'id': row['id'],
+            'image': image_url(row['image']),
+            'image_variants': srcsets_for(row['image'], row['image_variants'], request),
+            'uploaded_at': optional(row['uploaded_at'], format_date),
+        })
+    return images
+
+
+def serialize_vehicles(rows, request=None):
+    """VehicleSerializer(many=True).data for Vehicle values(*VEHICLE_COLUMNS) rows"""
+    rows = list(rows)
+    images = serialize_vehicle_images([row['id'] for row in rows], request)
+    image_url = image_urls(request)
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'model': row['model'],
+            'car_type': row['car_type'],
+            'description': row['description'],
+            'seats': row['seats'],
+            'transmission': row['transmission'],
+            'fuel_type': row['fuel_type'],
+            'daily_rate': optional(row['daily_rate'], format_decimal),
+            'status': row['status'],
+            'features': row['features'],
+            'slug': row['slug'],
+            'image': image_url(row['image']),
+            'image_variants': srcsets_for(row['image'], row['image_variants'], request),
+            'images': images.get(row['id'], []),
+            'min_days': row['min_days'],
+            'engine': row['engine'],
+            'color': row['color'],
+            'engine_power': row['engine_power'],
+            'engine_torque': row['engine_torque'],
+            'created_at': optional(row['created_at'], format_datetime),
+        }
+        for row in rows
+    ]
@@ -1,4 +1,6 @@
 import django_filters
+from django.db.models import Exists, OuterRef
+from rest_framework import serializers
 
 from .models import Vehicle
 
@@ -14,6 +16,10 @@ class VehicleFilter(django_filters.FilterSet):
     min_seats = django_filters.NumberFilter(field_name='seats', lookup_expr='gte')
     max_seats = django_filters.NumberFilter(field_name='seats', lookup_expr='lte')
 
+    # Date-range availability, applied together in filter_queryset
+    available_from = django_filters.DateFilter(method='filter_noop')
+    available_to = django_filters.DateFilter(method='filter_noop')
+
     class Meta:
         model = Vehicle
         fields = [
@@ -24,3 +30,33 @@ class VehicleFilter(django_filters.FilterSet):
             'fuel_type',
             'status',
         ]
+
+    def filter_noop(self, queryset, name, value):
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        start_date = self.form.cleaned_data.get('available_from')
+        end_date = self.form.cleaned_data.get('available_to')
+        if not start_date and not end_date:
+            return queryset
+
+        # A single bound means a single day
+        start_date = start_date or end_date
+        end_date = end_date or start_date
+        if end_date < start_date:
+            raise serializers.ValidationError({'available_to': 'End date cannot be before start date'})
+
+        return available_between(queryset, start_date, end_date)
+
+
+def available_between(queryset, start_date, end_date):
+    """
+    Restrict a Vehicle queryset to vehicles with no pending/confirmed booking
+    overlapping start_date..end_date (inclusive), as a single NOT EXISTS anti-join.
+    """
+    from booking.models import Booking
+
+    clashes = Booking.objects.overlapping(start_date, end_date).filter(vehicle=OuterRef('pk'))
+    return queryset.filter(~Exists(clashes))
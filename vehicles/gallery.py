@@ -0,0 +1,121 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from PIL import Image
+
+from .cache import invalidate_catalog
+from .images import schedule_variants
+from .models import VehicleImage
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+class GalleryUploadError(Exception):
+    """Raised with per-file errors; nothing has been written"""
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid image(s)")
+        self.errors = errors
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_UPLOAD_WORKERS', 8),
+            thread_name_prefix='gallery-uploads',
+        )
+    return _executor
+
+
+def _check(upload):
+    max_bytes = settings.IMAGE_UPLOAD_MAX_BYTES
+    if upload.size > max_bytes:
+        return f"Images must be at most {max_bytes // (1024 * 1024)} MB."
+    try:
+        with Image.open(upload) as image:
+            if image.width * image.height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+                return f"Images must be at most {settings.IMAGE_UPLOAD_MAX_PIXELS // 1_000_000} megapixels."
+            image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        return "Upload a valid image. The file you uploaded was either not an image or a corrupted image."
+    finally:
+        upload.seek(0)
+    return None
+
+
+def validate_uploads(uploads):
+    """Raise GalleryUploadError unless every upload is a readable image within the size limits"""
+    errors = {}
+    for upload in uploads:
+        error = _check(upload)
+        if error:
+            errors[upload.name] = error
+    if errors:
+        raise GalleryUploadError(errors)
+
+
+def _delete_files(names):
+    storage = VehicleImage._meta.get_field('image').storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("Could not delete orphaned gallery image %s", name)
+
+
+def store_uploads(uploads):
+    """
+    Write uploads to storage concurrently; returns their stored names in
+    upload order. If any write fails, the others are deleted again.
+    """
+    field = VehicleImage._meta.get_field('image')
+    futures = [
+        _get_executor().submit(
+            field.storage.save, field.generate_filename(None, upload.name), upload, max_length=field.max_length
+        )
+        for upload in uploads
+    ]
+    names, failure = [], None
+    for future in futures:
+        try:
+            names.append(future.result())
+        except Exception as exc:
+            failure = failure or exc
+    if failure is not None:
+        _delete_files(names)
+        raise failure
+    return names
+
+
+def ingest_gallery(uploads, save_vehicle):
+    """
+    Add uploaded gallery images to the vehicle returned by save_vehicle().
+
+    Every upload is validated before anything is written, the files are
+    written concurrently, and only then are save_vehicle() and a single
+    bulk_create of the VehicleImage rows run, in one transaction; so the
+    database write lock is never held during file I/O, and the request
+    takes about as long as its slowest file. Files are deleted again if
+    the transaction fails.
+
+    Returns the vehicle; raises GalleryUploadError if any upload is invalid.
+    """
+    validate_uploads(uploads)
+    names = store_uploads(uploads)
+    try:
+        with transaction.atomic():
+            vehicle = save_vehicle()
+            images = VehicleImage.objects.bulk_create([VehicleImage(vehicle=vehicle, image=name) for name in names])
+            # bulk_create skips the post_save signals that normally do these
+            for image in images:
+                schedule_variants(image)
+            if images:
+                transaction.on_commit(invalidate_catalog)
+    except Exception:
+        _delete_files(names)
+        raise
+    return vehicle
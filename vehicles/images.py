@@ -0,0 +1,133 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from .cache import invalidate_catalog
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+            thread_name_prefix='image-variants',
+        )
+    return _executor
+
+
+def needs_variants(instance):
+    return bool(instance.image) and instance.image_variants.get('source') != instance.image.name
+
+
+def schedule_variants(instance):
+    """Queue variant generation for instance once the current transaction commits"""
+    label = instance._meta.label
+    pk = instance.pk
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, label, pk))
+
+
+def _run_in_worker(label, pk):
+    try:
+        generate_variants(apps.get_model(label), pk)
+    except Exception:
+        logger.exception("Could not generate image variants for %s %s", label, pk)
+    finally:
+        # Worker threads own their connection; don't leave it open between jobs
+        connection.close()
+
+
+def _variant_name(source, width, extension):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return f'{os.path.dirname(source)}/variants/{stem}-{width}w.{extension}'
+
+
+def _encode(image, file_format, options):
+    if file_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif file_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, file_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(model, pk):
+    """
+    Write resized WebP/JPEG renditions of an instance's image and record
+    them in image_variants. Writes only the image_variants column, and only
+    if the image did not change while the variants were being made.
+    """
+    instance = model.objects.filter(pk=pk).only('pk', 'image').first()
+    if instance is None or not instance.image:
+        return
+    source = instance.image.name
+
+    try:
+        with default_storage.open(source, 'rb') as handle:
+            original = ImageOps.exif_transpose(Image.open(handle))
+            original.load()
+    except OSError:
+        # Missing or unreadable file: remember it so every save doesn't retry
+        logger.warning("Cannot read %s to generate variants", source)
+        model.objects.filter(pk=pk, image=source).update(image_variants={'source': source})
+        return
+
+    widths = sorted({min(width, original.width) for width in VARIANT_WIDTHS})
+    variants = {'source': source}
+    for extension, (file_format, options) in VARIANT_FORMATS.items():
+        variants[extension] = {}
+        for width in widths:
+            resized = original.copy()
+            resized.thumbnail((width, original.height), Image.LANCZOS)
+            name = _variant_name(source, width, extension)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            variants[extension][str(width)] = default_storage.save(name, _encode(resized, file_format, options))
+
+    if model.objects.filter(pk=pk, image=source).update(image_variants=variants):
+        invalidate_catalog()
+
+
+def variant_srcsets(instance, request=None):
+    """
+    {'webp': 'url 320w, url 640w, ...', 'jpeg': ...} for the instance's image,
+    or {} while the variants are still being generated.
+    """
+    return srcsets_for(instance.image.name if instance.image else '', instance.image_variants, request)
+
+
+def srcsets_for(image_name, variants, request=None):
+    """variant_srcsets() from a stored image name and image_variants value"""
+    variants = variants or {}
+    if not image_name or variants.get('source') != image_name:
+        return {}
+
+    srcsets = {}
+    for extension in VARIANT_FORMATS:
+        entries = []
+        for width, name in sorted(variants.get(extension, {}).items(), key=lambda item: int(item[0])):
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            entries.append(f'{url} {width}w')
+        if entries:
+            srcsets[extension] = ', '.join(entries)
+    return srcsets
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from .cache import invalidate_catalog
+from .images import schedule_variants
+from .models import Vehicle, VehicleImage, unique_slug
+from .serializers import VehicleImportSerializer
+
+IMPORT_BATCH_SIZE = 500
+
+# CSV has no lists, so extra gallery images go in one column separated by |
+CSV_IMAGE_SEPARATOR = '|'
+
+
+class VehicleImportError(Exception):
+    """Raised with per-row validation errors; nothing has been written"""
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid row(s)")
+        self.errors = errors
+
+
+def parse_rows(content, file_format):
+    """Read vehicle rows from CSV or JSON (a list of objects) text"""
+    if file_format == 'json':
+        rows = json.loads(content)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be a list of vehicles")
+        return rows
+
+    rows = []
+    for row in csv.DictReader(io.StringIO(content)):
+        row = {key: value for key, value in row.items() if value not in (None, '')}
+        if 'images' in row:
+            row['images'] = [path.strip() for path in row['images'].split(CSV_IMAGE_SEPARATOR) if path.strip()]
+        rows.append(row)
+    return rows
+
+
+def _conflicting_rows(vehicles):
+    """Row errors for vehicles whose slug another save took while importing"""
+    slugs = set(Vehicle.objects.filter(slug__in=[vehicle.slug for vehicle in vehicles]).values_list('slug', flat=True))
+    message = 'A vehicle with this slug was saved during the import; import again.'
+    errors = [
+        {'row': index, 'errors': {'slug': [message]}}
+        for index, vehicle in enumerate(vehicles, start=1)
+        if vehicle.slug in slugs
+    ]
+    return errors or [{'row': None, 'errors': {'non_field_errors': ['The import conflicted with another change; import again.']}}]
+
+
+def import_vehicles(rows, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Validate and insert vehicles (and their gallery images) in one transaction.
+
+    Slugs are assigned in memory against the existing slug set, fetched
+    once inside the transaction, and rows are written with bulk_create,
+    so the query count grows with the number of batches rather than rows
+    or slug collisions.
+    progress(done, total) is called after each batch.
+
+    Returns the created vehicles; raises VehicleImportError if any row is
+    invalid or clashes with a vehicle saved concurrently.
+    """
+    validated, errors = [], []
+    for index, row in enumerate(rows, start=1):
+        serializer = VehicleImportSerializer(data=row)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            errors.append({'row': index, 'errors': serializer.errors})
+    if errors:
+        raise VehicleImportError(errors)
+
+    vehicles, gallery = [], []
+    for data in validated:
+        data = dict(data)
+        gallery.append(data.pop('images', []))
+        vehicles.append(Vehicle(**data))
+
+    total = len(vehicles)
+    try:
+        with transaction.atomic():
+            # Read inside the transaction, which on SQLite already holds the write lock
+            # (BEGIN IMMEDIATE), so no vehicle can take one of these slugs before the insert
+            taken = set(Vehicle.objects.values_list('slug', flat=True))
+            counters = {}
+            for vehicle in vehicles:
+                vehicle.slug = unique_slug(slugify(vehicle.name), taken, counters)
+
+            for start in range(0, total, batch_size):
+                batch = vehicles[start:start + batch_size]
+                Vehicle.objects.bulk_create(batch)
+                images = VehicleImage.objects.bulk_create(
+                    [
+                        VehicleImage(vehicle=vehicle, image=path)
+                        for vehicle, paths in zip(batch, gallery[start:start + batch_size])
+                        for path in paths
+                    ],
+                    batch_size=batch_size,
+                )
+                for instance in [*batch, *images]:
+                    schedule_variants(instance)
+                if progress:
+                    progress(min(start + batch_size, total), total)
+
+            # bulk_create skips the post_save signals that normally do these
+            transaction.on_commit(invalidate_catalog)
+    except IntegrityError:
+        # Databases without a write lock let a concurrent save take a slug first
+        raise VehicleImportError(_conflicting_rows(vehicles))
+
+    return vehicles
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from vehicles.images import generate_variants, needs_variants
+from vehicles.models import Vehicle, VehicleImage
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for vehicle images that lack them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2))
+
+    def handle(self, *args, **options):
+        jobs = []
+        for model in (Vehicle, VehicleImage):
+            for instance in model.objects.exclude(image='').only('pk', 'image', 'image_variants').iterator():
+                if options['force'] or needs_variants(instance):
+                    jobs.append((model, instance.pk))
+
+        self.stdout.write(f'Generating variants for {len(jobs)} images')
+        failed = 0
+
+        def run(job):
+            try:
+                generate_variants(*job)
+                return None
+            except Exception as exc:
+                return f'{job[0].__name__} {job[1]}: {exc}'
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for done, error in enumerate(pool.map(run, jobs), start=1):
+                if error:
+                    failed += 1
+                    self.stderr.write(error)
+                if done % 100 == 0:
+                    self.stdout.write(f'  {done}/{len(jobs)}')
+
+        self.stdout.write(self.style.SUCCESS(f'Done: {len(jobs) - failed} generated, {failed} failed'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicles.importer import IMPORT_BATCH_SIZE, VehicleImportError, import_vehicles, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import vehicles from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file, or JSON file holding a list of vehicles')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('json' if path.lower().endswith('.json') else 'csv')
+
+        try:
+            with open(path, encoding='utf-8-sig') as handle:
+                rows = parse_rows(handle.read(), file_format)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Could not read {path}: {exc}')
+
+        self.stdout.write(f'Importing {len(rows)} vehicles from {path}')
+
+        def progress(done, total):
+            self.stdout.write(f'  {done}/{total}')
+
+        try:
+            vehicles = import_vehicles(rows, batch_size=options['batch_size'], progress=progress)
+        except VehicleImportError as exc:
+            for error in exc.errors:
+                self.stderr.write(f"row {error['row']}: {error['errors']}")
+            raise CommandError(f'{len(exc.errors)} invalid row(s), nothing imported')
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {len(vehicles)} vehicles'))
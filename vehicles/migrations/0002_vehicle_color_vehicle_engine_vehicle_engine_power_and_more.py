@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='color',
+            field=models.CharField(blank=True, max_length=150, null=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='engine',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='engine_power',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='engine_torque',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='min_days',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=120, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='car_type',
+            field=models.CharField(choices=[('Small Car', 'Small Car'), ('Medium Car', 'Medium Car'), ('Mid-Size Car', 'Mid-Size Car'), ('SUV Car', 'SUV Car'), ('Luxury Car', 'Luxury Car'), ('Luxury SUV', 'Luxury SUV'), ('Minivan', 'Minivan'), ('Passenger Van', 'Passenger Van'), ('Bus', 'Bus'), ('Safari Vehicle', 'Safari Vehicle')], max_length=150),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='fuel_type',
+            field=models.CharField(choices=[('Diesel', 'Diesel'), ('Petrol', 'Petrol'), ('Electric', 'Electric'), ('Hybrid', 'Hybrid')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='VehicleImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='vehicles/')),
+                ('uploaded_at', models.DateField(auto_now_add=True)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='vehicles.vehicle')),
+            ],
+        ),
+    ]
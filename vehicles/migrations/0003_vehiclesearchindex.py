@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:55
+
+import django.db.models.deletion
+import vehicles.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0002_vehicle_color_vehicle_engine_vehicle_engine_power_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleSearchIndex',
+            fields=[
+                ('vehicle', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='vehicles.vehicle')),
+                ('document', vehicles.models.FullTextField(db_column='vehicles_vehicle_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'vehicles_vehicle_fts',
+                'managed': False,
+            },
+        ),
+    ]
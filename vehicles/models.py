@@ -1,9 +1,25 @@
 from django.db import models
+from django.db.models import Lookup
 from django.utils.text import slugify
 
 # Create your models here.
 
 
+def unique_slug(base_slug, taken, counters=None):
+    """
+    First of base_slug, base_slug-1, base_slug-2, ... not in `taken`.
+    The result is added to `taken`; pass a shared `counters` dict when
+    assigning many slugs so each base resumes where it left off.
+    """
+    counter = counters.get(base_slug, 1) if counters is not None else 1
+    slug = base_slug
+    while slug in taken:
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    if counters is not None:
+        counters[base_slug] = counter
+    taken.add(slug)
+    return slug
 
 
 class Vehicle(models.Model):
@@ -52,6 +68,8 @@ class Vehicle(models.Model):
     status = models.CharField(max_length=100, choices=STATUS_CHOICES)
     features = models.CharField(max_length=200, blank=True)
     image = models.ImageField(upload_to='vehicles/')
+    # Resized renditions of `image`, filled in the background by vehicles.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     slug = models.SlugField(max_length=120, unique=True, blank=True)
     color = models.CharField(max_length=150, null=True, blank=True)
     min_days = models.IntegerField(blank=True, null=True)
@@ -60,17 +78,23 @@ class Vehicle(models.Model):
     engine_torque = models.CharField(max_length=200, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pages of the vehicle list (jobunyacar.pagination)
+            models.Index(fields=['created_at', 'id'], name='vehicle_created_id_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         # Generate slug from name if it doesn't exist
         if not self.slug:
             base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            # Ensure uniqueness
-            while Vehicle.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            # Fetch every slug this name could collide with in one query
+            taken = set(
+                Vehicle.objects.filter(
+                    models.Q(slug=base_slug) | models.Q(slug__startswith=f"{base_slug}-")
+                ).values_list('slug', flat=True)
+            )
+            self.slug = unique_slug(base_slug, taken)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -83,8 +107,40 @@ class VehicleImage(models.Model):
     """
     vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='vehicles/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     uploaded_at = models.DateField(auto_now_add=True)
 
     def __str__(self):
         return f"Image for {self.vehicle.name}"
 
+
+class FullTextField(models.TextField):
+    """FTS5 hidden column that supports the `match` lookup"""
+
+
+@FullTextField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class VehicleSearchIndex(models.Model):
+    """
+    Read-only view of the SQLite FTS5 index over the searchable Vehicle
+    columns. The table and its sync triggers are created by
+    vehicles.search.ensure_fts_index, not by migrations.
+    """
+    vehicle = models.OneToOneField(
+        Vehicle, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='search_index'
+    )
+    document = FullTextField(db_column='vehicles_vehicle_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'vehicles_vehicle_fts'
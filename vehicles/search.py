@@ -0,0 +1,98 @@
+from django.db import connections
+from django.db.models import F
+from rest_framework.filters import SearchFilter
+
+FTS_TABLE = 'vehicles_vehicle_fts'
+FTS_TRIGGERS = ['vehicles_vehicle_fts_ai', 'vehicles_vehicle_fts_ad', 'vehicles_vehicle_fts_au']
+
+# External-content FTS5 index over the searchable Vehicle columns. Triggers
+# keep it in step with every write, including bulk_create() and
+# queryset.update(), which never fire model signals.
+FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, model, description, features, car_type,
+        content='vehicles_vehicle', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vehicles_vehicle_fts_ai AFTER INSERT ON vehicles_vehicle BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, model, description, features, car_type)
+        VALUES (new.id, new.name, new.model, new.description, new.features, new.car_type);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vehicles_vehicle_fts_ad AFTER DELETE ON vehicles_vehicle BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, model, description, features, car_type)
+        VALUES ('delete', old.id, old.name, old.model, old.description, old.features, old.car_type);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS vehicles_vehicle_fts_au
+    AFTER UPDATE OF name, model, description, features, car_type ON vehicles_vehicle BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, model, description, features, car_type)
+        VALUES ('delete', old.id, old.name, old.model, old.description, old.features, old.car_type);
+        INSERT INTO {FTS_TABLE}(rowid, name, model, description, features, car_type)
+        VALUES (new.id, new.name, new.model, new.description, new.features, new.car_type);
+    END
+    """,
+]
+
+_fts_ready = set()
+
+
+def ensure_fts_index(using='default'):
+    """
+    Create the FTS5 index and its triggers if any are missing, then rebuild it.
+
+    Runs after every migrate: SQLite's schema editor recreates
+    vehicles_vehicle on most ALTERs, which silently drops the triggers.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or 'vehicles_vehicle' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s)" % ', '.join(['%s'] * (len(FTS_TRIGGERS) + 1)),
+            [FTS_TABLE, *FTS_TRIGGERS],
+        )
+        if len(cursor.fetchall()) == len(FTS_TRIGGERS) + 1:
+            return
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def fts_available(using='default'):
+    if using not in _fts_ready:
+        connection = connections[using]
+        if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+            return False
+        _fts_ready.add(using)
+    return True
+
+
+def fts_query(terms):
+    """Quote each term and prefix-match it, so 'toy cor' finds 'Toyota Corolla'"""
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ?search= backed by the SQLite FTS5 index, ranked by bm25 relevance.
+
+    Matches come from one index lookup joined to vehicles by rowid instead
+    of LIKE '%term%' scans, and each vehicle gets a `search_rank` annotation (lower is more relevant)
+    that KeysetPagination orders by when no explicit ?ordering is given.
+    Falls back to the regular icontains SearchFilter on other databases.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not fts_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        return queryset.filter(search_index__document__match=fts_query(terms)).annotate(
+            search_rank=F('search_index__rank')
+        )
@@ -1,18 +1,25 @@
 from rest_framework import serializers
 
 from .models import Vehicle, VehicleImage
+from .images import variant_srcsets
 
 
 # Serializers for vehicle model
 class VehicleImageSerializer(serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = VehicleImage
-        fields = ['id', 'image', 'uploaded_at']
+        fields = ['id', 'image', 'image_variants', 'uploaded_at']
+
+    def get_image_variants(self, obj):
+        return variant_srcsets(obj, self.context.get('request'))
 
 
 class VehicleSerializer(serializers.ModelSerializer):
     images = VehicleImageSerializer(many=True, read_only=True)
     slug = serializers.CharField(read_only=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Vehicle
@@ -30,6 +37,7 @@ class VehicleSerializer(serializers.ModelSerializer):
             'features',
             'slug',
             'image',
+            'image_variants',
             'images',
             'min_days',
             'engine',
@@ -38,4 +46,37 @@ class VehicleSerializer(serializers.ModelSerializer):
             'engine_torque',
             'created_at'
         ]
-        read_only_fields = ['id', 'slug', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'slug', 'created_at']
+
+    def get_image_variants(self, obj):
+        return variant_srcsets(obj, self.context.get('request'))
+
+class VehicleImportSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk import. Images are referenced by their
+    storage path (e.g. vehicles/corolla.jpg) rather than uploaded.
+    """
+    image = serializers.CharField(max_length=100)
+    images = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+
+    class Meta:
+        model = Vehicle
+        fields = [
+            'name',
+            'model',
+            'car_type',
+            'description',
+            'seats',
+            'transmission',
+            'fuel_type',
+            'daily_rate',
+            'status',
+            'features',
+            'image',
+            'images',
+            'min_days',
+            'engine',
+            'color',
+            'engine_power',
+            'engine_torque',
+        ]
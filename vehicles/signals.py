@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from .models import Vehicle, VehicleImage
+from .cache import invalidate_catalog
+from .search import ensure_fts_index
+from .images import needs_variants, schedule_variants
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=VehicleImage)
+def invalidate_vehicle_cache(sender, **kwargs):
+    """
+    Any change to a vehicle or its gallery invalidates the cached catalog,
+    once it commits: invalidating earlier lets a concurrent request cache
+    the old rows again under the new version.
+    """
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=VehicleImage)
+def generate_image_variants(sender, instance, **kwargs):
+    """
+    Resize newly uploaded images in the background, after the upload request commits.
+    """
+    if needs_variants(instance):
+        schedule_variants(instance)
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    """
+    (Re)create the FTS5 search index once the vehicles tables are migrated.
+    """
+    if sender.name == 'vehicles':
+        ensure_fts_index(using)
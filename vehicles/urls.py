@@ -9,6 +9,9 @@ urlpatterns = [
     # Public (GET) and Admin (POST)
     path('vehicles/', views.VehicleListCreateView.as_view(), name='vehicle-list-create'),
 
+    # Admin (POST) - bulk import from CSV/JSON
+    path('vehicles/import/', views.vehicle_import_view, name='vehicle-import'),
+
     # Public (GET) and Admin (PUT, DELETE)
     path('vehicles/<slug:slug>/', views.vehicle_detail_view, name='vehicle-detail'),
 ]
\ No newline at end of file
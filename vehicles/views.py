@@ -1,14 +1,21 @@
-from rest_framework import status, generics, permissions
+from rest_framework import exceptions, status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .serializers import VehicleSerializer
 from .models import Vehicle
 from .filters import VehicleFilter
+from .cache import cached_catalog_response
+from .importer import import_vehicles, parse_rows, VehicleImportError
+from .gallery import ingest_gallery, GalleryUploadError
+from .search import FullTextSearchFilter
+from .fast_serializers import VEHICLE_COLUMNS, serialize_vehicles
+from jobunyacar.metrics import timed_serialization
+from jobunyacar.pagination import KeysetPagination
 
 
 class VehicleListCreateView(generics.ListCreateAPIView):
@@ -16,65 +23,77 @@ class VehicleListCreateView(generics.ListCreateAPIView):
     GET: List all vehicles (public)
     POST: Add new vehicle (admin only)
     Supports filter, search, ordering, pagination.
+    ?available_from=YYYY-MM-DD&available_to=YYYY-MM-DD keeps only vehicles
+    with no pending/confirmed booking in that range.
     """
-    queryset = Vehicle.objects.all().order_by('-created_at')
+    queryset = Vehicle.objects.all().prefetch_related('images').order_by('-created_at')
     serializer_class = VehicleSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
 
     # Filtering configuration
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
     filterset_class = VehicleFilter
     search_fields = ['name', 'model', 'description', 'features', 'car_type']
     ordering_fields = ['daily_rate', 'seats', 'created_at']
 
+    def list(self, request, *args, **kwargs):
+        return cached_catalog_response(request, lambda: self._list_rows(request))
+
+    def _list_rows(self, request):
+        """Same output as ListAPIView.list(), built from values() rows by the fast path"""
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        columns = VEHICLE_COLUMNS
+        if 'search_rank' in queryset.query.annotations:
+            # The paginator orders search results by it
+            columns += ('search_rank',)
+        page = self.paginate_queryset(queryset.values(*columns))
+        with timed_serialization():
+            data = serialize_vehicles(page, request)
+        return self.get_paginated_response(data)
+
     def perform_create(self, serializer):
         """
         Only admins to create a vehicle
         """
         user = self.request.user
+        # perform_create can't return a response; raising is what stops the save
         if not user.is_authenticated:
-            return Response({'error' : 'You must be loggen in as admin to add vehicle'}, status=status.HTTP_401_UNAUTHORIZED)
-        
+            raise exceptions.NotAuthenticated('You must be loggen in as admin to add vehicle')
+
         if user.roles != 'admin':
-            return Response({'error': 'Only admins can add a vehicle'})
-        
-        vehicle = serializer.save()
+            raise exceptions.PermissionDenied('Only admins can add a vehicle')
 
-        # Handle multiple images
-        images = self.request.FILES.getlist('images')
-        if images:
-            from .models import VehicleImage
-            for img in images:
-                VehicleImage.objects.create(vehicle=vehicle, image=img)
+        # Gallery images: all checked before the vehicle is saved, written in parallel
+        try:
+            ingest_gallery(self.request.FILES.getlist('images'), serializer.save)
+        except GalleryUploadError as exc:
+            raise exceptions.ValidationError({'images': exc.errors})
 
 
     
 @api_view(['PUT', 'DELETE', 'GET'])
 @permission_classes([AllowAny])
 def vehicle_detail_view(request, slug):
+    if request.method == 'GET':
+        return cached_catalog_response(request, lambda: _vehicle_detail(slug))
+
     try:
         vehicle = Vehicle.objects.get(slug=slug)
     except Vehicle.DoesNotExist:
         return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.method == 'GET':
-        serializer = VehicleSerializer(vehicle)
-        return Response(serializer.data)
-
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         if not request.user.is_authenticated or request.user.roles != 'admin':
             return Response({'error': 'Only admins can update vehicles'})
 
         serializer = VehicleSerializer(vehicle, data=request.data, partial=True)
         if serializer.is_valid():
-            vehicle = serializer.save()
-
-            # ✅ Handle new uploaded images
-            images = request.FILES.getlist('images')
-            if images:
-                from .models import VehicleImage
-                for img in images:
-                    VehicleImage.objects.create(vehicle=vehicle, image=img)
+            # ✅ New gallery images: all checked before anything is saved, written in parallel
+            try:
+                vehicle = ingest_gallery(request.FILES.getlist('images'), serializer.save)
+            except GalleryUploadError as exc:
+                return Response({'images': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
 
             return Response(VehicleSerializer(vehicle).data)
 
@@ -87,6 +106,43 @@ def vehicle_detail_view(request, slug):
         vehicle.delete()
         return Response({'message': 'Vehicle deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
-    
 
-    
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def vehicle_import_view(request):
+    """
+    POST: Admin bulk imports vehicles.
+    Either upload a CSV/JSON file as `file`, or send a JSON list of vehicles as the body.
+    """
+    if request.user.roles != 'admin':
+        return Response({'error': 'Only admins can import vehicles'}, status=status.HTTP_403_FORBIDDEN)
+
+    upload = request.FILES.get('file')
+    if upload:
+        file_format = 'json' if upload.name.lower().endswith('.json') else 'csv'
+        try:
+            rows = parse_rows(upload.read().decode('utf-8-sig'), file_format)
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({'error': f'Could not read import file: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+    elif isinstance(request.data, list):
+        rows = request.data
+    else:
+        return Response({'error': 'Upload a CSV/JSON file or send a list of vehicles'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        vehicles = import_vehicles(rows)
+    except VehicleImportError as exc:
+        return Response({'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {'created': len(vehicles), 'slugs': [vehicle.slug for vehicle in vehicles]},
+        status=status.HTTP_201_CREATED
+    )
+
+
+def _vehicle_detail(slug):
+    try:
+        vehicle = Vehicle.objects.prefetch_related('images').get(slug=slug)
+    except Vehicle.DoesNotExist:
+        return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(VehicleSerializer(vehicle).data)